@@ -0,0 +1,38 @@
+"""add_task_fulltext_index
+
+Revision ID: b7d2e4f6a813
+Revises: a3c5e7f91b24
+Create Date: 2026-10-17 14:05:37.412906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f6a813'
+down_revision: Union[str, None] = 'a3c5e7f91b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FULLTEXT indexes are MySQL only; other databases search with the in-memory index
+    if op.get_bind().dialect.name != 'mysql':
+        return
+
+    # The ngram parser splits text into character bigrams, so Chinese text without
+    # spaces is searchable (the server should run with innodb_ft_enable_stopword=OFF,
+    # since ngram skips every token containing a stopword)
+    op.execute(
+        'CREATE FULLTEXT INDEX ix_tasks_fulltext ON tasks (title, description, details) WITH PARSER ngram'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+
+    op.drop_index('ix_tasks_fulltext', 'tasks')
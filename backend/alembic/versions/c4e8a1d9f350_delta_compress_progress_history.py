@@ -0,0 +1,163 @@
+"""delta_compress_progress_history
+
+Revision ID: c4e8a1d9f350
+Revises: b7d2e4f6a813
+Create Date: 2026-10-17 16:31:08.527114
+
+"""
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1d9f350'
+down_revision: Union[str, None] = 'b7d2e4f6a813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# History rows loaded per query while converting
+BATCH_SIZE = 100
+
+# Storage kinds and line delta operations, as of this revision
+FULL = 'full'
+SNAPSHOT = 'snapshot'
+COPY, SKIP, INSERT = 0, 1, 2
+
+progress_history = sa.table(
+    'progress_history',
+    sa.column('id', sa.Integer),
+    sa.column('progress_id', sa.Integer),
+    sa.column('version', sa.Integer),
+    sa.column('storage', sa.String),
+    sa.column('content', sa.Text),
+    sa.column('data', sa.LargeBinary),
+)
+
+project_progress = sa.table(
+    'project_progress',
+    sa.column('id', sa.Integer),
+    sa.column('version', sa.Integer),
+)
+
+
+def _decompress_text(data):
+    return zlib.decompress(data).decode('utf-8')
+
+
+def _apply_delta(old, delta):
+    """Text produced by applying a zlib-compressed JSON list of line operations to old"""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    position = 0
+    for op_code, value in json.loads(_decompress_text(delta)):
+        if op_code == COPY:
+            parts.extend(old_lines[position:position + value])
+            position += value
+        elif op_code == SKIP:
+            position += value
+        elif op_code == INSERT:
+            parts.append(value)
+        else:
+            raise ValueError(f'Unknown delta operation {op_code}')
+    return ''.join(parts)
+
+
+def _progress_ids(bind):
+    return [row[0] for row in bind.execute(sa.select(progress_history.c.progress_id).distinct())]
+
+
+def _versions(bind, progress_id, *columns):
+    """Rows of one document's history, oldest first, read BATCH_SIZE versions at a time"""
+    versions = [row[0] for row in bind.execute(
+        sa.select(progress_history.c.version)
+        .where(progress_history.c.progress_id == progress_id)
+        .order_by(progress_history.c.version)
+    )]
+    for i in range(0, len(versions), BATCH_SIZE):
+        batch = versions[i:i + BATCH_SIZE]
+        yield from bind.execute(
+            sa.select(progress_history.c.id, progress_history.c.version, *columns)
+            .where(
+                progress_history.c.progress_id == progress_id,
+                progress_history.c.version >= batch[0],
+                progress_history.c.version <= batch[-1]
+            )
+            .order_by(progress_history.c.version)
+        ).all()
+
+
+def _renumber_duplicate_versions(bind):
+    """
+    Give every history row of a document that stored one version twice its own version
+
+    Concurrent updates could both write version N + 1. The rows keep their
+    text and order (version, then id) and are numbered 1..n again; the
+    document's version becomes n.
+    """
+    duplicated = [row[0] for row in bind.execute(
+        sa.select(progress_history.c.progress_id)
+        .group_by(progress_history.c.progress_id, progress_history.c.version)
+        .having(sa.func.count() > 1)
+        .distinct()
+    )]
+    for progress_id in duplicated:
+        history_ids = [row[0] for row in bind.execute(
+            sa.select(progress_history.c.id)
+            .where(progress_history.c.progress_id == progress_id)
+            .order_by(progress_history.c.version, progress_history.c.id)
+        )]
+        for version, history_id in enumerate(history_ids, start=1):
+            bind.execute(
+                progress_history.update().where(progress_history.c.id == history_id).values(version=version)
+            )
+        bind.execute(
+            project_progress.update().where(project_progress.c.id == progress_id).values(
+                version=len(history_ids)
+            )
+        )
+
+
+def upgrade() -> None:
+    _renumber_duplicate_versions(op.get_bind())
+
+    with op.batch_alter_table('progress_history') as batch_op:
+        batch_op.add_column(sa.Column('storage', sa.String(length=10), nullable=False, server_default=FULL))
+        batch_op.add_column(sa.Column(
+            'data', sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'), nullable=True
+        ))
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=True)
+        # Deltas chain onto the previous version, so each version must exist once
+        batch_op.create_unique_constraint('uq_progress_history_version', ['progress_id', 'version'])
+
+    # Existing rows stay plain text; `manage_db.py compress-progress-history` converts them
+
+
+def downgrade() -> None:
+    # Write every version back as plain text
+    bind = op.get_bind()
+    for progress_id in _progress_ids(bind):
+        content = None
+        rows = _versions(bind, progress_id, progress_history.c.storage,
+                         progress_history.c.content, progress_history.c.data)
+        for history_id, version, storage, stored_content, data in rows:
+            if storage == FULL:
+                content = stored_content
+                continue
+            content = _decompress_text(data) if storage == SNAPSHOT else _apply_delta(content, data)
+            bind.execute(
+                progress_history.update().where(progress_history.c.id == history_id).values(
+                    content=content, data=None
+                )
+            )
+
+    with op.batch_alter_table('progress_history') as batch_op:
+        batch_op.drop_constraint('uq_progress_history_version', type_='unique')
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('data')
+        batch_op.drop_column('storage')
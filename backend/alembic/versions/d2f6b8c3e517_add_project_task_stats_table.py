@@ -0,0 +1,93 @@
+"""add_project_task_stats_table
+
+Revision ID: d2f6b8c3e517
+Revises: c4e8a1d9f350
+Create Date: 2026-10-17 17:42:19.305861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8c3e517'
+down_revision: Union[str, None] = 'c4e8a1d9f350'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Task status (stored by enum name) -> rollup column, as of this revision
+STATUS_COLUMNS = {
+    'PENDING': 'pending_tasks',
+    'IN_PROGRESS': 'in_progress_tasks',
+    'REVIEW': 'review_tasks',
+    'DONE': 'done_tasks',
+    'BLOCKED': 'blocked_tasks',
+    'CANCELLED': 'cancelled_tasks',
+}
+
+
+def _seconds_between(dialect: str, start, end):
+    """SQL for the seconds from start to end"""
+    if dialect == 'mysql':
+        return sa.func.timestampdiff(sa.literal_column('SECOND'), start, end)
+    if dialect == 'postgresql':
+        return sa.extract('epoch', end - start)
+    return (sa.func.julianday(end) - sa.func.julianday(start)) * 86400
+
+
+def upgrade() -> None:
+    op.create_table('project_task_stats',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('pending_tasks', sa.Integer(), nullable=False),
+        sa.Column('in_progress_tasks', sa.Integer(), nullable=False),
+        sa.Column('review_tasks', sa.Integer(), nullable=False),
+        sa.Column('done_tasks', sa.Integer(), nullable=False),
+        sa.Column('blocked_tasks', sa.Integer(), nullable=False),
+        sa.Column('cancelled_tasks', sa.Integer(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('completion_seconds', sa.Float(), nullable=False),
+        sa.Column('last_activity', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+
+    # Fill the rollup from the existing tasks, with one row per project
+    projects = sa.table('projects', sa.column('id'))
+    tasks = sa.table(
+        'tasks',
+        sa.column('project_id'), sa.column('status'),
+        sa.column('created_at'), sa.column('completed_at'), sa.column('updated_at')
+    )
+    project_task_stats = sa.table(
+        'project_task_stats',
+        *[sa.column(column) for column in STATUS_COLUMNS.values()],
+        sa.column('project_id'), sa.column('completed_count'),
+        sa.column('completion_seconds'), sa.column('last_activity')
+    )
+    done_with_time = sa.and_(tasks.c.status == 'DONE', tasks.c.completed_at.is_not(None))
+    seconds = _seconds_between(op.get_context().dialect.name, tasks.c.created_at, tasks.c.completed_at)
+
+    def total(expression):
+        return sa.func.coalesce(sa.func.sum(expression), 0)
+
+    aggregate = sa.select(
+        projects.c.id,
+        *[total(sa.case((tasks.c.status == status, 1), else_=0)) for status in STATUS_COLUMNS],
+        total(sa.case((done_with_time, 1), else_=0)),
+        total(sa.case((done_with_time, seconds), else_=0)),
+        sa.func.max(tasks.c.updated_at)
+    ).select_from(
+        projects.outerjoin(tasks, tasks.c.project_id == projects.c.id)
+    ).group_by(projects.c.id)
+
+    op.execute(project_task_stats.insert().from_select(
+        ['project_id', *STATUS_COLUMNS.values(), 'completed_count', 'completion_seconds', 'last_activity'],
+        aggregate
+    ))
+
+
+def downgrade() -> None:
+    op.drop_table('project_task_stats')
@@ -0,0 +1,36 @@
+"""drop_task_logs_task_foreign_key
+
+Revision ID: e8b3d5a2c719
+Revises: d2f6b8c3e517
+Create Date: 2026-10-17 19:26:51.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3d5a2c719'
+down_revision: Union[str, None] = 'd2f6b8c3e517'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Deletion logs are written for tasks removed in the same transaction and
+    # are kept afterwards, so task_logs.task_id can no longer reference tasks.
+    # The constraint was created unnamed; SQLite reports no name and does not
+    # enforce it unless foreign keys are switched on.
+    for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys('task_logs'):
+        if foreign_key['referred_table'] == 'tasks' and foreign_key['name']:
+            op.drop_constraint(foreign_key['name'], 'task_logs', type_='foreignkey')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    # Logs of deleted tasks would violate the restored constraint
+    op.execute('DELETE FROM task_logs WHERE task_id NOT IN (SELECT id FROM tasks)')
+    op.create_foreign_key(None, 'task_logs', 'tasks', ['task_id'], ['id'])
@@ -0,0 +1,63 @@
+"""add_project_purges_table
+
+Revision ID: f4c1a7e9b362
+Revises: e8b3d5a2c719
+Create Date: 2026-10-17 21:08:44.570163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1a7e9b362'
+down_revision: Union[str, None] = 'e8b3d5a2c719'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # Soft-deleted projects cannot be edited, so their last update is when they were deleted
+    projects = sa.table(
+        'projects', sa.column('is_deleted', sa.Boolean()), sa.column('updated_at'), sa.column('deleted_at')
+    )
+    op.execute(
+        projects.update().where(projects.c.is_deleted == sa.true()).values(deleted_at=projects.c.updated_at)
+    )
+
+    op.create_table('project_purges',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('project_name', sa.String(length=200), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='projectpurgestatus'), nullable=False),
+        sa.Column('phase', sa.String(length=20), nullable=True),
+        sa.Column('total_tasks', sa.Integer(), nullable=True),
+        sa.Column('deleted_tasks', sa.Integer(), nullable=False),
+        sa.Column('deleted_rows', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_purges_id'), 'project_purges', ['id'], unique=False)
+    op.create_index(op.f('ix_project_purges_project_id'), 'project_purges', ['project_id'], unique=False)
+    op.create_index(op.f('ix_project_purges_user_id'), 'project_purges', ['user_id'], unique=False)
+    op.create_index(op.f('ix_project_purges_status'), 'project_purges', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_project_purges_status'), table_name='project_purges')
+    op.drop_index(op.f('ix_project_purges_user_id'), table_name='project_purges')
+    op.drop_index(op.f('ix_project_purges_project_id'), table_name='project_purges')
+    op.drop_index(op.f('ix_project_purges_id'), table_name='project_purges')
+    op.drop_table('project_purges')
+    op.drop_column('projects', 'deleted_at')
@@ -4,7 +4,7 @@ API v1 router configuration
 
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, users, projects, tasks, models, access_keys, project_progress
+from app.api.api_v1.endpoints import auth, users, projects, tasks, models, access_keys, project_progress, jobs
 
 api_router = APIRouter()
 
@@ -15,4 +15,5 @@ api_router.include_router(access_keys.router, prefix="/access-keys", tags=["acce
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
 api_router.include_router(project_progress.router, prefix="/projects", tags=["project-progress"])
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-api_router.include_router(models.router, prefix="/models", tags=["ai-models"])
\ No newline at end of file
+api_router.include_router(models.router, prefix="/models", tags=["ai-models"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
\ No newline at end of file
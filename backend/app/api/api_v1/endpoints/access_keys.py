@@ -25,7 +25,7 @@ router = APIRouter()
 
 
 @router.post("/", response_model=AccessKeyResponse, status_code=status.HTTP_201_CREATED)
-async def create_access_key(
+def create_access_key(
     key_create: AccessKeyCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -47,7 +47,7 @@ async def create_access_key(
 
 
 @router.get("/", response_model=List[AccessKeyListResponse])
-async def get_access_keys(
+def get_access_keys(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_active_user),
@@ -78,7 +78,7 @@ async def get_access_keys(
 
 
 @router.get("/stats", response_model=AccessKeyStats)
-async def get_access_key_stats(
+def get_access_key_stats(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -90,7 +90,7 @@ async def get_access_key_stats(
 
 
 @router.get("/{key_id}", response_model=AccessKeyResponse)
-async def get_access_key(
+def get_access_key(
     key_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -108,7 +108,7 @@ async def get_access_key(
 
 
 @router.put("/{key_id}", response_model=AccessKeyResponse)
-async def update_access_key(
+def update_access_key(
     key_id: int,
     key_update: AccessKeyUpdate,
     current_user: User = Depends(get_current_active_user),
@@ -136,7 +136,7 @@ async def update_access_key(
 
 
 @router.delete("/{key_id}", response_model=MessageResponse)
-async def delete_access_key(
+def delete_access_key(
     key_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -158,7 +158,7 @@ async def delete_access_key(
 
 
 @router.post("/{key_id}/toggle", response_model=AccessKeyResponse)
-async def toggle_access_key_status(
+def toggle_access_key_status(
     key_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -26,7 +26,7 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(
+def register(
     user_create: UserCreate,
     db: Session = Depends(get_db)
 ):
@@ -48,7 +48,7 @@ async def register(
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(
+def login(
     login_data: LoginRequest,
     db: Session = Depends(get_db)
 ):
@@ -100,7 +100,7 @@ async def login(
 
 
 @router.post("/refresh", response_model=RefreshTokenResponse)
-async def refresh_token(
+def refresh_token(
     refresh_data: RefreshTokenRequest,
     db: Session = Depends(get_db)
 ):
@@ -143,7 +143,7 @@ async def refresh_token(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(
+def get_current_user_info(
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -153,7 +153,7 @@ async def get_current_user_info(
 
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout(
+def logout(
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -167,7 +167,7 @@ async def logout(
 
 
 @router.get("/validate-key", response_model=UserResponse)
-async def validate_api_key(
+def validate_api_key(
     current_user: User = Depends(get_current_user_by_api_key)
 ):
     """
@@ -0,0 +1,47 @@
+"""
+Background job endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_db, get_current_user
+from app.models.user import User
+from app.schemas.generation_job import GenerationJobResponse
+from app.schemas.project_purge import ProjectPurgeResponse
+from app.services.generation_job import generation_job_service
+from app.services.project_purge import project_purge_service
+
+router = APIRouter()
+
+
+@router.get("/purges/{purge_id}", response_model=ProjectPurgeResponse)
+def get_purge(
+    purge_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the progress of a permanent project deletion"""
+    purge = project_purge_service.get_purge(db, purge_id, current_user.id)
+    if not purge:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Purge not found"
+        )
+    return ProjectPurgeResponse.from_orm(purge)
+
+
+@router.get("/{job_id}", response_model=GenerationJobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the status and result of an AI generation job"""
+    job = generation_job_service.get_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return GenerationJobResponse.from_orm(job)
@@ -6,22 +6,24 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_db, get_current_user, get_current_superuser
 from app.models.user import User
 from app.schemas.ai_model import (
     AIModelCreate,
     AIModelUpdate,
     AIModelResponse,
     AIModelTestRequest,
-    AIModelTestResponse
+    AIModelTestResponse,
+    AIResponseCacheStats
 )
 from app.services.ai_model import ai_model_service
+from app.services.ai_response_cache import ai_response_cache
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[AIModelResponse])
-async def get_models(
+def get_models(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -38,7 +40,7 @@ async def get_models(
 
 
 @router.post("/", response_model=AIModelResponse, status_code=status.HTTP_201_CREATED)
-async def create_model(
+def create_model(
     model_data: AIModelCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -56,8 +58,25 @@ async def create_model(
         )
 
 
+@router.get("/cache/stats", response_model=AIResponseCacheStats)
+def get_response_cache_stats(
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get AI response cache statistics (admin only)"""
+    return AIResponseCacheStats(**ai_response_cache.stats())
+
+
+@router.delete("/cache")
+def clear_response_cache(
+    current_user: User = Depends(get_current_superuser)
+):
+    """Clear the AI response cache (admin only)"""
+    ai_response_cache.clear()
+    return {"message": "AI response cache cleared"}
+
+
 @router.get("/{model_id}", response_model=AIModelResponse)
-async def get_model(
+def get_model(
     model_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -76,7 +95,7 @@ async def get_model(
 
 
 @router.put("/{model_id}", response_model=AIModelResponse)
-async def update_model(
+def update_model(
     model_id: int,
     model_data: AIModelUpdate,
     db: Session = Depends(get_db),
@@ -96,7 +115,7 @@ async def update_model(
 
 
 @router.delete("/{model_id}")
-async def delete_model(
+def delete_model(
     model_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -113,7 +132,7 @@ async def delete_model(
 
 
 @router.post("/{model_id}/test", response_model=AIModelTestResponse)
-async def test_model(
+def test_model(
     model_id: int,
     test_request: AIModelTestRequest = AIModelTestRequest(),
     db: Session = Depends(get_db),
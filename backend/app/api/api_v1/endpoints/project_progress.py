@@ -3,7 +3,7 @@ Project Progress management endpoints
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -12,7 +12,7 @@ from app.models.user import User
 from app.schemas.project_progress import (
     ProjectProgressCreate, ProjectProgressUpdate, ProjectProgressResponse,
     ProjectProgressWithHistory, ProgressHistoryResponse, ProjectProgressStats,
-    ProgressVersionCompare, ProgressSearchRequest
+    ProgressVersionCompare, ProgressSearchRequest, ProgressSearchHit
 )
 from app.services.project_progress import project_progress_service
 
@@ -20,7 +20,7 @@ router = APIRouter()
 
 
 @router.get("/{project_id}/progress", response_model=ProjectProgressResponse)
-async def get_project_progress(
+def get_project_progress(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -34,7 +34,7 @@ async def get_project_progress(
 
 
 @router.get("/{project_id}/progress/with-history", response_model=ProjectProgressWithHistory)
-async def get_project_progress_with_history(
+def get_project_progress_with_history(
     project_id: int,
     history_limit: int = Query(10, ge=1, le=50, description="Number of history entries to include"),
     db: Session = Depends(get_db),
@@ -51,7 +51,7 @@ async def get_project_progress_with_history(
 
 
 @router.post("/{project_id}/progress", response_model=ProjectProgressResponse)
-async def create_project_progress(
+def create_project_progress(
     project_id: int,
     progress_data: ProjectProgressCreate,
     db: Session = Depends(get_db),
@@ -70,7 +70,7 @@ async def create_project_progress(
 
 
 @router.put("/{project_id}/progress", response_model=ProjectProgressResponse)
-async def update_project_progress(
+def update_project_progress(
     project_id: int,
     progress_data: ProjectProgressUpdate,
     db: Session = Depends(get_db),
@@ -92,7 +92,7 @@ async def update_project_progress(
 
 
 @router.delete("/{project_id}/progress")
-async def delete_project_progress(
+def delete_project_progress(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -106,7 +106,7 @@ async def delete_project_progress(
 
 
 @router.get("/{project_id}/progress/history", response_model=List[ProgressHistoryResponse])
-async def get_progress_history(
+def get_progress_history(
     project_id: int,
     skip: int = Query(0, ge=0, description="Skip count"),
     limit: int = Query(50, ge=1, le=100, description="Limit count"),
@@ -121,7 +121,7 @@ async def get_progress_history(
 
 
 @router.get("/{project_id}/progress/version/{version}", response_model=ProgressHistoryResponse)
-async def get_progress_version(
+def get_progress_version(
     project_id: int,
     version: int,
     db: Session = Depends(get_db),
@@ -138,16 +138,21 @@ async def get_progress_version(
 
 
 @router.get("/{project_id}/progress/compare/{version_a}/{version_b}", response_model=ProgressVersionCompare)
-async def compare_progress_versions(
+def compare_progress_versions(
     project_id: int,
     version_a: int,
     version_b: int,
+    hunks_only: bool = Query(False, description="Return only the diff hunks, without both full contents"),
+    hunk_offset: int = Query(0, ge=0, description="Skip count of hunks"),
+    hunk_limit: Optional[int] = Query(None, ge=1, le=500, description="Limit count of hunks"),
+    context: int = Query(3, ge=0, le=20, description="Context lines around each change"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Compare two versions of progress document"""
     comparison = project_progress_service.compare_versions(
-        db, project_id, version_a, version_b, current_user.id
+        db, project_id, version_a, version_b, current_user.id,
+        hunks_only=hunks_only, hunk_offset=hunk_offset, hunk_limit=hunk_limit, context=context
     )
     if not comparison:
         raise HTTPException(status_code=404, detail="One or both versions not found")
@@ -156,7 +161,7 @@ async def compare_progress_versions(
 
 
 @router.get("/{project_id}/progress/stats", response_model=ProjectProgressStats)
-async def get_progress_stats(
+def get_progress_stats(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -170,7 +175,7 @@ async def get_progress_stats(
 
 
 @router.post("/{project_id}/progress/restore/{version}", response_model=ProjectProgressResponse)
-async def restore_progress_version(
+def restore_progress_version(
     project_id: int,
     version: int,
     change_summary: Optional[str] = Query(None, description="Summary of restoration"),
@@ -188,7 +193,7 @@ async def restore_progress_version(
 
 
 @router.post("/{project_id}/progress/publish", response_model=ProjectProgressResponse)
-async def publish_progress(
+def publish_progress(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -202,7 +207,7 @@ async def publish_progress(
 
 
 @router.post("/{project_id}/progress/unpublish", response_model=ProjectProgressResponse)
-async def unpublish_progress(
+def unpublish_progress(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -217,7 +222,7 @@ async def unpublish_progress(
 
 # Global progress search endpoint
 @router.post("/progress/search", response_model=List[ProjectProgressResponse])
-async def search_progress_documents(
+def search_progress_documents(
     search_request: ProgressSearchRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -233,4 +238,24 @@ async def search_progress_documents(
         
         return [ProjectProgressResponse.from_orm(progress) for progress in results]
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/progress/search/hits", response_model=List[ProgressSearchHit])
+def search_progress_hits(
+    search_request: ProgressSearchRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search progress documents and history versions, with highlighted snippets"""
+    try:
+        hits, total_count = project_progress_service.search_progress_hits(
+            db, current_user.id, search_request
+        )
+        response.headers["X-Total-Count"] = str(total_count)
+        return hits
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,11 +2,19 @@
 Project management endpoints
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user, get_current_user_by_api_key
+from app.core.database import request_session
+from app.core.deps import (
+    get_db, get_current_user, get_current_user_by_api_key, get_current_user_without_session
+)
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 from app.models.user import User
 from app.schemas.project import (
     ProjectCreate,
@@ -22,31 +30,45 @@ from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskResponse, TaskListItem, TaskGenerateRequest, 
     TaskGenerateResponse, TaskSearchRequest, TaskStats as TaskStatsSchema
 )
+from app.schemas.generation_job import GenerationJobResponse
+from app.services.generation_job import generation_job_service, GenerationJobLimitError
 from app.services.project import project_service
-from app.services.task import task_service
+from app.services.task import SEARCH_CURSOR_SORT_FIELDS, task_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ProjectListItem])
-async def get_projects(
+def get_projects(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[ProjectStatus] = Query(None),
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Pagination cursor from the X-Next-Cursor header"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user_by_api_key)
 ):
     """Get all projects for current user"""
-    if search:
-        projects = project_service.search_projects(db, current_user.id, search, skip, limit)
-    else:
-        projects = project_service.get_projects(db, current_user.id, skip, limit, status)
+    try:
+        if search:
+            projects = project_service.search_projects(db, current_user.id, search, skip, limit, cursor=cursor)
+        else:
+            projects = project_service.get_projects(db, current_user.id, skip, limit, status, cursor=cursor)
+    except ValueError as e:
+        # "status" is shadowed by the query parameter here
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    cursor_value = next_cursor(projects, limit, project_service.project_cursor_key)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    
+    # Load stats for the whole page in one query
+    stats_by_project = project_service.get_projects_stats(db, [project.id for project in projects])
     
-    # Add stats to each project
     projects_with_stats = []
     for project in projects:
-        stats = project_service.get_project_stats(db, project.id, current_user.id)
+        stats = stats_by_project.get(project.id)
         project_dict = {
             "id": project.id,
             "name": project.name,
@@ -63,7 +85,7 @@ async def get_projects(
 
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_project(
+def create_project(
     project_data: ProjectCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -80,7 +102,7 @@ async def create_project(
 
 
 @router.get("/{project_id}", response_model=ProjectWithStats)
-async def get_project(
+def get_project(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -105,7 +127,7 @@ async def get_project(
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
-async def update_project(
+def update_project(
     project_id: int,
     project_data: ProjectUpdate,
     db: Session = Depends(get_db),
@@ -123,14 +145,28 @@ async def update_project(
 
 
 @router.delete("/{project_id}")
-async def delete_project(
+def delete_project(
     project_id: int,
     hard_delete: bool = Query(False, description="Permanently delete the project"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete project (soft delete by default)"""
-    success = project_service.delete_project(db, project_id, current_user.id, soft_delete=not hard_delete)
+    """
+    Delete project (soft delete by default)
+    
+    A hard delete hides the project and removes its data in the background;
+    poll GET /jobs/purges/{purge_id} for progress.
+    """
+    if hard_delete:
+        purge = project_service.purge_project(db, project_id, current_user.id)
+        if not purge:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        return {"message": "Project deleted successfully", "purge_id": purge.id}
+    
+    success = project_service.delete_project(db, project_id, current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -141,13 +177,16 @@ async def delete_project(
 
 
 @router.post("/{project_id}/restore", response_model=ProjectResponse)
-async def restore_project(
+def restore_project(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Restore a soft-deleted project"""
-    project = project_service.restore_project(db, project_id, current_user.id)
+    try:
+        project = project_service.restore_project(db, project_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,7 +197,7 @@ async def restore_project(
 
 
 @router.get("/{project_id}/stats", response_model=ProjectStats)
-async def get_project_stats(
+def get_project_stats(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -175,7 +214,7 @@ async def get_project_stats(
 
 
 @router.get("/{project_id}/settings", response_model=dict)
-async def get_project_settings(
+def get_project_settings(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -192,7 +231,7 @@ async def get_project_settings(
 
 
 @router.put("/{project_id}/settings", response_model=ProjectResponse)
-async def update_project_settings(
+def update_project_settings(
     project_id: int,
     settings_data: ProjectSettingsUpdate,
     db: Session = Depends(get_db),
@@ -211,11 +250,13 @@ async def update_project_settings(
 
 # Task management endpoints for projects
 @router.get("/{project_id}/tasks", response_model=List[TaskListItem])
-async def get_project_tasks(
+def get_project_tasks(
     project_id: int,
+    response: Response,
     parent_id: Optional[int] = Query(None, description="父任务ID筛选"),
     skip: int = Query(0, ge=0, description="跳过数量"),
     limit: int = Query(50, ge=1, le=100, description="限制数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user_by_api_key)
 ):
@@ -229,47 +270,30 @@ async def get_project_tasks(
         )
     
     try:
-        tasks = task_service.get_tasks(
+        tasks = task_service.get_task_list(
             db=db,
             user_id=current_user.id,
             project_id=project_id,
             parent_id=parent_id,
             skip=skip,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
         
-        # Convert to list items with counts
-        task_items = []
-        for task in tasks:
-            item_dict = {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "priority": task.priority,
-                "project_id": task.project_id,
-                "parent_id": task.parent_id,
-                "order_index": task.order_index,
-                "estimated_hours": task.estimated_hours,
-                "actual_hours": task.actual_hours,
-                "assignee_id": task.assignee_id,
-                "due_date": task.due_date,
-                "completed_at": task.completed_at,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-                "subtask_count": len(task.subtasks),
-                "dependency_count": len(task.dependencies)
-            }
-            task_items.append(TaskListItem(**item_dict))
+        cursor_value = next_cursor(tasks, limit, task_service.task_cursor_key)
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
         
-        return task_items
+        return tasks
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/{project_id}/tasks", response_model=TaskResponse)
-async def create_project_task(
+def create_project_task(
     project_id: int,
     task_data: TaskCreate,
     db: Session = Depends(get_db),
@@ -295,15 +319,14 @@ async def create_project_task(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{project_id}/tasks/generate", response_model=TaskGenerateResponse)
-async def generate_project_tasks(
+def _queue_generation_job(
+    db: Session,
     project_id: int,
     generate_request: TaskGenerateRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
 ):
-    """Generate tasks for a specific project using AI"""
-    # Verify project ownership
+    """Queue an AI generation job for a project the current user owns"""
     project = project_service.get_project(db, project_id, current_user.id)
     if not project:
         raise HTTPException(
@@ -312,19 +335,127 @@ async def generate_project_tasks(
         )
     
     try:
-        result = task_service.generate_tasks_with_ai(
+        return generation_job_service.create_job(
             db=db,
             user_id=current_user.id,
             project_id=project_id,
-            generate_request=generate_request
+            generate_request=generate_request,
+            on_event=on_event
         )
-        return result
+    except GenerationJobLimitError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _queue_generation_job_id(
+    project_id: int,
+    generate_request: TaskGenerateRequest,
+    current_user: User,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> int:
+    """
+    Queue an AI generation job and return its ID
+    
+    The session is closed before the caller waits for the job, so waiting
+    requests do not hold request session slots.
+    """
+    async with request_session() as db:
+        job = await run_in_threadpool(
+            _queue_generation_job, db, project_id, generate_request, current_user, on_event
+        )
+        return job.id
+
+
+@router.post("/{project_id}/tasks/generate", response_model=TaskGenerateResponse)
+async def generate_project_tasks(
+    project_id: int,
+    generate_request: TaskGenerateRequest,
+    current_user: User = Depends(get_current_user_without_session)
+):
+    """
+    Generate tasks for a specific project using AI
+    
+    Runs as a background generation job and waits for it without blocking
+    the event loop or holding a database session. Use
+    POST /{project_id}/tasks/generate/jobs to poll instead.
+    """
+    job_id = await _queue_generation_job_id(project_id, generate_request, current_user)
+    
+    result = None
+    future = generation_job_service.job_future(job_id)
+    if future is not None:
+        result = await asyncio.wrap_future(future)
+    if not result:
+        async with request_session() as db:
+            job = await run_in_threadpool(generation_job_service.get_job, db, job_id, current_user.id)
+            result = job.result or {"success": False, "message": job.error or "Task generation failed"}
+    return TaskGenerateResponse(**result)
+
+
+@router.post(
+    "/{project_id}/tasks/generate/jobs",
+    response_model=GenerationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def create_generation_job(
+    project_id: int,
+    generate_request: TaskGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue AI task generation for a project; poll GET /jobs/{job_id} for the result"""
+    job = _queue_generation_job(db, project_id, generate_request, current_user)
+    return GenerationJobResponse.from_orm(job)
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/{project_id}/tasks/generate/stream")
+async def stream_project_tasks(
+    project_id: int,
+    generate_request: TaskGenerateRequest,
+    current_user: User = Depends(get_current_user_without_session)
+):
+    """
+    Generate tasks using AI and stream them as server-sent events
+    
+    Events: "job" with the job ID, "started" when a worker picks the job up,
+    "task" for each task as soon as it is saved, and "done" with the final
+    TaskGenerateResponse. Generation continues if the client disconnects;
+    the result stays available from GET /jobs/{job_id}.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def on_event(event: str, data: Dict[str, Any]):
+        # Called from the worker thread
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+    
+    job_id = await _queue_generation_job_id(project_id, generate_request, current_user, on_event=on_event)
+    
+    async def event_stream():
+        yield _sse_event("job", {"job_id": job_id})
+        while True:
+            event, data = await events.get()
+            yield _sse_event(event, data)
+            if event == "done":
+                break
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{project_id}/tasks/stats", response_model=TaskStatsSchema)
-async def get_project_task_stats(
+def get_project_task_stats(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -350,8 +481,9 @@ async def get_project_task_stats(
 
 
 @router.get("/{project_id}/tasks/search", response_model=List[TaskListItem])
-async def search_project_tasks(
+def search_project_tasks(
     project_id: int,
+    response: Response,
     search_request: TaskSearchRequest = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -367,40 +499,27 @@ async def search_project_tasks(
     
     try:
         # Override search to only include this project
-        tasks, total_count = task_service.search_tasks(
+        tasks, total_count = task_service.search_task_list(
             db=db,
             user_id=current_user.id,
             search_request=search_request
         )
         
+        # Relevance order has no keyset cursor; those searches page with skip
+        if search_request.sort_by in SEARCH_CURSOR_SORT_FIELDS:
+            cursor_value = next_cursor(
+                tasks, search_request.limit,
+                lambda task: task_service.search_cursor_key(task, search_request.sort_by)
+            )
+            if cursor_value:
+                response.headers[NEXT_CURSOR_HEADER] = cursor_value
+        
         # Filter tasks to only include this project
         project_tasks = [task for task in tasks if task.project_id == project_id]
         
-        # Convert to list items
-        task_items = []
-        for task in project_tasks:
-            item_dict = {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "priority": task.priority,
-                "project_id": task.project_id,
-                "parent_id": task.parent_id,
-                "order_index": task.order_index,
-                "estimated_hours": task.estimated_hours,
-                "actual_hours": task.actual_hours,
-                "assignee_id": task.assignee_id,
-                "due_date": task.due_date,
-                "completed_at": task.completed_at,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-                "subtask_count": len(task.subtasks),
-                "dependency_count": len(task.dependencies)
-            }
-            task_items.append(TaskListItem(**item_dict))
-        
-        return task_items
+        return project_tasks
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
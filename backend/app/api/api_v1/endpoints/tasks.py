@@ -3,75 +3,64 @@ Task management endpoints
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_current_user_without_session
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 from app.models.user import User
+from app.api.api_v1.endpoints.projects import generate_project_tasks
 from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskResponse, TaskListItem, TaskStatusUpdate,
     TaskBatchUpdate, TaskBatchStatusUpdate, TaskGenerateRequest, TaskGenerateResponse,
-    TaskSearchRequest, TaskStats, TaskStatus, TaskLogResponse, TaskWithLogs
+    TaskSearchRequest, TaskStats, TaskStatus, TaskLogResponse, TaskWithLogs,
+    TaskBulkCreate, TaskBulkCreateResponse
 )
-from app.services.task import task_service
+from app.services.task import SEARCH_CURSOR_SORT_FIELDS, task_service
+from app.services.task_log import task_log_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TaskListItem])
-async def get_tasks(
+def get_tasks(
+    response: Response,
     project_id: Optional[int] = Query(None, description="项目ID筛选"),
     parent_id: Optional[int] = Query(None, description="父任务ID筛选"),
     status: Optional[List[TaskStatus]] = Query(None, description="状态筛选"),
     skip: int = Query(0, ge=0, description="跳过数量"),
     limit: int = Query(50, ge=1, le=100, description="限制数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get tasks with optional filtering"""
     try:
-        tasks = task_service.get_tasks(
+        tasks = task_service.get_task_list(
             db=db,
             user_id=current_user.id,
             project_id=project_id,
             parent_id=parent_id,
             skip=skip,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
         
-        # Convert to list items with counts
-        task_items = []
-        for task in tasks:
-            item_dict = {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "priority": task.priority,
-                "project_id": task.project_id,
-                "parent_id": task.parent_id,
-                "order_index": task.order_index,
-                "estimated_hours": task.estimated_hours,
-                "actual_hours": task.actual_hours,
-                "assignee_id": task.assignee_id,
-                "due_date": task.due_date,
-                "completed_at": task.completed_at,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-                "subtask_count": len(task.subtasks),
-                "dependency_count": len(task.dependencies)
-            }
-            task_items.append(TaskListItem(**item_dict))
+        cursor_value = next_cursor(tasks, limit, task_service.task_cursor_key)
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
         
-        return task_items
+        return tasks
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/", response_model=TaskResponse)
-async def create_task(
+def create_task(
     task_data: TaskCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -86,72 +75,76 @@ async def create_task(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate", response_model=TaskGenerateResponse)
-async def generate_tasks(
-    project_id: int,
-    generate_request: TaskGenerateRequest,
+@router.post("/bulk", response_model=TaskBulkCreateResponse)
+def bulk_create_tasks(
+    bulk_data: TaskBulkCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Generate tasks using AI"""
+    """Create many tasks in one transaction"""
     try:
-        result = task_service.generate_tasks_with_ai(
+        task_ids = task_service.bulk_create_tasks(
             db=db,
             user_id=current_user.id,
-            project_id=project_id,
-            generate_request=generate_request
+            tasks_data=bulk_data.tasks,
+            project_id=bulk_data.project_id
         )
-        return result
+        return TaskBulkCreateResponse(created_ids=task_ids, total_created=len(task_ids))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate", response_model=TaskGenerateResponse)
+async def generate_tasks(
+    project_id: int,
+    generate_request: TaskGenerateRequest,
+    current_user: User = Depends(get_current_user_without_session)
+):
+    """
+    Generate tasks using AI
+    
+    Same as POST /projects/{project_id}/tasks/generate: runs as a generation
+    job on the worker pool, under the per-user and per-model limits.
+    """
+    return await generate_project_tasks(project_id, generate_request, current_user)
+
+
 @router.get("/search", response_model=List[TaskListItem])
-async def search_tasks(
+def search_tasks(
+    response: Response,
     search_request: TaskSearchRequest = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Search tasks with advanced filters"""
     try:
-        tasks, total_count = task_service.search_tasks(
+        tasks, total_count = task_service.search_task_list(
             db=db,
             user_id=current_user.id,
             search_request=search_request
         )
         
-        # Convert to list items
-        task_items = []
-        for task in tasks:
-            item_dict = {
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "priority": task.priority,
-                "project_id": task.project_id,
-                "parent_id": task.parent_id,
-                "order_index": task.order_index,
-                "estimated_hours": task.estimated_hours,
-                "actual_hours": task.actual_hours,
-                "assignee_id": task.assignee_id,
-                "due_date": task.due_date,
-                "completed_at": task.completed_at,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-                "subtask_count": len(task.subtasks),
-                "dependency_count": len(task.dependencies)
-            }
-            task_items.append(TaskListItem(**item_dict))
+        # Relevance order has no keyset cursor; those searches page with skip
+        if search_request.sort_by in SEARCH_CURSOR_SORT_FIELDS:
+            cursor_value = next_cursor(
+                tasks, search_request.limit,
+                lambda task: task_service.search_cursor_key(task, search_request.sort_by)
+            )
+            if cursor_value:
+                response.headers[NEXT_CURSOR_HEADER] = cursor_value
         
-        return task_items
+        return tasks
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/stats", response_model=TaskStats)
-async def get_task_stats(
+def get_task_stats(
     project_id: Optional[int] = Query(None, description="项目ID筛选"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -169,13 +162,14 @@ async def get_task_stats(
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(
+def get_task(
     task_id: int,
+    max_depth: Optional[int] = Query(None, ge=0, le=100, description="子任务加载层数"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get task by ID"""
-    task = task_service.get_task(db=db, task_id=task_id, user_id=current_user.id)
+    """Get task by ID with its subtask tree"""
+    task = task_service.get_task_tree(db=db, task_id=task_id, user_id=current_user.id, max_depth=max_depth)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -183,7 +177,7 @@ async def get_task(
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-async def update_task(
+def update_task(
     task_id: int,
     task_data: TaskUpdate,
     db: Session = Depends(get_db),
@@ -208,7 +202,7 @@ async def update_task(
 
 
 @router.patch("/{task_id}/status", response_model=TaskResponse)
-async def update_task_status(
+def update_task_status(
     task_id: int,
     status_data: TaskStatusUpdate,
     db: Session = Depends(get_db),
@@ -231,7 +225,7 @@ async def update_task_status(
 
 
 @router.delete("/{task_id}")
-async def delete_task(
+def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -245,7 +239,7 @@ async def delete_task(
 
 
 @router.post("/batch/update", response_model=List[TaskResponse])
-async def batch_update_tasks(
+def batch_update_tasks(
     batch_data: TaskBatchUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -263,7 +257,7 @@ async def batch_update_tasks(
 
 
 @router.post("/batch/status", response_model=List[TaskResponse])
-async def batch_update_status(
+def batch_update_status(
     batch_data: TaskBatchStatusUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -281,7 +275,7 @@ async def batch_update_status(
 
 
 @router.post("/{task_id}/dependencies/{depends_on_id}")
-async def add_dependency(
+def add_dependency(
     task_id: int,
     depends_on_id: int,
     db: Session = Depends(get_db),
@@ -306,7 +300,7 @@ async def add_dependency(
 
 
 @router.delete("/{task_id}/dependencies/{depends_on_id}")
-async def remove_dependency(
+def remove_dependency(
     task_id: int,
     depends_on_id: int,
     db: Session = Depends(get_db),
@@ -329,10 +323,12 @@ async def remove_dependency(
 
 
 @router.get("/{task_id}/logs", response_model=List[TaskLogResponse])
-async def get_task_logs(
+def get_task_logs(
     task_id: int,
+    response: Response,
     skip: int = Query(0, ge=0, description="跳过数量"),
     limit: int = Query(50, ge=1, le=100, description="限制数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -343,22 +339,30 @@ async def get_task_logs(
             task_id=task_id,
             user_id=current_user.id,
             skip=skip,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
+        
+        cursor_value = next_cursor(logs, limit, task_log_service.log_cursor_key)
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
+        
         return [TaskLogResponse.from_orm(log) for log in logs]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{task_id}/with-logs", response_model=TaskWithLogs)
-async def get_task_with_logs(
+def get_task_with_logs(
     task_id: int,
     logs_limit: int = Query(20, ge=1, le=100, description="日志数量限制"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get task with its change logs"""
-    task = task_service.get_task(db=db, task_id=task_id, user_id=current_user.id)
+    task = task_service.get_task_tree(db=db, task_id=task_id, user_id=current_user.id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -12,12 +12,13 @@ from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.auth import MessageResponse
 from app.models.user import User
 from app.services.auth import AuthService
+from app.services.auth_cache import auth_cache
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(
+def get_current_user_profile(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get current user profile"""
@@ -25,7 +26,7 @@ async def get_current_user_profile(
 
 
 @router.put("/me", response_model=UserResponse)
-async def update_current_user_profile(
+def update_current_user_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -53,11 +54,14 @@ async def update_current_user_profile(
     
     db.commit()
     db.refresh(current_user)
+    
+    # Cached sessions of this user must see the new profile
+    auth_cache.invalidate_user(current_user.id)
     return current_user
 
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(
+def get_users(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_superuser),
@@ -69,7 +73,7 @@ async def get_users(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user_by_id(
+def get_user_by_id(
     user_id: int,
     current_user: User = Depends(get_current_superuser),
     db: Session = Depends(get_db)
@@ -85,7 +89,7 @@ async def get_user_by_id(
 
 
 @router.delete("/{user_id}", response_model=MessageResponse)
-async def delete_user(
+def delete_user(
     user_id: int,
     current_user: User = Depends(get_current_superuser),
     db: Session = Depends(get_db)
@@ -107,6 +111,8 @@ async def delete_user(
     db.delete(user)
     db.commit()
     
+    auth_cache.invalidate_user(user_id)
+    
     return MessageResponse(
         message=f"User {user.username} deleted successfully",
         success=True
@@ -28,6 +28,24 @@ class Settings(BaseSettings):
     MYSQL_PASSWORD: str = Field("", description="MySQL password")
     MYSQL_DATABASE: str = Field("taskmaster", description="MySQL database name")
     
+    # Database connection pool, per worker process. DB_POOL_PRE_PING: "always"
+    # pings every checkout, "idle" only connections idle for longer than
+    # DB_POOL_PRE_PING_IDLE_SECONDS, "never" relies on DB_POOL_RECYCLE alone
+    DB_POOL_SIZE: int = Field(10, description="Connections kept open in the pool")
+    DB_MAX_OVERFLOW: int = Field(20, description="Extra connections opened under load")
+    DB_POOL_TIMEOUT: float = Field(30.0, description="Seconds to wait for a free connection")
+    DB_POOL_RECYCLE: int = Field(300, description="Seconds before a connection is replaced")
+    DB_POOL_PRE_PING: str = Field("idle", description="Connection liveness check: always, idle or never")
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = Field(30.0, description="Idle time after which idle pre-ping checks a connection")
+    
+    # Prometheus-style metrics at /metrics (connection pool telemetry)
+    METRICS_ENABLED: bool = Field(True, description="Expose /metrics")
+    
+    # SQL statement report for test runs: statements and database time per
+    # route, logged (and written to SQL_STATEMENT_REPORT_PATH) at shutdown
+    SQL_STATEMENT_REPORT: bool = Field(False, description="Record SQL statements per route")
+    SQL_STATEMENT_REPORT_PATH: str = Field("", description="File the SQL statement report is written to")
+    
     # CORS
     BACKEND_CORS_ORIGINS: str = Field(
         default="http://localhost:3000,http://127.0.0.1:3000",
@@ -38,9 +56,127 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = Field(None, description="OpenAI API key")
     OPENAI_MODEL: str = Field("gpt-3.5-turbo", description="Default OpenAI model")
     
+    # Authenticated user cache (0 disables it)
+    AUTH_CACHE_TTL_SECONDS: int = Field(60, description="Seconds an authenticated token or key stays cached")
+    AUTH_CACHE_MAX_SIZE: int = Field(10000, description="Maximum number of cached credentials")
+    
+    # Access key last_used_at write-behind (seconds between bulk flushes)
+    ACCESS_KEY_USAGE_FLUSH_INTERVAL_SECONDS: float = Field(30.0, description="Access key usage flush interval")
+    
+    # Task dependency graph cache (seconds before a project graph is reloaded even
+    # if its edge count and highest edge ID are unchanged)
+    DEPENDENCY_GRAPH_TTL_SECONDS: int = Field(300, description="Dependency graph index TTL")
+    
+    # Task search: "fulltext" uses the MySQL FULLTEXT index, or an in-memory
+    # inverted index per project on other databases; "like" is a plain
+    # substring filter. The in-memory index returns at most
+    # TASK_SEARCH_MAX_RESULTS best matches per search
+    TASK_SEARCH_MODE: str = Field("fulltext", description="Task search mode: fulltext or like")
+    TASK_SEARCH_INDEX_TTL_SECONDS: int = Field(300, description="Seconds before a project search index is reloaded")
+    TASK_SEARCH_MAX_RESULTS: int = Field(5000, description="Maximum matches of the in-memory search index")
+    
+    # Progress history storage: "delta" keeps a compressed full snapshot every
+    # PROGRESS_SNAPSHOT_INTERVAL versions and compressed line deltas in
+    # between; "full" stores every version as plain text. Reconstructed
+    # versions are cached per process
+    PROGRESS_HISTORY_STORAGE: str = Field("delta", description="Progress history storage: delta or full")
+    PROGRESS_SNAPSHOT_INTERVAL: int = Field(50, description="Versions between full progress snapshots")
+    PROGRESS_VERSION_CACHE_SIZE: int = Field(64, description="Reconstructed progress versions kept in memory")
+    
+    # Progress search: history versions are only indexed once a search asks
+    # for them. At most PROGRESS_SEARCH_MAX_INDEXES project indexes are kept
+    # in memory, and indexes unused for PROGRESS_SEARCH_INDEX_TTL_SECONDS are
+    # dropped
+    PROGRESS_SEARCH_MAX_INDEXES: int = Field(100, description="Project progress search indexes kept in memory")
+    PROGRESS_SEARCH_INDEX_TTL_SECONDS: int = Field(1800, description="Seconds an unused progress search index is kept")
+    
+    # Version comparison: regions needing more line edits than
+    # PROGRESS_DIFF_MAX_EDIT_DISTANCE (or too much work for their size) are
+    # diffed with difflib instead of as a shortest edit script, which bounds
+    # the cost of diffing very different versions. Computed diffs are cached
+    # per process
+    PROGRESS_DIFF_MAX_EDIT_DISTANCE: int = Field(1000, description="Line edits computed per changed region before falling back to difflib")
+    PROGRESS_DIFF_CACHE_SIZE: int = Field(128, description="Computed version diffs kept in memory")
+    
+    # Task audit logs: "transaction" writes log rows in the caller's transaction
+    # (committed atomically with the change), "deferred" queues them in memory
+    # and bulk inserts them from a background thread (may lose up to one flush
+    # interval of log rows if the process dies)
+    TASK_LOG_MODE: str = Field("transaction", description="Task log write mode: transaction or deferred")
+    TASK_LOG_FLUSH_INTERVAL_SECONDS: float = Field(1.0, description="Deferred task log flush interval")
+    TASK_LOG_BATCH_SIZE: int = Field(500, description="Deferred task log rows per bulk insert")
+    TASK_LOG_QUEUE_MAX_SIZE: int = Field(10000, description="Deferred task log queue capacity")
+    
+    # AI task generation jobs: generation runs on a bounded worker pool, with
+    # limits on concurrently running jobs per user and per AI model. Disable
+    # recovery on startup when several processes share one database, since
+    # each process only knows the jobs it queued itself
+    AI_JOB_WORKERS: int = Field(4, description="AI generation worker threads")
+    AI_JOB_MAX_PER_USER: int = Field(2, description="Running AI generation jobs per user")
+    AI_JOB_MAX_PER_MODEL: int = Field(4, description="Running AI generation jobs per AI model")
+    AI_JOB_MAX_PENDING_PER_USER: int = Field(10, description="Queued or running AI generation jobs per user")
+    AI_JOB_RECOVER_ON_STARTUP: bool = Field(True, description="Requeue unfinished AI generation jobs on startup")
+    
+    # Permanent project deletion: a background worker deletes a project's
+    # rows in chunks of PROJECT_PURGE_CHUNK_SIZE, one transaction per chunk,
+    # and resumes unfinished purges after a restart. Soft-deleted projects
+    # are purged PROJECT_PURGE_RETENTION_DAYS after deletion (0 keeps them).
+    # Run the worker on one process when several share a database
+    PROJECT_PURGE_WORKER_ENABLED: bool = Field(True, description="Run the project purge worker in this process")
+    PROJECT_PURGE_CHUNK_SIZE: int = Field(500, description="Rows deleted per purge transaction")
+    PROJECT_PURGE_INTERVAL_SECONDS: float = Field(3600.0, description="Seconds between scans for expired soft-deleted projects")
+    PROJECT_PURGE_RETENTION_DAYS: int = Field(30, description="Days a soft-deleted project is kept before it is purged")
+    
+    # AI response cache: "memory" (per process LRU), "sqlite" (local file at
+    # AI_CACHE_PATH) or "none"; identical generation requests reuse the response
+    AI_CACHE_BACKEND: str = Field("memory", description="AI response cache backend: memory, sqlite or none")
+    AI_CACHE_TTL_SECONDS: int = Field(86400, description="Seconds a cached AI response stays valid")
+    AI_CACHE_MAX_ENTRIES: int = Field(1000, description="Maximum number of cached AI responses")
+    AI_CACHE_PATH: str = Field("ai_response_cache.sqlite3", description="SQLite file of the sqlite cache backend")
+    
+    # Threads running sync endpoints and dependencies (all database work) off
+    # the event loop. Keep it near the database pool size plus overflow; extra
+    # threads only wait for a connection
+    SYNC_WORKER_THREADS: int = Field(40, description="Thread pool size for sync endpoints")
+    
     # Logging
     LOG_LEVEL: str = Field("INFO", description="Logging level")
     
+    @validator('TASK_LOG_MODE')
+    def validate_task_log_mode(cls, v):
+        allowed_modes = ['transaction', 'deferred']
+        if v.lower() not in allowed_modes:
+            raise ValueError(f'TASK_LOG_MODE must be one of: {", ".join(allowed_modes)}')
+        return v.lower()
+    
+    @validator('TASK_SEARCH_MODE')
+    def validate_task_search_mode(cls, v):
+        allowed_modes = ['fulltext', 'like']
+        if v.lower() not in allowed_modes:
+            raise ValueError(f'TASK_SEARCH_MODE must be one of: {", ".join(allowed_modes)}')
+        return v.lower()
+    
+    @validator('PROGRESS_HISTORY_STORAGE')
+    def validate_progress_history_storage(cls, v):
+        allowed_modes = ['delta', 'full']
+        if v.lower() not in allowed_modes:
+            raise ValueError(f'PROGRESS_HISTORY_STORAGE must be one of: {", ".join(allowed_modes)}')
+        return v.lower()
+    
+    @validator('DB_POOL_PRE_PING')
+    def validate_db_pool_pre_ping(cls, v):
+        allowed_strategies = ['always', 'idle', 'never']
+        if v.lower() not in allowed_strategies:
+            raise ValueError(f'DB_POOL_PRE_PING must be one of: {", ".join(allowed_strategies)}')
+        return v.lower()
+    
+    @validator('AI_CACHE_BACKEND')
+    def validate_ai_cache_backend(cls, v):
+        allowed_backends = ['memory', 'sqlite', 'none']
+        if v.lower() not in allowed_backends:
+            raise ValueError(f'AI_CACHE_BACKEND must be one of: {", ".join(allowed_backends)}')
+        return v.lower()
+    
     @property
     def cors_origins(self) -> List[str]:
         """Parse CORS origins from comma-separated string"""
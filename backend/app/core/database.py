@@ -2,23 +2,30 @@
 Database configuration and session management
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from anyio import CapacityLimiter, Semaphore, to_thread
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 import logging
 
 from app.core.config import settings
+from app.core.db_pool import install_idle_pre_ping, pool_options
 
 logger = logging.getLogger(__name__)
 
 # Create database engine
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    pool_recycle=300,
     echo=settings.LOG_LEVEL.upper() == "DEBUG",
+    **pool_options(settings.database_url, settings),
 )
+if settings.DB_POOL_PRE_PING == "idle":
+    install_idle_pre_ping(engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -27,19 +34,75 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+class _RequestSessionLimits:
+    """
+    Limits for request sessions, created per event loop
+    
+    A session holds its pooled connection from its first query until it is
+    closed, which happens after the endpoint and response validation have
+    run on the thread pool. If more sessions were open than the pool has
+    connections, threads could all wait for a connection held by requests
+    that themselves wait for a thread, deadlocking until pool_timeout. So
+    requests wait on the event loop for a session slot (at most the pool
+    capacity), and sessions are closed on threads of their own.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.slots: Optional[Semaphore] = None
+        self.closers: Optional[CapacityLimiter] = None
+
+    @staticmethod
+    def capacity() -> int:
+        pool = SessionLocal.kw["bind"].pool
+        if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+            return pool.size() + pool._max_overflow
+        return settings.SYNC_WORKER_THREADS
+
+    def current(self) -> "_RequestSessionLimits":
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            capacity = self.capacity()
+            self.slots = Semaphore(capacity)
+            self.closers = CapacityLimiter(capacity)
+            self._loop = loop
+        return self
+
+
+_request_session_limits = _RequestSessionLimits()
+
+
+@asynccontextmanager
+async def request_session():
+    """
+    A session that holds one of the request session slots until it is closed
+    
+    Async endpoints that wait for long without the database (AI generation)
+    use it for their queries instead of get_db, which keeps the slot until
+    the request ends.
+    """
+    limits = _request_session_limits.current()
+    async with limits.slots:
+        db = SessionLocal()
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await to_thread.run_sync(db.rollback, limiter=limits.closers)
+            raise
+        finally:
+            await to_thread.run_sync(db.close, limiter=limits.closers)
+
+
+async def get_db():
     """
     Dependency to get database session
+    
+    Sync endpoints and dependencies use the session on the thread pool;
+    it is opened and closed without blocking the event loop.
     """
-    db = SessionLocal()
-    try:
+    async with request_session() as db:
         yield db
-    except Exception as e:
-        logger.error(f"Database session error: {e}")
-        db.rollback()
-        raise
-    finally:
-        db.close()
 
 
 def create_tables():
@@ -0,0 +1,183 @@
+"""
+Database connection pool configuration and telemetry
+
+InstrumentedQueuePool is a QueuePool that records how long each checkout
+waited for a connection (including opening an overflow connection) and how
+many checkouts timed out. Together with the pool's own checked-out and
+overflow counts this is rendered in the Prometheus text format at /metrics,
+so pools can be sized from measurements. All values are per process.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolStats:
+    """Checkout counters of one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * len(WAIT_BUCKETS)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.pre_pings = 0
+        self.pre_ping_failures = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_pre_ping(self, failed: bool):
+        with self._lock:
+            self.pre_pings += 1
+            if failed:
+                self.pre_ping_failures += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that measures checkout wait time"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        self._checkout = threading.local()
+
+    def _do_get(self):
+        # QueuePool._do_get retries by calling itself; time the outermost call only
+        if getattr(self._checkout, "active", False):
+            return super()._do_get()
+
+        self._checkout.active = True
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        finally:
+            self._checkout.active = False
+        self.stats.record_wait(time.perf_counter() - start)
+        return record
+
+
+def pool_options(database_url: str, settings) -> Dict[str, Any]:
+    """create_engine keyword arguments for the configured pool"""
+    options: Dict[str, Any] = {
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps its own single-connection pool
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def install_idle_pre_ping(engine: Engine, idle_seconds: float):
+    """
+    Ping connections on checkout only when they sat idle for idle_seconds
+
+    Busy connections skip the extra round trip of pool_pre_ping; a failed
+    ping makes the pool discard the connection and retry with a new one.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        stats = getattr(engine.pool, "stats", None)
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            if stats is not None:
+                stats.record_pre_ping(failed=True)
+            logger.warning(f"Discarding stale database connection: {e}")
+            raise exc.DisconnectionError() from e
+        finally:
+            cursor.close()
+        if stats is not None:
+            stats.record_pre_ping(failed=False)
+
+
+def render_pool_metrics(engine: Engine) -> str:
+    """Pool state and checkout statistics in the Prometheus text format"""
+    pool = engine.pool
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str, value: Any):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+
+    if not isinstance(pool, QueuePool):
+        metric("db_pool_instrumented", "gauge", "Whether the pool reports telemetry", 0)
+        return "\n".join(lines) + "\n"
+
+    metric("db_pool_instrumented", "gauge", "Whether the pool reports telemetry", 1)
+    metric("db_pool_size", "gauge", "Configured number of pooled connections", pool.size())
+    metric("db_pool_max_overflow", "gauge", "Configured number of overflow connections", pool._max_overflow)
+    metric("db_pool_checked_out", "gauge", "Connections currently checked out", pool.checkedout())
+    metric("db_pool_checked_in", "gauge", "Idle connections in the pool", pool.checkedin())
+    metric("db_pool_overflow", "gauge", "Overflow connections beyond the pool size (negative while below it)",
+           pool.overflow())
+
+    stats = getattr(pool, "stats", None)
+    if stats is None:
+        return "\n".join(lines) + "\n"
+
+    with stats._lock:
+        name = "db_pool_checkout_wait_seconds"
+        lines.append(f"# HELP {name} Time spent waiting for a connection on checkout")
+        lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(WAIT_BUCKETS, stats.bucket_counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {stats.checkouts}')
+        lines.append(f"{name}_sum {stats.wait_seconds_total:.6f}")
+        lines.append(f"{name}_count {stats.checkouts}")
+        metric("db_pool_checkout_wait_seconds_max", "gauge", "Longest checkout wait",
+               f"{stats.wait_seconds_max:.6f}")
+        metric("db_pool_checkout_timeouts_total", "counter", "Checkouts that hit the pool timeout",
+               stats.timeouts)
+        metric("db_pool_pre_pings_total", "counter", "Idle connections pinged on checkout", stats.pre_pings)
+        metric("db_pool_pre_ping_failures_total", "counter", "Pings that found a stale connection",
+               stats.pre_ping_failures)
+
+    return "\n".join(lines) + "\n"
@@ -4,12 +4,16 @@ Dependency functions for FastAPI
 
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 import logging
 
-from app.core.database import get_db
+from datetime import datetime, timezone
+
+from app.core.database import get_db, request_session
 from app.services.auth import AuthService
+from app.services.auth_cache import auth_cache
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -19,6 +23,12 @@ security = HTTPBearer()
 optional_security = HTTPBearer(auto_error=False)
 
 
+def _token_expiry(payload: dict) -> Optional[datetime]:
+    """Expiry time of a decoded JWT, if it has one"""
+    exp = payload.get("exp")
+    return datetime.fromtimestamp(exp, tz=timezone.utc) if exp is not None else None
+
+
 def get_current_user(
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -33,6 +43,10 @@ def get_current_user(
     )
     
     try:
+        user = auth_cache.get_user(db, credentials.credentials)
+        if user is not None:
+            return user
+        
         # Verify the token
         payload = AuthService.verify_token(credentials.credentials, "access")
         if payload is None:
@@ -53,6 +67,7 @@ def get_current_user(
                 detail="Inactive user"
             )
         
+        auth_cache.put_user(credentials.credentials, user, expires_at=_token_expiry(payload))
         return user
         
     except Exception as e:
@@ -60,6 +75,19 @@ def get_current_user(
         raise credentials_exception
 
 
+async def get_current_user_without_session(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """
+    get_current_user for endpoints that wait for long without the database
+    
+    Authenticates with a session of its own that is closed before the
+    endpoint runs, so the request does not hold a session slot meanwhile.
+    """
+    async with request_session() as db:
+        return await run_in_threadpool(get_current_user, db, credentials)
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -99,6 +127,10 @@ def get_optional_current_user(
         return None
     
     try:
+        user = auth_cache.get_user(db, credentials.credentials)
+        if user is not None:
+            return user
+        
         payload = AuthService.verify_token(credentials.credentials, "access")
         if payload is None:
             return None
@@ -111,6 +143,7 @@ def get_optional_current_user(
         if user is None or not user.is_active:
             return None
         
+        auth_cache.put_user(credentials.credentials, user, expires_at=_token_expiry(payload))
         return user
         
     except Exception:
@@ -133,6 +166,16 @@ def get_current_user_by_api_key(
     
     from app.services.access_key import AccessKeyService
     
+    from app.services.access_key import access_key_usage_tracker
+    
+    # API keys and tokens share the cache, keyed by credential hash
+    principal = auth_cache.get_principal(db, credentials.credentials)
+    if principal is not None:
+        user, key_id = principal
+        if key_id is not None:
+            access_key_usage_tracker.record(key_id)
+        return user
+    
     # Try API key authentication
     user = AccessKeyService.validate_access_key(db, credentials.credentials)
     if user:
@@ -146,6 +189,7 @@ def get_current_user_by_api_key(
             if user_id is not None:
                 user = AuthService.get_user_by_id(db, user_id=int(user_id))
                 if user and user.is_active:
+                    auth_cache.put_user(credentials.credentials, user, expires_at=_token_expiry(payload))
                     return user
     except Exception:
         pass
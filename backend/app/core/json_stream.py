@@ -0,0 +1,99 @@
+"""
+Incremental parser for a streamed JSON array of objects
+
+Models stream their answer a few characters at a time. Rather than waiting
+for the complete text, JSONArrayStreamParser scans each chunk once and
+returns every top-level object of the first JSON array of objects as soon
+as its closing brace arrives. Text before the array (markdown fences, a short
+preamble or a wrapping ``{"tasks": ...}`` object) and after it is ignored.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
+
+class JSONArrayStreamParser:
+    """Emit the objects of a JSON array while it is still being received"""
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0  # Next character of the buffer to scan
+        self._depth = 0  # Nesting depth, 1 = inside the array
+        self._in_string = False
+        self._escaped = False
+        self._object_start: Optional[int] = None
+        self._started = False
+        self._emitted = 0
+        self.finished = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add a chunk of text and return the objects completed by it"""
+        if self.finished:
+            return []
+
+        self._buffer += chunk
+        objects = []
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif not self._started:
+                if char == "[":
+                    self._started = True
+                    self._depth = 1
+            elif char in "[{":
+                if self._depth == 1 and char == "{":
+                    self._object_start = pos
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 1 and char == "}" and self._object_start is not None:
+                    parsed = self._parse_object(buffer[self._object_start:pos + 1])
+                    if parsed is not None:
+                        objects.append(parsed)
+                        self._emitted += 1
+                    self._object_start = None
+                elif self._depth == 0:
+                    if not self._emitted:
+                        # A bracket in a preamble, not the task array: keep looking
+                        self._started = False
+                        continue
+                    self.finished = True
+                    break
+
+        # Keep only the text of the object still being received
+        keep_from = self._object_start if self._object_start is not None else len(buffer)
+        self._buffer = buffer[keep_from:]
+        self._pos = len(buffer) - keep_from
+        if self._object_start is not None:
+            self._object_start = 0
+        return objects
+
+    @staticmethod
+    def _parse_object(text: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        try:
+            return json.loads(_TRAILING_COMMA.sub(r'\1', text))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed object in streamed JSON: {e}")
+            return None
@@ -0,0 +1,69 @@
+"""
+Compressed line deltas between document versions
+
+A delta turns one text into the next with three kinds of operations on
+lines (line endings included): copy lines of the old text, skip lines of
+the old text, or insert new text. The operations are stored as compact JSON
+compressed with zlib; full texts are stored zlib-compressed as well.
+
+The format is persisted in progress_history.data, so changes to it must
+keep reading existing deltas.
+"""
+
+import json
+import zlib
+from typing import List
+
+from app.core.line_diff import diff_lines
+
+COPY = 0
+SKIP = 1
+INSERT = 2
+
+COMPRESSION_LEVEL = 6
+
+
+def compress_text(text: str) -> bytes:
+    """Compressed UTF-8 text"""
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def make_delta(old: str, new: str) -> bytes:
+    """Compressed delta that turns old into new"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+
+    ops: List[list] = []
+    for tag, i1, i2, j1, j2 in diff_lines(old_lines, new_lines).opcodes:
+        if tag == "equal":
+            ops.append([COPY, i2 - i1])
+            continue
+        if i2 > i1:
+            ops.append([SKIP, i2 - i1])
+        if j2 > j1:
+            ops.append([INSERT, "".join(new_lines[j1:j2])])
+
+    payload = json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(payload.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    """Text produced by applying a make_delta delta to old"""
+    old_lines = old.splitlines(keepends=True)
+    parts: List[str] = []
+    position = 0
+    for op, value in json.loads(zlib.decompress(delta).decode("utf-8")):
+        if op == COPY:
+            parts.extend(old_lines[position:position + value])
+            position += value
+        elif op == SKIP:
+            position += value
+        elif op == INSERT:
+            parts.append(value)
+        else:
+            raise ValueError(f"Unknown delta operation {op}")
+    return "".join(parts)
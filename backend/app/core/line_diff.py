@@ -0,0 +1,292 @@
+"""
+Line-level diff of document versions
+
+Patience diff: common leading and trailing lines are matched first, then
+lines occurring exactly once in both texts are used as anchors (their
+longest increasing run), and each gap between anchors is diffed the same
+way. Gaps without unique lines fall back to Myers' O((N+M)D) algorithm.
+Myers is bounded by a maximum edit distance and by a work budget
+proportional to the gap's size. A gap that exceeds either is diffed with
+difflib.SequenceMatcher instead, which is exact but not necessarily
+minimal, and the diff is marked approximate. Repetitive markdown
+(checklists, blank lines, repeated headings) therefore costs about what
+difflib costs, instead of running Myers into its cap.
+
+Opcodes have the same (tag, i1, i2, j1, j2) form as
+difflib.SequenceMatcher.get_opcodes().
+"""
+
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_MAX_EDIT_DISTANCE = 1000
+# Myers steps allowed per line of a gap before it is handed to difflib
+MYERS_WORK_PER_LINE = 24
+DEFAULT_CONTEXT = 3
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+class LineDiff:
+    """Opcodes between two line sequences, with added and removed line counts"""
+
+    __slots__ = ("opcodes", "added_lines", "removed_lines", "approximate")
+
+    def __init__(self, opcodes: List[Opcode], approximate: bool):
+        self.opcodes = opcodes
+        self.added_lines = sum(j2 - j1 for tag, _, _, j1, j2 in opcodes if tag != "equal")
+        self.removed_lines = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag != "equal")
+        self.approximate = approximate
+
+
+class DiffHunk:
+    """A group of changes with surrounding context lines"""
+
+    __slots__ = ("old_start", "old_lines", "new_start", "new_lines", "lines")
+
+    def __init__(self, old_start: int, old_lines: int, new_start: int, new_lines: int, lines: List[str]):
+        self.old_start = old_start
+        self.old_lines = old_lines
+        self.new_start = new_start
+        self.new_lines = new_lines
+        self.lines = lines
+
+    @property
+    def header(self) -> str:
+        return f"@@ -{_range(self.old_start, self.old_lines)} +{_range(self.new_start, self.new_lines)} @@"
+
+
+def _range(start: int, length: int) -> str:
+    """Unified diff range, as in difflib (1-based; an empty range names the line before it)"""
+    if length == 1:
+        return f"{start}"
+    if length == 0:
+        start -= 1
+    return f"{start},{length}"
+
+
+def _unique_anchors(a: Sequence[str], alo: int, ahi: int, b: Sequence[str], blo: int, bhi: int):
+    """Longest increasing run of (i, j) pairs of lines that occur once in each range"""
+    # line -> its position, or -1 once it is seen twice
+    positions_a: Dict[str, int] = {}
+    for i in range(alo, ahi):
+        positions_a[a[i]] = -1 if a[i] in positions_a else i
+    positions_b: Dict[str, int] = {}
+    for j in range(blo, bhi):
+        if positions_a.get(b[j], -1) >= 0:
+            positions_b[b[j]] = -1 if b[j] in positions_b else j
+
+    # Keep the longest run of unique pairs that increases in both i and j
+    pairs = [(positions_a[line], j) for line, j in positions_b.items() if j >= 0]
+    if not pairs:
+        return []
+    pairs.sort()
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous: List[int] = []
+    for index, (_, j) in enumerate(pairs):
+        position = bisect_left(tails, j)
+        previous.append(tail_index[position - 1] if position else -1)
+        if position == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[position] = j
+            tail_index[position] = index
+
+    anchors = []
+    index = tail_index[-1]
+    while index >= 0:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _myers(
+    a: Sequence[str], alo: int, ahi: int, b: Sequence[str], blo: int, bhi: int, max_edit_distance: int
+) -> Optional[List[Tuple[int, int]]]:
+    """
+    Matched (i, j) pairs of a shortest edit script
+
+    None beyond max_edit_distance edits or MYERS_WORK_PER_LINE steps per
+    line of the gap.
+    """
+    n, m = ahi - alo, bhi - blo
+    limit = min(max_edit_distance, n + m)
+    work_budget = MYERS_WORK_PER_LINE * (n + m)
+    work = 0
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    # trace[d] holds the furthest x on diagonals -d..d after d edits
+    trace: List[List[int]] = []
+
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            start = x
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            work += 1 + x - start
+            v[offset + k] = x
+            if x >= n and y >= m:
+                trace.append(v[offset - d:offset + d + 1])
+                return _backtrack(trace, n, m, alo, blo)
+        trace.append(v[offset - d:offset + d + 1])
+        if work > work_budget:
+            return None
+    return None
+
+
+def _sequence_matcher_pairs(
+    a: Sequence[str], alo: int, ahi: int, b: Sequence[str], blo: int, bhi: int
+) -> List[Tuple[int, int]]:
+    """Matched (i, j) pairs of a gap according to difflib.SequenceMatcher"""
+    matcher = SequenceMatcher(None, a[alo:ahi], b[blo:bhi])
+    return [
+        (alo + i + offset, blo + j + offset)
+        for i, j, size in matcher.get_matching_blocks()
+        for offset in range(size)
+    ]
+
+
+def _backtrack(trace: List[List[int]], x: int, y: int, alo: int, blo: int) -> List[Tuple[int, int]]:
+    pairs = []
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = previous[previous_k + d - 1]
+        previous_y = previous_x - previous_k
+        while x > previous_x and y > previous_y:
+            x -= 1
+            y -= 1
+            pairs.append((alo + x, blo + y))
+        x, y = previous_x, previous_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        pairs.append((alo + x, blo + y))
+    return pairs
+
+
+def _matches(a: Sequence[str], b: Sequence[str], max_edit_distance: int) -> Tuple[List[Tuple[int, int]], bool]:
+    """Sorted matched (i, j) line pairs, and whether a gap was left to difflib"""
+    # Lines are compared as small integers, which is much cheaper in the Myers loop
+    line_ids: Dict[str, int] = {}
+    a = [line_ids.setdefault(line, len(line_ids)) for line in a]
+    b = [line_ids.setdefault(line, len(line_ids)) for line in b]
+    matches: List[Tuple[int, int]] = []
+    approximate = False
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            for i, j in anchors:
+                stack.append((alo, i, blo, j))
+                matches.append((i, j))
+                alo, blo = i + 1, j + 1
+            stack.append((alo, ahi, blo, bhi))
+            continue
+
+        pairs = _myers(a, alo, ahi, b, blo, bhi, max_edit_distance)
+        if pairs is None:
+            pairs = _sequence_matcher_pairs(a, alo, ahi, b, blo, bhi)
+            approximate = True
+        matches.extend(pairs)
+
+    matches.sort()
+    return matches, approximate
+
+
+def diff_lines(
+    a: Sequence[str], b: Sequence[str], max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE
+) -> LineDiff:
+    """Diff of two line sequences"""
+    matches, approximate = _matches(a, b, max_edit_distance)
+
+    opcodes: List[Opcode] = []
+    i = j = 0
+    for match_i, match_j in matches + [(len(a), len(b))]:
+        if i < match_i and j < match_j:
+            opcodes.append(("replace", i, match_i, j, match_j))
+        elif i < match_i:
+            opcodes.append(("delete", i, match_i, j, j))
+        elif j < match_j:
+            opcodes.append(("insert", i, i, j, match_j))
+        if match_i < len(a):
+            if opcodes and opcodes[-1][0] == "equal":
+                opcodes[-1] = ("equal", opcodes[-1][1], match_i + 1, opcodes[-1][3], match_j + 1)
+            else:
+                opcodes.append(("equal", match_i, match_i + 1, match_j, match_j + 1))
+        i, j = match_i + 1, match_j + 1
+    return LineDiff(opcodes, approximate)
+
+
+def group_opcodes(opcodes: List[Opcode], context: int = DEFAULT_CONTEXT) -> List[List[Opcode]]:
+    """Opcodes split into hunks with up to context equal lines around the changes"""
+    if not opcodes or (len(opcodes) == 1 and opcodes[0][0] == "equal"):
+        return []
+
+    opcodes = list(opcodes)
+    tag, i1, i2, j1, j2 = opcodes[0]
+    if tag == "equal":
+        opcodes[0] = (tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+    tag, i1, i2, j1, j2 = opcodes[-1]
+    if tag == "equal":
+        opcodes[-1] = (tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+
+    groups: List[List[Opcode]] = []
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        # An equal run longer than two contexts ends one hunk and starts the next
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        groups.append(group)
+    return groups
+
+
+def make_hunk(group: List[Opcode], a: Sequence[str], b: Sequence[str]) -> DiffHunk:
+    """Hunk of a group of opcodes, with line endings stripped and ' ', '-' or '+' prefixes"""
+    lines = []
+    for tag, i1, i2, j1, j2 in group:
+        if tag == "equal":
+            lines.extend(" " + line.rstrip("\r\n") for line in a[i1:i2])
+            continue
+        lines.extend("-" + line.rstrip("\r\n") for line in a[i1:i2])
+        lines.extend("+" + line.rstrip("\r\n") for line in b[j1:j2])
+
+    old_start, new_start = group[0][1], group[0][3]
+    return DiffHunk(
+        old_start=old_start + 1,
+        old_lines=group[-1][2] - old_start,
+        new_start=new_start + 1,
+        new_lines=group[-1][4] - new_start,
+        lines=lines
+    )
@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination helpers
+
+A cursor is an opaque, URL-safe token that encodes the sort key of the last
+row of a page. The next page is fetched with a ``WHERE (sort key) > cursor``
+predicate instead of ``OFFSET``, so every page costs the same index seek no
+matter how deep it is.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from sqlalchemy import DateTime, String, and_, literal, or_
+from sqlalchemy.types import TypeDecorator
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class _CursorDateTime(TypeDecorator):
+    """
+    A datetime cursor value, bound the way the database stores datetimes
+
+    SQLite keeps datetimes as text and compares them as strings. Rows
+    filled by server_default (CURRENT_TIMESTAMP) hold 'YYYY-MM-DD HH:MM:SS'
+    while SQLAlchemy binds 'YYYY-MM-DD HH:MM:SS.000000', which is never equal
+    to it and sorts after it. A value without microseconds is bound in the
+    short form there, so rows from the cursor's second compare as they should.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != "sqlite" or value is None:
+            return value
+        if value.microsecond:
+            return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _bind_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return literal(value, _CursorDateTime())
+    return value
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if hasattr(value, "value"):  # Enum members
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor string"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises ValueError if the cursor is malformed or has the wrong number of keys.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid pagination cursor")
+
+    return [_decode_value(v) for v in values]
+
+
+def keyset_filter(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """
+    Build the "row comes after the cursor" predicate for a composite sort key
+
+    Expands to ``c1 > v1 OR (c1 = v1 AND c2 > v2) OR ...`` (``<`` when
+    descending), which MySQL can answer with a range scan on a matching index.
+    """
+    values = [_bind_value(value) for value in values]
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        comparison = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, comparison))
+    return or_(*clauses)
+
+
+def next_cursor(items: Sequence[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Return the cursor for the page after items, or None if this was the last page"""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(key(items[-1]))
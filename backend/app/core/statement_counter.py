@@ -0,0 +1,225 @@
+"""
+SQL statement counting on engine events
+
+count_statements() records every statement an engine executes while the
+block runs. statement_budget() fails when the code inside it issues more
+than a given number of statements, and check_statement_budget() repeats a
+request for several page sizes under one budget, so a statement per row
+(an N+1 loop) fails it. check_statement_budgets.py declares the budgets of
+the main endpoints.
+
+With SQL_STATEMENT_REPORT on, StatementReportMiddleware attributes the
+statements of each request to its route (method and path template), and
+the totals are logged, and written to SQL_STATEMENT_REPORT_PATH, at
+shutdown. statement_report.py runs the test_*_api.py flows in this mode.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class StatementLog:
+    """Statements executed in one scope, with their total execution time"""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def add(self, statement: str, seconds: float):
+        self.statements.append(statement)
+        self.seconds += seconds
+
+
+class StatementBudgetExceeded(AssertionError):
+    """Raised when code issues more SQL statements than its budget"""
+
+    def __init__(self, label: str, max_statements: int, log: StatementLog):
+        self.max_statements = max_statements
+        self.log = log
+        listing = "\n".join(
+            f"  {number}. {' '.join(statement.split())[:200]}"
+            for number, statement in enumerate(log.statements, 1)
+        )
+        super().__init__(f"{label}: {log.count} SQL statements, budget {max_statements}\n{listing}")
+
+
+def _listen(engine: Engine, on_statement: Callable[[str, float], None]):
+    """Call on_statement(statement, seconds) after each statement; returns (event name, listener) pairs"""
+    # Start times are kept per connection, under a key of this listener pair
+    key = object()
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(key, []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        on_statement(statement, time.perf_counter() - conn.info[key].pop())
+
+    def failed(exception_context):
+        # Failed statements count too, and must not leave their start time behind
+        conn = exception_context.connection
+        if exception_context.execution_context is not None and conn is not None and conn.info.get(key):
+            on_statement(exception_context.statement, time.perf_counter() - conn.info[key].pop())
+
+    listeners = (("before_cursor_execute", before), ("after_cursor_execute", after), ("handle_error", failed))
+    for name, listener in listeners:
+        event.listen(engine, name, listener)
+    return listeners
+
+
+@contextmanager
+def count_statements(engine: Engine) -> Iterator[StatementLog]:
+    """Record the statements executed on engine, from any thread, inside the block"""
+    log = StatementLog()
+    listeners = _listen(engine, log.add)
+    try:
+        yield log
+    finally:
+        for name, listener in listeners:
+            event.remove(engine, name, listener)
+
+
+@contextmanager
+def statement_budget(engine: Engine, max_statements: int, label: str = "Block") -> Iterator[StatementLog]:
+    """Raise StatementBudgetExceeded if the block issues more than max_statements statements"""
+    with count_statements(engine) as log:
+        yield log
+    if log.count > max_statements:
+        raise StatementBudgetExceeded(label, max_statements, log)
+
+
+def check_statement_budget(
+    engine: Engine,
+    max_statements: int,
+    request: Callable[[int], Any],
+    page_sizes: Iterable[int] = (1, 10, 50),
+    label: str = "Request"
+) -> Dict[int, int]:
+    """
+    Run request(page_size) for each page size under the same budget
+
+    The data behind the request must be larger than the biggest page size.
+    Returns the statement count of each page size.
+    """
+    counts = {}
+    for page_size in page_sizes:
+        with statement_budget(engine, max_statements, f"{label} (page size {page_size})") as log:
+            request(page_size)
+        counts[page_size] = log.count
+    return counts
+
+
+# Statements of the request being served, set by StatementReportMiddleware.
+# Sync endpoints run in worker threads, which get a copy of the context.
+_request_log: contextvars.ContextVar[Optional[StatementLog]] = contextvars.ContextVar(
+    "sql_request_statements", default=None
+)
+
+
+class RouteStatements:
+    """Statement totals of one route"""
+
+    __slots__ = ("requests", "statements", "max_statements", "seconds")
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.seconds = 0.0
+
+
+class StatementReport:
+    """Statements and database time per route, collected by StatementReportMiddleware"""
+
+    def __init__(self):
+        self._routes: Dict[str, RouteStatements] = {}
+        self._engines: List[Engine] = []
+        self._lock = threading.Lock()
+
+    def instrument(self, engine: Engine):
+        """Attribute the engine's statements to the request being served"""
+        with self._lock:
+            if any(known is engine for known in self._engines):
+                return
+            self._engines.append(engine)
+        _listen(engine, self._add_to_request)
+
+    @staticmethod
+    def _add_to_request(statement: str, seconds: float):
+        log = _request_log.get()
+        if log is not None:
+            log.add(statement, seconds)
+
+    def record(self, route: str, log: StatementLog):
+        with self._lock:
+            totals = self._routes.setdefault(route, RouteStatements())
+            totals.requests += 1
+            totals.statements += log.count
+            totals.max_statements = max(totals.max_statements, log.count)
+            totals.seconds += log.seconds
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        """Text table of the routes, most statements first"""
+        with self._lock:
+            routes = sorted(self._routes.items(), key=lambda item: (-item[1].statements, item[0]))
+        width = max([len(route) for route, _ in routes] + [len("Route")])
+        lines = [f"{'Route':<{width}}  {'Requests':>8}  {'Statements':>10}  {'Max/request':>11}  {'DB ms':>9}"]
+        for route, totals in routes:
+            lines.append(
+                f"{route:<{width}}  {totals.requests:>8}  {totals.statements:>10}  "
+                f"{totals.max_statements:>11}  {totals.seconds * 1000:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: Optional[str] = None):
+        """Log the report, and write it to path if given"""
+        report = self.render()
+        logger.info(f"SQL statements per route:\n{report}")
+        if path:
+            with open(path, "w", encoding="utf-8") as report_file:
+                report_file.write(report + "\n")
+
+
+class StatementReportMiddleware:
+    """ASGI middleware that records each HTTP request's statements in a StatementReport"""
+
+    def __init__(self, app, report: Optional[StatementReport] = None):
+        self.app = app
+        self.report = report or statement_report
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = StatementLog()
+        token = _request_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_log.reset(token)
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            self.report.record(f"{scope['method']} {getattr(route, 'path', scope['path'])}", log)
+
+
+# Global report instance
+statement_report = StatementReport()
@@ -0,0 +1,250 @@
+"""
+Tokenizer and in-memory inverted index for full-text search
+
+Words are runs of letters and digits, lowercased. Chinese, Japanese and
+Korean text has no spaces between words, so CJK runs are split into
+overlapping character bigrams (the approach of MySQL's ngram parser), plus
+the last character of each run on its own, so single-character queries
+still match through prefix expansion.
+
+InvertedIndex keeps term -> {doc_id: weighted term frequency} postings and
+ranks matches with BM25. Every query term must match (AND semantics), and
+query terms also match indexed terms they are a prefix of.
+
+make_snippet cuts a window of a matching document around the first match
+and returns the character ranges of the matched words in it.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Kana, CJK ideographs and Hangul
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_RE = re.compile(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+_CJK_RE = re.compile(f"[{_CJK}]")
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Indexed terms a single query term may expand to by prefix
+MAX_PREFIX_EXPANSIONS = 200
+
+# Snippet length in characters, and how much of it precedes the first match
+SNIPPET_LENGTH = 160
+SNIPPET_LEAD = 40
+ELLIPSIS = "…"
+_LINE_BREAKS = str.maketrans("\r\n\t", "   ")
+
+
+def words(text: Optional[str]) -> List[str]:
+    """Lowercased letter/digit runs and CJK runs of text"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _cjk_terms(run: str, query: bool) -> List[str]:
+    if len(run) == 1:
+        return [run]
+    bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+    # A query's last bigram already covers its last character
+    return bigrams if query else bigrams + [run[-1]]
+
+
+def tokenize(text: Optional[str], query: bool = False) -> List[str]:
+    """Index terms of text (query=True for the terms of a search query)"""
+    tokens = words(text)
+    if not _CJK_RE.search(text or ""):
+        return tokens
+
+    terms: List[str] = []
+    for word in tokens:
+        if _CJK_RE.match(word):
+            terms.extend(_cjk_terms(word, query))
+        else:
+            terms.append(word)
+    return terms
+
+
+class InvertedIndex:
+    """BM25-ranked inverted index over documents with weighted text fields"""
+
+    def __init__(self, field_weights: Mapping[str, float]):
+        self.field_weights = dict(field_weights)
+        # term -> doc_id -> weighted term frequency
+        self.postings: Dict[str, Dict[int, float]] = {}
+        # doc_id -> terms, for removal
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        # Sorted vocabulary for prefix lookups, rebuilt after the terms change
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: int, fields: Mapping[str, Optional[str]]):
+        """Index a document, replacing its previous version"""
+        self.remove(doc_id)
+
+        frequencies: Dict[str, float] = {}
+        for field, text in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+
+        for term, frequency in frequencies.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                self._vocabulary = None
+            posting[doc_id] = frequency
+
+        length = sum(frequencies.values())
+        self._doc_terms[doc_id] = tuple(frequencies)
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: int):
+        """Drop a document, if indexed"""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                self._vocabulary = None
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        """Indexed terms matching a query term, the exact term first"""
+        expansions = [term] if term in self.postings else []
+        if not prefix:
+            return expansions
+
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, term)
+        while i < len(vocabulary) and len(expansions) < MAX_PREFIX_EXPANSIONS:
+            candidate = vocabulary[i]
+            if not candidate.startswith(term):
+                break
+            if candidate != term:
+                expansions.append(candidate)
+            i += 1
+        return expansions
+
+    def search(self, text: str, prefix: bool = True, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        (doc_id, score) pairs of documents matching every term of text
+
+        Sorted by descending score; a document matching several expansions
+        of a prefix scores each of them.
+        """
+        terms = list(dict.fromkeys(tokenize(text, query=True)))
+        if not terms or not self._doc_lengths:
+            return []
+
+        doc_count = len(self._doc_lengths)
+        average_length = self._total_length / doc_count or 1.0
+
+        term_postings: List[List[Dict[int, float]]] = []
+        for term in terms:
+            postings = [self.postings[t] for t in self._expand(term, prefix)]
+            if not postings:
+                return []
+            term_postings.append(postings)
+
+        # Intersect starting from the rarest term
+        def match_count(postings: Iterable[Dict[int, float]]) -> int:
+            return sum(len(posting) for posting in postings)
+
+        term_postings.sort(key=match_count)
+        candidates = None
+        for postings in term_postings:
+            matched = set().union(*postings)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+
+        scores = dict.fromkeys(candidates, 0.0)
+        for postings in term_postings:
+            for posting in postings:
+                idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id in candidates.intersection(posting):
+                    frequency = posting[doc_id]
+                    norm = 1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / average_length
+                    scores[doc_id] += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+
+def highlight_spans(text: str, query: str) -> List[Tuple[int, int]]:
+    """
+    Sorted, non-overlapping (start, end) character ranges of query matches in text
+
+    Words starting with a query word are highlighted whole; in CJK runs the
+    occurrences of the query's bigrams are highlighted and merged, so a
+    contiguous CJK query word comes out as one range.
+    """
+    terms = list(dict.fromkeys(tokenize(query, query=True)))
+    prefixes = tuple(term for term in terms if not _CJK_RE.match(term))
+    cjk_terms = [term for term in terms if _CJK_RE.match(term)]
+
+    spans: List[Tuple[int, int]] = []
+    for token in _TOKEN_RE.finditer(text):
+        word = token.group()
+        if _CJK_RE.match(word):
+            for term in cjk_terms:
+                i = word.find(term)
+                while i != -1:
+                    spans.append((token.start() + i, token.start() + i + len(term)))
+                    i = word.find(term, i + 1)
+        elif prefixes and word.lower().startswith(prefixes):
+            spans.append(token.span())
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def make_snippet(text: str, query: str, length: int = SNIPPET_LENGTH) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    A single-line excerpt of text around the first query match
+
+    Returns the snippet and the highlight ranges within it. Text without a
+    visible match (e.g. a match only in another field) yields its beginning.
+    """
+    spans = highlight_spans(text, query)
+    start = max(0, spans[0][0] - SNIPPET_LEAD) if spans else 0
+    end = min(len(text), start + length)
+    start = max(0, min(start, end - length))
+
+    # Line breaks become spaces one for one, so match offsets stay valid
+    snippet = text[start:end].translate(_LINE_BREAKS)
+    offset = start
+    if start > 0:
+        snippet = ELLIPSIS + snippet
+        offset -= len(ELLIPSIS)
+    if end < len(text):
+        snippet += ELLIPSIS
+
+    return snippet, [
+        (max(span_start, start) - offset, min(span_end, end) - offset)
+        for span_start, span_end in spans
+        if span_end > start and span_start < end
+    ]
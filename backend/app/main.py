@@ -3,14 +3,16 @@ TaskMaster AI Backend - FastAPI Application
 智能任务管理系统后端API
 """
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.api.api_v1.api import api_router
 
 
@@ -24,6 +26,9 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting TaskMaster AI Backend...")
     
+    # Size the thread pool that runs sync endpoints and their database work
+    to_thread.current_default_thread_limiter().total_tokens = settings.SYNC_WORKER_THREADS
+    
     # Test database connection on startup
     from app.core.database import test_connection
     if test_connection():
@@ -31,8 +36,42 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("Database connection failed - some features may not work")
     
+    from app.services.access_key import access_key_usage_tracker
+    from app.services.task_log import task_log_writer
+    access_key_usage_tracker.start()
+    if settings.TASK_LOG_MODE == "deferred":
+        task_log_writer.start()
+    
+    from app.services.generation_job import generation_job_service
+    generation_job_service.start()
+    if settings.AI_JOB_RECOVER_ON_STARTUP:
+        try:
+            generation_job_service.recover_pending()
+        except Exception as e:
+            logger.warning(f"Could not recover AI generation jobs: {e}")
+    
+    from app.services.project_purge import project_purge_service
+    if settings.PROJECT_PURGE_WORKER_ENABLED:
+        project_purge_service.start()
+    
     yield
     logger.info("Shutting down TaskMaster AI Backend...")
+    
+    # Let running AI generation jobs finish; a running purge stops after its current chunk
+    generation_job_service.stop()
+    project_purge_service.stop()
+    
+    # Write task logs and key usage still waiting in memory
+    task_log_writer.stop()
+    access_key_usage_tracker.stop()
+    
+    # Close pooled connections to AI providers
+    from app.services.ai_client_registry import ai_client_registry
+    ai_client_registry.close_all()
+    
+    if settings.SQL_STATEMENT_REPORT:
+        from app.core.statement_counter import statement_report
+        statement_report.write(settings.SQL_STATEMENT_REPORT_PATH or None)
 
 
 # Create FastAPI application
@@ -51,8 +90,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+if settings.SQL_STATEMENT_REPORT:
+    from app.core.database import engine
+    from app.core.statement_counter import StatementReportMiddleware, statement_report
+    statement_report.instrument(engine)
+    app.add_middleware(StatementReportMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -70,6 +116,15 @@ async def root():
     )
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Connection pool telemetry in the Prometheus text format"""
+        from app.core.database import engine
+        from app.core.db_pool import render_pool_metrics
+        return PlainTextResponse(render_pool_metrics(engine), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -8,6 +8,9 @@ from app.models.task import Task, TaskStatus, TaskPriority, TaskDependency
 from app.models.task_log import TaskLog
 from app.models.project_progress import ProjectProgress, ProgressHistory
 from app.models.project_task import ProjectTask
+from app.models.project_task_stats import ProjectTaskStats
+from app.models.generation_job import GenerationJob, GenerationJobStatus
+from app.models.project_purge import ProjectPurge, ProjectPurgeStatus
 
 __all__ = [
     "User",
@@ -23,4 +26,9 @@ __all__ = [
     "ProjectProgress",
     "ProgressHistory",
     "ProjectTask",
+    "ProjectTaskStats",
+    "GenerationJob",
+    "GenerationJobStatus",
+    "ProjectPurge",
+    "ProjectPurgeStatus",
 ]
\ No newline at end of file
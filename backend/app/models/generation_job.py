@@ -0,0 +1,40 @@
+"""
+AI task generation job model
+"""
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, Enum, JSON
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import enum
+
+from app.core.database import Base
+
+
+class GenerationJobStatus(enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    model_id = Column(Integer, ForeignKey("models.id", ondelete="SET NULL"), nullable=True)  # Null = no model configured
+    status = Column(Enum(GenerationJobStatus), default=GenerationJobStatus.QUEUED, nullable=False, index=True)
+    request = Column(JSON, nullable=False)  # TaskGenerateRequest payload
+    result = Column(JSON, nullable=True)  # TaskGenerateResponse payload once finished
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    user = relationship("User")
+    project = relationship("Project")
+
+    def __repr__(self):
+        return f"<GenerationJob(id={self.id}, project_id={self.project_id}, status='{self.status}')>"
@@ -37,6 +37,7 @@ class Project(Base):
         "custom_fields": {}
     })
     is_deleted = Column(Boolean, default=False)  # Soft delete
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Start of the purge retention window
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -44,6 +45,7 @@ class Project(Base):
     user = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
     project_tasks = relationship("ProjectTask", back_populates="project", cascade="all, delete-orphan")
+    task_stats = relationship("ProjectTaskStats", uselist=False, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Project(id={self.id}, name='{self.name}', status='{self.status.value}')>"
\ No newline at end of file
@@ -2,7 +2,8 @@
 Project Progress model for storing project progress documents
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.mysql import LONGBLOB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -32,11 +33,18 @@ class ProjectProgress(Base):
 
 class ProgressHistory(Base):
     __tablename__ = "progress_history"
+    # Deltas chain onto the previous version, so each version must exist once
+    __table_args__ = (UniqueConstraint("progress_id", "version", name="uq_progress_history_version"),)
 
     id = Column(Integer, primary_key=True, index=True)
     progress_id = Column(Integer, ForeignKey("project_progress.id"), nullable=False)
     version = Column(Integer, nullable=False)
-    content = Column(Text, nullable=False)  # Historical content
+    # How the version text is stored: "full" (plain text in the content
+    # column), "snapshot" (compressed text in data) or "delta" (compressed
+    # line delta against the previous version in data)
+    storage = Column(String(10), nullable=False, default="full", server_default="full")
+    stored_content = Column("content", Text, nullable=True)
+    data = Column(LargeBinary().with_variant(LONGBLOB, "mysql"), nullable=True)
     change_summary = Column(String(500), nullable=True)  # Summary of changes
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -45,5 +53,8 @@ class ProgressHistory(Base):
     progress = relationship("ProjectProgress", back_populates="history")
     updated_by_user = relationship("User")
 
+    # Text of the version, filled in by progress_history_store (not a column)
+    content = None
+
     def __repr__(self):
         return f"<ProgressHistory(id={self.id}, progress_id={self.progress_id}, version={self.version})>"
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Project purge model: progress of a project's permanent deletion
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import enum
+
+from app.core.database import Base
+
+
+class ProjectPurgeStatus(enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ProjectPurge(Base):
+    __tablename__ = "project_purges"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign key: the project row is the last thing a purge deletes
+    project_id = Column(Integer, nullable=False, index=True)
+    project_name = Column(String(200), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    reason = Column(String(20), nullable=False)  # requested (hard delete) or retention
+    status = Column(Enum(ProjectPurgeStatus), default=ProjectPurgeStatus.QUEUED, nullable=False, index=True)
+    phase = Column(String(20), nullable=True)  # tasks, progress or project while running
+    total_tasks = Column(Integer, nullable=True)  # Tasks in the project when the purge started
+    deleted_tasks = Column(Integer, nullable=False, default=0)
+    deleted_rows = Column(Integer, nullable=False, default=0)  # Rows deleted from all tables
+    attempts = Column(Integer, nullable=False, default=0)  # Runs, including resumed ones
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)  # Last committed chunk
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    user = relationship("User")
+
+    @property
+    def progress(self):
+        """Share of the project's tasks deleted so far, 1.0 once finished"""
+        if self.status == ProjectPurgeStatus.SUCCEEDED:
+            return 1.0
+        if not self.total_tasks:
+            return None
+        return min(1.0, self.deleted_tasks / self.total_tasks)
+
+    def __repr__(self):
+        return f"<ProjectPurge(id={self.id}, project_id={self.project_id}, status='{self.status}')>"
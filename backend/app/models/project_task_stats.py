@@ -0,0 +1,37 @@
+"""
+Per-project task statistics rollup
+"""
+
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ProjectTaskStats(Base):
+    """
+    Task counters of one project, maintained by the task service in the
+    same transaction as every task change (see app.services.task_stats)
+    """
+    __tablename__ = "project_task_stats"
+
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    pending_tasks = Column(Integer, nullable=False, default=0)
+    in_progress_tasks = Column(Integer, nullable=False, default=0)
+    review_tasks = Column(Integer, nullable=False, default=0)
+    done_tasks = Column(Integer, nullable=False, default=0)
+    blocked_tasks = Column(Integer, nullable=False, default=0)
+    cancelled_tasks = Column(Integer, nullable=False, default=0)
+    # Done tasks with a completion time, and the sum of their completed_at - created_at
+    completed_count = Column(Integer, nullable=False, default=0)
+    completion_seconds = Column(Float, nullable=False, default=0.0)
+    last_activity = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def total_tasks(self) -> int:
+        return (self.pending_tasks + self.in_progress_tasks + self.review_tasks
+                + self.done_tasks + self.blocked_tasks + self.cancelled_tasks)
+
+    def __repr__(self):
+        return f"<ProjectTaskStats(project_id={self.project_id}, total_tasks={self.total_tasks})>"
@@ -13,7 +13,8 @@ class TaskLog(Base):
     __tablename__ = "task_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    # No foreign key: deletion logs outlive the tasks they describe
+    task_id = Column(Integer, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     action = Column(String(50), nullable=False)  # created, updated, status_changed, assigned, etc.
     field_name = Column(String(100), nullable=True)  # Field that was changed
@@ -24,7 +25,7 @@ class TaskLog(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    task = relationship("Task")
+    task = relationship("Task", primaryjoin="foreign(TaskLog.task_id) == Task.id", viewonly=True)
     user = relationship("User")
 
     def __repr__(self):
@@ -86,4 +86,12 @@ class AIModelTestResponse(BaseModel):
     message: str
     response_time: Optional[float] = None
     model_response: Optional[str] = None
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+class AIResponseCacheStats(BaseModel):
+    """Schema for AI response cache statistics"""
+    backend: str
+    entries: int
+    hits: int
+    misses: int
+    hit_rate: float
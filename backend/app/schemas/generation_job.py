@@ -0,0 +1,34 @@
+"""
+AI generation job schemas for request/response validation
+"""
+
+from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+from enum import Enum
+
+from app.schemas.task import TaskGenerateResponse
+
+
+class GenerationJobStatus(str, Enum):
+    """Generation job status enum"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class GenerationJobResponse(BaseModel):
+    """Schema for AI generation job response"""
+    id: int
+    project_id: int
+    model_id: Optional[int] = Field(None, description="使用的AI模型ID")
+    status: GenerationJobStatus = Field(..., description="任务状态")
+    result: Optional[TaskGenerateResponse] = Field(None, description="生成结果（完成后返回）")
+    error: Optional[str] = Field(None, description="失败原因")
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -80,16 +80,34 @@ class ProjectProgressStats(BaseModel):
     is_published: bool = False
 
 
+class ProgressDiffHunk(BaseModel):
+    """Schema for one hunk of a version comparison"""
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+    lines: List[str] = Field(default_factory=list, description="Lines prefixed with ' ', '-' or '+'")
+
+    class Config:
+        from_attributes = True
+
+
 class ProgressVersionCompare(BaseModel):
     """Schema for comparing progress versions"""
     version_a: int
     version_b: int
-    content_a: str
-    content_b: str
+    content_a: Optional[str] = Field(None, description="Omitted in hunks-only mode")
+    content_b: Optional[str] = Field(None, description="Omitted in hunks-only mode")
     changes_summary: str
     added_lines: int = 0
     removed_lines: int = 0
     modified_lines: int = 0
+    hunks: List[ProgressDiffHunk] = Field(default_factory=list, description="Requested page of hunks")
+    total_hunks: int = 0
+    hunk_offset: int = 0
+    approximate: bool = Field(
+        False, description="Some changed regions exceeded the diff cost cap and were diffed with difflib (exact, possibly not minimal)"
+    )
 
 
 class ProgressExportRequest(BaseModel):
@@ -115,10 +133,25 @@ class ProgressSearchRequest(BaseModel):
     is_published: Optional[bool] = Field(None, description="Filter by publication status")
     updated_from: Optional[datetime] = Field(None, description="Updated after this date")
     updated_to: Optional[datetime] = Field(None, description="Updated before this date")
+    include_history: bool = Field(False, description="Also match history versions (search hits only)")
+    sort_by: str = Field("updated_at", pattern="^(updated_at|relevance)$", description="Sort order of documents")
     skip: int = Field(0, ge=0, description="Skip count")
     limit: int = Field(50, ge=1, le=100, description="Limit count")
 
 
+class ProgressSearchHit(BaseModel):
+    """Schema for a progress search match with a highlighted snippet"""
+    project_id: int
+    progress_id: int
+    version: int
+    is_current: bool = Field(..., description="Whether the match is the current document rather than a history version")
+    score: float = Field(..., description="Relevance score")
+    snippet: str = Field(..., description="Excerpt around the first match")
+    highlights: List[List[int]] = Field(default_factory=list, description="[start, end) character ranges of matches in the snippet")
+    change_summary: Optional[str] = None
+    updated_at: datetime
+
+
 class ProgressBackupRequest(BaseModel):
     """Schema for progress backup request"""
     include_history: bool = Field(True, description="Include version history")
@@ -0,0 +1,39 @@
+"""
+Project purge schemas for response validation
+"""
+
+from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+from enum import Enum
+
+
+class ProjectPurgeStatus(str, Enum):
+    """Project purge status enum"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ProjectPurgeResponse(BaseModel):
+    """Schema for project purge progress"""
+    id: int
+    project_id: int
+    project_name: Optional[str] = None
+    reason: str = Field(..., description="删除原因: requested 或 retention")
+    status: ProjectPurgeStatus = Field(..., description="删除状态")
+    phase: Optional[str] = Field(None, description="当前阶段: tasks, progress 或 project")
+    total_tasks: Optional[int] = Field(None, description="开始删除时的任务数")
+    deleted_tasks: int = 0
+    deleted_rows: int = 0
+    progress: Optional[float] = Field(None, description="已删除任务比例 (0-1)")
+    attempts: int = 0
+    error: Optional[str] = Field(None, description="失败原因")
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -143,6 +143,18 @@ class TaskBatchStatusUpdate(BaseModel):
     status: TaskStatus = Field(..., description="新的任务状态")
 
 
+class TaskBulkCreate(BaseModel):
+    """Schema for creating many tasks in one transaction"""
+    project_id: Optional[int] = Field(None, description="默认项目ID（任务未指定时使用）")
+    tasks: List[TaskCreate] = Field(..., min_items=1, max_items=500, description="任务列表")
+
+
+class TaskBulkCreateResponse(BaseModel):
+    """Schema for bulk task creation response"""
+    created_ids: List[int] = Field(default_factory=list, description="创建的任务ID列表")
+    total_created: int = Field(0, description="创建的任务总数")
+
+
 class TaskGenerateRequest(BaseModel):
     """Schema for AI task generation request"""
     project_description: str = Field(..., min_length=10, description="项目描述")
@@ -153,6 +165,7 @@ class TaskGenerateRequest(BaseModel):
         description="优先级分布"
     )
     custom_requirements: Optional[str] = Field(None, description="自定义需求")
+    model_id: Optional[int] = Field(None, description="使用的AI模型ID（默认使用默认模型）")
 
 
 class TaskGenerateResponse(BaseModel):
@@ -163,6 +176,7 @@ class TaskGenerateResponse(BaseModel):
     total_generated: int = Field(0, description="生成的任务总数")
     generation_time: float = Field(0.0, description="生成耗时（秒）")
     model_used: Optional[str] = Field(None, description="使用的AI模型")
+    cached: bool = Field(False, description="是否使用了缓存的AI响应")
 
 
 class TaskStats(BaseModel):
@@ -193,7 +207,8 @@ class TaskSearchRequest(BaseModel):
     created_to: Optional[datetime] = Field(None, description="创建日期结束")
     skip: int = Field(0, ge=0, description="跳过数量")
     limit: int = Field(50, ge=1, le=100, description="限制数量")
-    sort_by: str = Field("created_at", description="排序字段")
+    cursor: Optional[str] = Field(None, description="分页游标（上一页响应头 X-Next-Cursor）")
+    sort_by: str = Field("created_at", description="排序字段（有搜索关键词时可用 relevance 按相关度排序）")
     sort_order: str = Field("desc", pattern="^(asc|desc)$", description="排序方向")
 
 
@@ -4,19 +4,106 @@ Access Key service
 
 import secrets
 import string
+import threading
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 import logging
 
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.models.access_key import AccessKey
 from app.models.user import User
 from app.schemas.access_key import AccessKeyCreate, AccessKeyUpdate
+from app.services.auth_cache import auth_cache
 
 logger = logging.getLogger(__name__)
 
 
+class AccessKeyUsageTracker:
+    """
+    Write-behind tracker for access key last_used_at
+    
+    Records the latest use of each key in memory and writes all of them
+    with a single UPDATE every flush interval, instead of one UPDATE and
+    commit per authenticated request. Uses recorded since the last flush
+    are lost if the process dies; the tracker is flushed on shutdown.
+    """
+    
+    def __init__(self, flush_interval: Optional[float] = None):
+        self.flush_interval = flush_interval or settings.ACCESS_KEY_USAGE_FLUSH_INTERVAL_SECONDS
+        self._last_used: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the flush thread if it is not running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="access-key-usage", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the flush thread and write pending usage"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+    
+    def record(self, key_id: int, used_at: Optional[datetime] = None):
+        """Record that a key was used (now, unless used_at is given)"""
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        
+        used_at = used_at or datetime.utcnow()
+        with self._lock:
+            previous = self._last_used.get(key_id)
+            if previous is None or used_at > previous:
+                self._last_used[key_id] = used_at
+    
+    def pending(self) -> int:
+        """Number of keys with unwritten usage"""
+        return len(self._last_used)
+    
+    def flush(self) -> int:
+        """Write the latest use of every recorded key; returns the number of keys written"""
+        with self._lock:
+            last_used, self._last_used = self._last_used, {}
+        if not last_used:
+            return 0
+        
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(AccessKey)
+                .where(AccessKey.id.in_(last_used.keys()))
+                .values(last_used_at=case(last_used, value=AccessKey.id))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            logger.debug(f"Flushed last_used_at for {len(last_used)} access keys")
+            return len(last_used)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to flush access key usage: {e}")
+            # Keep the timestamps for the next attempt unless newer ones arrived
+            with self._lock:
+                for key_id, used_at in last_used.items():
+                    self._last_used.setdefault(key_id, used_at)
+            return 0
+        finally:
+            db.close()
+    
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+
 class AccessKeyService:
     """Access key service class"""
     
@@ -121,6 +208,9 @@ class AccessKeyService:
         db.commit()
         db.refresh(db_key)
         
+        # Deactivation or a new expiry must take effect immediately
+        auth_cache.invalidate_key(db_key.id)
+        
         logger.info(f"Access key updated: {db_key.name} for user {user.username}")
         return db_key
     
@@ -134,6 +224,8 @@ class AccessKeyService:
         db.delete(db_key)
         db.commit()
         
+        auth_cache.invalidate_key(key_id)
+        
         logger.info(f"Access key deleted: {db_key.name} for user {user.username}")
         return True
     
@@ -160,9 +252,10 @@ class AccessKeyService:
             logger.warning(f"Access key used by inactive user: {access_key.user.username}")
             return None
         
-        # Update last used time
-        access_key.last_used_at = datetime.utcnow()
-        db.commit()
+        # Update last used time (written in bulk by the usage tracker)
+        access_key_usage_tracker.record(access_key.id)
+        
+        auth_cache.put_user(key_value, access_key.user, key_id=access_key.id, expires_at=access_key.expires_at)
         
         logger.info(f"Access key validated: {access_key.name} for user {access_key.user.username}")
         return access_key.user
@@ -182,4 +275,8 @@ class AccessKeyService:
             "active_keys": active_keys,
             "expired_keys": expired_keys,
             "unused_keys": unused_keys
-        }
\ No newline at end of file
+        }
+
+
+# Global usage tracker instance
+access_key_usage_tracker = AccessKeyUsageTracker()
@@ -0,0 +1,99 @@
+"""
+Registry of reusable OpenAI clients
+
+Creating an OpenAI client per call decrypts the API key, builds a new
+httpx connection pool and pays a fresh TLS handshake on the first request.
+The registry keeps one client per AI model configuration, keyed by
+(model id, updated_at), so a changed configuration gets a new client
+while unchanged ones reuse their pooled connections.
+
+Replaced, evicted and least recently used clients are only dropped from
+the registry, not closed: a generation job or stream may still be in the
+middle of a request on one. Their connections are released when the last
+caller lets go of the client; close_all closes the registered clients at
+shutdown.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+
+from openai import OpenAI, DefaultHttpxClient
+
+from app.models.ai_model import AIModel
+
+logger = logging.getLogger(__name__)
+
+# Request timeout for model calls, in seconds
+CLIENT_TIMEOUT = 60.0
+
+
+class OpenAIClientRegistry:
+    """Thread-safe LRU registry of OpenAI clients per AI model"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        # model id -> (updated_at, client)
+        self._clients: "OrderedDict[int, Tuple[Optional[datetime], OpenAI]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_client(self, db_model: AIModel, decrypt_api_key: Callable[[str], str]) -> OpenAI:
+        """
+        Return the client for a model, creating it if the model is new or changed
+
+        decrypt_api_key is only called when a client has to be created.
+        """
+        with self._lock:
+            entry = self._clients.get(db_model.id)
+            if entry is not None and entry[0] == db_model.updated_at:
+                self._clients.move_to_end(db_model.id)
+                return entry[1]
+
+        client_kwargs = {
+            "api_key": decrypt_api_key(db_model.api_key),
+            "timeout": CLIENT_TIMEOUT,
+            "http_client": DefaultHttpxClient(),  # Use default HTTP client without proxy
+        }
+        if db_model.api_base_url:
+            client_kwargs["base_url"] = db_model.api_base_url
+        client = OpenAI(**client_kwargs)
+
+        with self._lock:
+            self._clients.pop(db_model.id, None)
+            self._clients[db_model.id] = (db_model.updated_at, client)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+
+        logger.info(f"Created OpenAI client for AI model {db_model.id}")
+        return client
+
+    def evict(self, model_id: int):
+        """Drop the client of a model (after it is updated or deleted); requests already using it finish"""
+        with self._lock:
+            entry = self._clients.pop(model_id, None)
+        if entry is not None:
+            logger.info(f"Evicted OpenAI client for AI model {model_id}")
+
+    def close_all(self):
+        """Close every client (on shutdown)"""
+        with self._lock:
+            clients = [client for _, client in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            self._close(client)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @staticmethod
+    def _close(client: OpenAI):
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Error closing OpenAI client: {e}")
+
+
+# Global registry instance
+ai_client_registry = OpenAIClientRegistry()
@@ -5,16 +5,17 @@ AI Model service layer
 import time
 import logging
 import os
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 import openai
-from openai import OpenAI, DefaultHttpxClient
 from cryptography.fernet import Fernet
 
 from app.models.ai_model import AIModel
 from app.schemas.ai_model import AIModelCreate, AIModelUpdate, AIModelTestRequest
 from app.core.config import settings
+from app.services.ai_client_registry import ai_client_registry
+from app.services.ai_response_cache import ai_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +116,9 @@ class AIModelService:
         db.commit()
         db.refresh(db_model)
         
+        # The next call builds a client from the new configuration
+        ai_client_registry.evict(model_id)
+        
         logger.info(f"Updated AI model {model_id} for user {user_id}")
         return db_model
     
@@ -127,6 +131,8 @@ class AIModelService:
         db.delete(db_model)
         db.commit()
         
+        ai_client_registry.evict(model_id)
+        
         logger.info(f"Deleted AI model {model_id} for user {user_id}")
         return True
     
@@ -141,23 +147,9 @@ class AIModelService:
             }
         
         try:
-            # Decrypt API key
-            api_key = self._decrypt_api_key(db_model.api_key)
-            
-            # Create OpenAI client with explicit HTTP client to avoid proxy issues
-            # Based on official OpenAI SDK documentation
-            client_kwargs = {
-                "api_key": api_key,
-                "timeout": 60.0,  # Increase timeout to 60 seconds
-                "http_client": DefaultHttpxClient(),  # Use default HTTP client without proxy
-            }
-            if db_model.api_base_url:
-                client_kwargs["base_url"] = db_model.api_base_url
-            
-            logger.info(f"Creating OpenAI client for model test with kwargs: {list(client_kwargs.keys())}")
-            
+            # Reuse the pooled client of this model configuration
             try:
-                client = OpenAI(**client_kwargs)
+                client = ai_client_registry.get_client(db_model, self._decrypt_api_key)
             except Exception as e:
                 logger.error(f"Error creating OpenAI client: {str(e)}")
                 return {
@@ -240,35 +232,63 @@ class AIModelService:
             and_(AIModel.user_id == user_id, AIModel.is_default == True, AIModel.is_active == True)
         ).first()
     
-    def call_model(self, db: Session, user_id: int, messages: List[Dict[str, str]], model_id: Optional[int] = None, custom_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Call an AI model with messages"""
-        # Get model (specific or default)
+    def _resolve_model(self, db: Session, user_id: int, model_id: Optional[int] = None) -> Optional[AIModel]:
+        """Get an active model (specific or default)"""
         if model_id:
             db_model = self.get_model(db, model_id, user_id)
         else:
             db_model = self.get_default_model(db, user_id)
-        
         if not db_model or not db_model.is_active:
+            return None
+        return db_model
+    
+    def _completion_params(self, db_model: AIModel, custom_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build max_tokens / temperature from custom config, falling back to the model config"""
+        config = db_model.config or {}
+        
+        # Use custom config if provided, otherwise use model config
+        if custom_config:
+            max_tokens = custom_config.get("max_tokens", config.get("max_tokens", 2000))
+            temperature = custom_config.get("temperature", config.get("temperature", 0.7))
+        else:
+            max_tokens = config.get("max_tokens", 2000)  # Increase default max_tokens for longer responses
+            temperature = config.get("temperature", 0.7)
+        
+        return {"max_tokens": max_tokens, "temperature": temperature}
+    
+    def call_model(self, db: Session, user_id: int, messages: List[Dict[str, str]], model_id: Optional[int] = None, custom_config: Optional[Dict[str, Any]] = None, use_cache: bool = False) -> Dict[str, Any]:
+        """
+        Call an AI model with messages
+        
+        With use_cache an identical earlier call is answered from the AI
+        response cache; the result then has "cached": True. Its "cache_key"
+        lets callers invalidate a response they could not use.
+        """
+        db_model = self._resolve_model(db, user_id, model_id)
+        if not db_model:
             return {
                 "success": False,
                 "error": "No active model found"
             }
         
+        params = self._completion_params(db_model, custom_config)
+        cache_key = None
+        if use_cache and ai_response_cache.enabled:
+            cache_key = ai_response_cache.make_key(db_model, messages, params)
+            cached = ai_response_cache.get(cache_key)
+            if cached is not None:
+                return {
+                    "success": True,
+                    "response": cached,
+                    "model_used": db_model.name,
+                    "cached": True,
+                    "cache_key": cache_key
+                }
+        
         try:
-            # Decrypt API key
-            api_key = self._decrypt_api_key(db_model.api_key)
-            
-            # Create OpenAI client with explicit HTTP client to avoid proxy issues
-            client_kwargs = {
-                "api_key": api_key,
-                "timeout": 60.0,  # Increase timeout to 60 seconds
-                "http_client": DefaultHttpxClient(),  # Use default HTTP client without proxy
-            }
-            if db_model.api_base_url:
-                client_kwargs["base_url"] = db_model.api_base_url
-            
+            # Reuse the pooled client of this model configuration
             try:
-                client = OpenAI(**client_kwargs)
+                client = ai_client_registry.get_client(db_model, self._decrypt_api_key)
             except Exception as e:
                 logger.error(f"Error creating OpenAI client in call_model: {str(e)}")
                 return {
@@ -276,34 +296,28 @@ class AIModelService:
                     "error": f"OpenAI client initialization error: {str(e)}"
                 }
             
-            # Prepare model configuration
-            config = db_model.config or {}
-            
-            # Use custom config if provided, otherwise use model config
-            if custom_config:
-                max_tokens = custom_config.get("max_tokens", config.get("max_tokens", 2000))
-                temperature = custom_config.get("temperature", config.get("temperature", 0.7))
-            else:
-                max_tokens = config.get("max_tokens", 2000)  # Increase default max_tokens for longer responses
-                temperature = config.get("temperature", 0.7)
-            
             # Call the model
             response = client.chat.completions.create(
                 model=db_model.model_id,
                 messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature
+                **params
             )
             
+            content = response.choices[0].message.content
+            if cache_key and content:
+                ai_response_cache.set(cache_key, content)
+            
             return {
                 "success": True,
-                "response": response.choices[0].message.content,
+                "response": content,
                 "model_used": db_model.name,
                 "usage": {
                     "prompt_tokens": response.usage.prompt_tokens,
                     "completion_tokens": response.usage.completion_tokens,
                     "total_tokens": response.usage.total_tokens
-                }
+                },
+                "cached": False,
+                "cache_key": cache_key
             }
             
         except Exception as e:
@@ -312,6 +326,71 @@ class AIModelService:
                 "success": False,
                 "error": str(e)
             }
+    
+    def stream_model(self, db: Session, user_id: int, messages: List[Dict[str, str]], model_id: Optional[int] = None, custom_config: Optional[Dict[str, Any]] = None, use_cache: bool = False) -> Dict[str, Any]:
+        """
+        Call an AI model with a streamed completion
+        
+        On success the result holds "stream", an iterator over the content
+        deltas; errors while streaming are raised by the iterator. With
+        use_cache a cached response is returned as a single chunk, and a
+        fully received stream is cached.
+        """
+        db_model = self._resolve_model(db, user_id, model_id)
+        if not db_model:
+            return {
+                "success": False,
+                "error": "No active model found"
+            }
+        
+        params = self._completion_params(db_model, custom_config)
+        cache_key = None
+        if use_cache and ai_response_cache.enabled:
+            cache_key = ai_response_cache.make_key(db_model, messages, params)
+            cached = ai_response_cache.get(cache_key)
+            if cached is not None:
+                return {
+                    "success": True,
+                    "stream": iter([cached]),
+                    "model_used": db_model.name,
+                    "cached": True,
+                    "cache_key": cache_key
+                }
+        
+        try:
+            client = ai_client_registry.get_client(db_model, self._decrypt_api_key)
+            response = client.chat.completions.create(
+                model=db_model.model_id,
+                messages=messages,
+                stream=True,
+                **params
+            )
+        except Exception as e:
+            logger.error(f"Error streaming model {db_model.id}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        
+        def content_deltas() -> Iterator[str]:
+            received = []
+            try:
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        received.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            finally:
+                response.close()
+            if cache_key and received:
+                ai_response_cache.set(cache_key, "".join(received))
+        
+        return {
+            "success": True,
+            "stream": content_deltas(),
+            "model_used": db_model.name,
+            "cached": False,
+            "cache_key": cache_key
+        }
 
 
 # Global service instance
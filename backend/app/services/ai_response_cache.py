@@ -0,0 +1,216 @@
+"""
+Content-addressed cache of AI model responses
+
+Re-running task generation with the same project and parameters produces
+the same prompt. The cache key is a SHA-256 of the normalized messages, the
+AI model configuration (ID and last update) and the sampling parameters, so
+an identical request is answered without the paid, slow model round trip,
+while any change to the prompt, the model or its settings misses.
+
+Backends (AI_CACHE_BACKEND):
+- memory: in-process LRU, lost on restart
+- sqlite: a local SQLite file shared by the worker processes of one host
+- none: caching disabled
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.ai_model import AIModel
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class MemoryCacheBackend:
+    """Thread-safe LRU of (expires_at, value)"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """LRU of entries in a local SQLite file"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_ai_response_cache_accessed_at ON ai_response_cache (accessed_at)"
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM ai_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM ai_response_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE ai_response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_response_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl_seconds, now)
+            )
+            # Drop expired entries, then the least recently used ones beyond the limit
+            self._conn.execute("DELETE FROM ai_response_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM ai_response_cache WHERE key IN ("
+                "SELECT key FROM ai_response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_response_cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_response_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ai_response_cache").fetchone()[0]
+
+
+def _create_backend(name: str):
+    if name == "memory":
+        return MemoryCacheBackend(settings.AI_CACHE_MAX_ENTRIES)
+    if name == "sqlite":
+        return SQLiteCacheBackend(settings.AI_CACHE_PATH, settings.AI_CACHE_MAX_ENTRIES)
+    return None
+
+
+class AIResponseCache:
+    """AI response cache with hit/miss counters"""
+
+    def __init__(self, backend=None, ttl_seconds: Optional[int] = None):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AI_CACHE_TTL_SECONDS
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl_seconds > 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so formatting-only prompt differences share an entry"""
+        return _WHITESPACE.sub(" ", text).strip()
+
+    def make_key(self, db_model: AIModel, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """Cache key of a model call"""
+        payload = {
+            "model": [db_model.id, db_model.model_id, db_model.updated_at.isoformat() if db_model.updated_at else None],
+            "params": params,
+            "messages": [[m["role"], self.normalize(m["content"])] for m in messages],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"AI response cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, value, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"AI response cache write failed: {e}")
+
+    def invalidate(self, key: str):
+        """Drop an entry (e.g. a response that turned out to be unusable)"""
+        if self.enabled:
+            self.backend.delete(key)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.enabled else "none",
+            "entries": len(self.backend) if self.enabled else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global cache instance
+ai_response_cache = AIResponseCache(_create_backend(settings.AI_CACHE_BACKEND))
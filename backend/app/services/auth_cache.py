@@ -0,0 +1,161 @@
+"""
+Authenticated principal cache
+
+Maps a SHA-256 hash of a JWT or access key to a snapshot of the user it
+resolved to, so repeated requests with the same credential skip the token
+decode, the user/key queries and the key lookup. Entries expire after
+AUTH_CACHE_TTL_SECONDS (or earlier, when the token or key expires), the
+least recently used entries are evicted beyond AUTH_CACHE_MAX_SIZE, and
+entries are dropped as soon as their user or access key changes.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class _CachedPrincipal:
+    """Column values of an authenticated user and what authenticated them"""
+
+    __slots__ = ("user_values", "user_id", "key_id", "expires_at")
+
+    def __init__(self, user_values: Dict[str, Any], key_id: Optional[int], expires_at: float):
+        self.user_values = user_values
+        self.user_id = user_values["id"]
+        self.key_id = key_id
+        self.expires_at = expires_at
+
+
+class AuthCache:
+    """TTL + LRU cache of authenticated users keyed by credential hash"""
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_size: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AUTH_CACHE_TTL_SECONDS
+        self.max_size = max_size if max_size is not None else settings.AUTH_CACHE_MAX_SIZE
+        self._entries: "OrderedDict[str, _CachedPrincipal]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._by_key: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _hash(credential: str) -> str:
+        return hashlib.sha256(credential.encode()).hexdigest()
+
+    def get_user(self, db: Session, credential: str) -> Optional[User]:
+        """Return the cached user for a JWT, attached to db, or None"""
+        principal = self.get_principal(db, credential)
+        if principal is None or principal[1] is not None:
+            # Access keys are only valid where API-key auth is accepted
+            return None
+        return principal[0]
+
+    def get_principal(self, db: Session, credential: str) -> Optional[Tuple[User, Optional[int]]]:
+        """
+        Return (user, access key ID or None) for a cached credential, or None
+
+        The user is rebuilt from the snapshot and merged into the session
+        without a SELECT, so it can be modified and lazy-load relationships
+        like a user loaded by the request itself.
+        """
+        if self.ttl_seconds <= 0:
+            return None
+
+        digest = self._hash(credential)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(digest)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            user_values, key_id = entry.user_values, entry.key_id
+
+        user = User(**user_values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False), key_id
+
+    def put_user(
+        self,
+        credential: str,
+        user: User,
+        key_id: Optional[int] = None,
+        expires_at: Optional[datetime] = None
+    ):
+        """
+        Cache the active user a credential authenticated as
+
+        expires_at is the credential's own expiry (JWT exp or key expiry);
+        the entry never outlives it.
+        """
+        if self.ttl_seconds <= 0 or not user.is_active:
+            return
+
+        ttl = self.ttl_seconds
+        if expires_at is not None:
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+            if ttl <= 0:
+                return
+
+        user_values = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+        digest = self._hash(credential)
+        with self._lock:
+            self._remove(digest)
+            self._entries[digest] = _CachedPrincipal(user_values, key_id, time.monotonic() + ttl)
+            self._by_user.setdefault(user.id, set()).add(digest)
+            if key_id is not None:
+                self._by_key.setdefault(key_id, set()).add(digest)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, digest: str):
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        self._by_user.get(entry.user_id, set()).discard(digest)
+        if entry.key_id is not None:
+            self._by_key.get(entry.key_id, set()).discard(digest)
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached credential of a user (profile change, deactivation, deletion)"""
+        with self._lock:
+            for digest in list(self._by_user.pop(user_id, ())):
+                self._remove(digest)
+        logger.debug(f"Invalidated cached credentials of user {user_id}")
+
+    def invalidate_key(self, key_id: int):
+        """Drop a cached access key (toggled, updated or deleted)"""
+        with self._lock:
+            for digest in list(self._by_key.pop(key_id, ())):
+                self._remove(digest)
+        logger.debug(f"Invalidated cached access key {key_id}")
+
+    def clear(self):
+        """Drop all cached credentials"""
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._by_key.clear()
+
+
+# Global cache instance
+auth_cache = AuthCache()
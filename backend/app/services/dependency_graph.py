@@ -0,0 +1,205 @@
+"""
+In-memory task dependency graph index
+
+Keeps a per-project adjacency list of task dependency edges so cycle checks
+run as an iterative in-memory traversal instead of one SELECT per visited
+node. Each project graph is loaded with a single query on first use. Before
+a walk uses it, one aggregate query reads the project's edge count and
+highest edge ID; if either differs from the loaded graph's, edges were added
+or removed (by this or another worker process) and the graph is reloaded.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.models.task import Task, TaskDependency
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectDependencyGraph:
+    """Dependency edges whose dependent task belongs to one project"""
+
+    def __init__(self, marker: Tuple[int, Optional[int]]):
+        # Edge count and highest edge ID when the graph was loaded
+        self.marker = marker
+        # task_id -> IDs of the tasks it depends on
+        self.depends_on: Dict[int, Set[int]] = {}
+        # depends_on_id -> IDs of the tasks that depend on it
+        self.dependents: Dict[int, Set[int]] = {}
+        self.loaded_at = time.monotonic()
+
+    def add_edge(self, task_id: int, depends_on_id: int):
+        self.depends_on.setdefault(task_id, set()).add(depends_on_id)
+        self.dependents.setdefault(depends_on_id, set()).add(task_id)
+
+    def remove_task(self, task_id: int):
+        for depends_on_id in self.depends_on.pop(task_id, set()):
+            self.dependents.get(depends_on_id, set()).discard(task_id)
+        for dependent_id in self.dependents.pop(task_id, set()):
+            self.depends_on.get(dependent_id, set()).discard(task_id)
+
+
+class DependencyGraphIndex:
+    """Process-wide cache of per-project dependency graphs"""
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.DEPENDENCY_GRAPH_TTL_SECONDS
+        self._graphs: Dict[Optional[int], ProjectDependencyGraph] = {}
+        # Project of every task seen as an edge endpoint, used to find which
+        # graph holds a node's outgoing edges during cross-project traversal
+        self._task_projects: Dict[int, Optional[int]] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _filter_project(query, dependent, project_id: Optional[int]):
+        if project_id is None:
+            return query.filter(dependent.project_id.is_(None))
+        return query.filter(dependent.project_id == project_id)
+
+    def _marker(self, db: Session, project_id: Optional[int]) -> Tuple[int, Optional[int]]:
+        """Edge count and highest edge ID of a project, which change whenever its edges do"""
+        dependent = aliased(Task)
+        query = db.query(func.count(TaskDependency.id), func.max(TaskDependency.id)).join(
+            dependent, TaskDependency.task_id == dependent.id
+        )
+        count, max_id = self._filter_project(query, dependent, project_id).one()
+        return count, max_id
+
+    def _load(
+        self, db: Session, project_id: Optional[int], marker: Tuple[int, Optional[int]]
+    ) -> ProjectDependencyGraph:
+        """Load all edges of a project (None for standalone tasks) in one query"""
+        dependent = aliased(Task)
+        dependency = aliased(Task)
+        query = db.query(
+            TaskDependency.task_id, TaskDependency.depends_on_id, dependency.project_id
+        ).join(
+            dependent, TaskDependency.task_id == dependent.id
+        ).join(
+            dependency, TaskDependency.depends_on_id == dependency.id
+        )
+
+        graph = ProjectDependencyGraph(marker)
+        for task_id, depends_on_id, depends_on_project_id in self._filter_project(query, dependent, project_id):
+            graph.add_edge(task_id, depends_on_id)
+            self._task_projects[task_id] = project_id
+            self._task_projects[depends_on_id] = depends_on_project_id
+
+        logger.debug(f"Loaded dependency graph for project {project_id} with {len(graph.depends_on)} tasks")
+        return graph
+
+    def _get_graph(self, db: Session, project_id: Optional[int]) -> ProjectDependencyGraph:
+        """
+        A project's graph as the database has it now
+
+        The marker is read before the edges, so an edge committed in between
+        only makes the next check reload once more.
+        """
+        marker = self._marker(db, project_id)
+        graph = self._graphs.get(project_id)
+        if (graph is None or graph.marker != marker
+                or time.monotonic() - graph.loaded_at > self.ttl_seconds):
+            graph = self._load(db, project_id, marker)
+            self._graphs[project_id] = graph
+        return graph
+
+    def would_create_cycle(
+        self,
+        db: Session,
+        task_id: int,
+        task_project_id: Optional[int],
+        depends_on_id: int,
+        depends_on_project_id: Optional[int]
+    ) -> bool:
+        """
+        Check whether "task_id depends on depends_on_id" would close a cycle
+
+        That is the case when depends_on_id already depends, directly or
+        transitively, on task_id. The walk is iterative, so deep chains cannot
+        hit the recursion limit.
+        """
+        if task_id == depends_on_id:
+            return True
+
+        with self._lock:
+            self._task_projects.setdefault(task_id, task_project_id)
+            self._task_projects.setdefault(depends_on_id, depends_on_project_id)
+
+            # Graphs resolved during this walk, so freshness is checked once per project
+            graphs: Dict[Optional[int], ProjectDependencyGraph] = {}
+            visited = {depends_on_id}
+            stack = [depends_on_id]
+            while stack:
+                node = stack.pop()
+                project_id = self._task_projects.get(node)
+                graph = graphs.get(project_id)
+                if graph is None:
+                    graph = graphs[project_id] = self._get_graph(db, project_id)
+                for next_id in graph.depends_on.get(node, ()):
+                    if next_id == task_id:
+                        return True
+                    if next_id not in visited:
+                        visited.add(next_id)
+                        stack.append(next_id)
+
+        return False
+
+    def add_edge(self, task_id: int, task_project_id: Optional[int],
+                 depends_on_id: int, depends_on_project_id: Optional[int]):
+        """
+        Record a committed dependency
+
+        The project's edge marker has changed, so its graph is reloaded on
+        next use rather than patched.
+        """
+        with self._lock:
+            self._task_projects[task_id] = task_project_id
+            self._task_projects[depends_on_id] = depends_on_project_id
+            self._graphs.pop(task_project_id, None)
+
+    def remove_edge(self, task_id: int, task_project_id: Optional[int], depends_on_id: int):
+        """Record a committed dependency removal; the project's graph is reloaded on next use"""
+        with self._lock:
+            self._graphs.pop(task_project_id, None)
+
+    def remove_task(self, task_id: int, project_id: Optional[int]):
+        """Drop a deleted task and its edges from every loaded graph"""
+        self.remove_tasks([task_id], [project_id])
+
+    def remove_tasks(self, task_ids: Iterable[int], project_ids: Iterable[Optional[int]]):
+        """
+        Drop deleted tasks and their edges from every loaded graph
+
+        The graphs of the tasks' own projects are discarded as a whole.
+        """
+        task_ids = list(task_ids)
+        with self._lock:
+            for project_id in project_ids:
+                self._graphs.pop(project_id, None)
+            for graph in self._graphs.values():
+                for task_id in task_ids:
+                    graph.remove_task(task_id)
+            for task_id in task_ids:
+                self._task_projects.pop(task_id, None)
+
+    def invalidate(self, project_id: Optional[int]):
+        """Forget one project's graph (None is the standalone task graph)"""
+        with self._lock:
+            self._graphs.pop(project_id, None)
+
+    def clear(self):
+        """Forget all loaded graphs"""
+        with self._lock:
+            self._graphs.clear()
+            self._task_projects.clear()
+
+
+# Global index instance
+dependency_graph_index = DependencyGraphIndex()
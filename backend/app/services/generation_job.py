@@ -0,0 +1,298 @@
+"""
+AI task generation jobs
+
+Task generation blocks on the AI provider for up to a minute, so it runs as
+a background job instead of inside the request. Jobs are stored in the
+generation_jobs table and executed on a bounded thread pool; a queued job
+only starts when its user and its AI model are below AI_JOB_MAX_PER_USER
+and AI_JOB_MAX_PER_MODEL running jobs, so one user or one slow provider
+cannot take every worker. Clients poll GET /jobs/{id} for the result, or
+subscribe to a streaming job's events to receive each task as it is saved.
+"""
+
+import json
+import logging
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.generation_job import GenerationJob, GenerationJobStatus
+from app.schemas.task import TaskGenerateRequest
+from app.services.ai_model import ai_model_service
+from app.services.task import task_service
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationJobLimitError(Exception):
+    """Raised when a user already has too many queued or running jobs"""
+    pass
+
+
+class GenerationJobService:
+    """Job table access plus the worker pool that runs queued jobs"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_per_user: Optional[int] = None,
+        max_per_model: Optional[int] = None,
+        max_pending_per_user: Optional[int] = None
+    ):
+        self.max_workers = max_workers or settings.AI_JOB_WORKERS
+        self.max_per_user = max_per_user or settings.AI_JOB_MAX_PER_USER
+        self.max_per_model = max_per_model or settings.AI_JOB_MAX_PER_MODEL
+        self.max_pending_per_user = max_pending_per_user or settings.AI_JOB_MAX_PENDING_PER_USER
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # (job id, user id, model id) waiting for a free slot, oldest first
+        self._queue: Deque[Tuple[int, int, Optional[int]]] = deque()
+        self._pending_by_user: Counter = Counter()
+        self._running_by_user: Counter = Counter()
+        self._running_by_model: Counter = Counter()
+        self._running = 0
+        self._futures: Dict[int, Future] = {}
+        # job id -> callback(event, data) of streaming jobs, called from the worker thread
+        self._listeners: Dict[int, Callable[[str, Dict[str, Any]], None]] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Create the worker pool"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ai-generation"
+                )
+                logger.info(f"AI generation worker pool started with {self.max_workers} workers")
+
+    def stop(self):
+        """Wait for running jobs; queued jobs stay queued in the database"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            for job_id, user_id, _ in self._queue:
+                self._release_pending(user_id)
+                self._futures.pop(job_id, None)
+                self._listeners.pop(job_id, None)
+            self._queue.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
+            logger.info("AI generation worker pool stopped")
+
+    def create_job(
+        self,
+        db: Session,
+        user_id: int,
+        project_id: int,
+        generate_request: TaskGenerateRequest,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> GenerationJob:
+        """
+        Store a generation job for a project the caller owns and queue it
+        
+        With on_event the job streams the model output and reports progress
+        from the worker thread: "started" when it runs, "task" with each
+        saved task and "done" with the final result.
+        """
+        # Resolve the model now, so the per-model limit applies to the model the job will use
+        if generate_request.model_id:
+            db_model = ai_model_service.get_model(db, generate_request.model_id, user_id)
+            if not db_model:
+                raise ValueError("AI model not found")
+        else:
+            db_model = ai_model_service.get_default_model(db, user_id)
+        model_id = db_model.id if db_model else None
+
+        with self._lock:
+            if self._pending_by_user[user_id] >= self.max_pending_per_user:
+                raise GenerationJobLimitError(
+                    f"Too many generation jobs in progress (limit {self.max_pending_per_user})"
+                )
+            self._pending_by_user[user_id] += 1
+
+        try:
+            job = GenerationJob(
+                user_id=user_id,
+                project_id=project_id,
+                model_id=model_id,
+                status=GenerationJobStatus.QUEUED,
+                request=json.loads(generate_request.json())
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._release_pending(user_id)
+            raise
+
+        if on_event is not None:
+            self._listeners[job.id] = on_event
+        self._enqueue(job.id, user_id, model_id)
+        logger.info(f"Queued AI generation job {job.id} for project {project_id}")
+        return job
+
+    def get_job(self, db: Session, job_id: int, user_id: int) -> Optional[GenerationJob]:
+        """Get a job of a user"""
+        return db.query(GenerationJob).filter(
+            GenerationJob.id == job_id, GenerationJob.user_id == user_id
+        ).first()
+
+    def job_future(self, job_id: int) -> Optional[Future]:
+        """
+        Future resolved with the job's result dict when it finishes
+
+        Returns None if the job is not queued in this process (already finished).
+        """
+        return self._futures.get(job_id)
+
+    def recover_pending(self):
+        """
+        Requeue jobs left queued by a previous process
+
+        Jobs that were running when the process stopped may have created
+        their tasks already, so they are marked failed rather than rerun.
+        """
+        db = SessionLocal()
+        try:
+            interrupted = db.query(GenerationJob).filter(
+                GenerationJob.status == GenerationJobStatus.RUNNING
+            ).update({
+                "status": GenerationJobStatus.FAILED,
+                "error": "Interrupted by server restart",
+                "finished_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+
+            queued = db.query(GenerationJob.id, GenerationJob.user_id, GenerationJob.model_id).filter(
+                GenerationJob.status == GenerationJobStatus.QUEUED
+            ).order_by(GenerationJob.id).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            for _, user_id, _ in queued:
+                self._pending_by_user[user_id] += 1
+        for job_id, user_id, model_id in queued:
+            self._enqueue(job_id, user_id, model_id)
+
+        if interrupted or queued:
+            logger.info(f"Recovered AI generation jobs: {len(queued)} requeued, {interrupted} interrupted")
+
+    def _enqueue(self, job_id: int, user_id: int, model_id: Optional[int]):
+        self.start()
+        with self._lock:
+            self._futures[job_id] = Future()
+            self._queue.append((job_id, user_id, model_id))
+        self._dispatch()
+
+    def _dispatch(self):
+        """Start queued jobs whose user and model have a free slot"""
+        with self._lock:
+            if self._executor is None:
+                return
+            skipped: Deque[Tuple[int, int, Optional[int]]] = deque()
+            while self._queue and self._running < self.max_workers:
+                job_id, user_id, model_id = entry = self._queue.popleft()
+                if (self._running_by_user[user_id] >= self.max_per_user
+                        or self._running_by_model[model_id] >= self.max_per_model):
+                    skipped.append(entry)
+                    continue
+                self._running += 1
+                self._running_by_user[user_id] += 1
+                self._running_by_model[model_id] += 1
+                self._executor.submit(self._run_job, job_id, user_id, model_id)
+            # Jobs held back by a limit keep their place in line
+            skipped.extend(self._queue)
+            self._queue = skipped
+
+    def _run_job(self, job_id: int, user_id: int, model_id: Optional[int]):
+        result: Dict[str, Any] = {}
+        on_event = self._listeners.get(job_id)
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+            if job is None:
+                return
+            job.status = GenerationJobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            db.commit()
+            project_id = job.project_id
+
+            generate_request = TaskGenerateRequest(**job.request)
+            generate_request.model_id = model_id
+            if on_event is None:
+                response = task_service.generate_tasks_with_ai(
+                    db=db,
+                    user_id=user_id,
+                    project_id=project_id,
+                    generate_request=generate_request
+                )
+            else:
+                self._notify(on_event, "started", {"job_id": job_id})
+                response = task_service.stream_tasks_with_ai(
+                    db=db,
+                    user_id=user_id,
+                    project_id=project_id,
+                    generate_request=generate_request,
+                    on_task=lambda task_id, task: self._notify(
+                        on_event, "task", {"id": task_id, **json.loads(task.json())}
+                    )
+                )
+            result = json.loads(response.json())
+
+            job.status = GenerationJobStatus.SUCCEEDED if response.success else GenerationJobStatus.FAILED
+            job.result = result
+            job.error = None if response.success else response.message
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            logger.info(f"AI generation job {job_id} finished: {job.status.value}")
+        except Exception as e:
+            logger.error(f"AI generation job {job_id} failed: {e}")
+            db.rollback()
+            result = {"success": False, "message": f"Task generation failed: {str(e)}"}
+            try:
+                db.query(GenerationJob).filter(GenerationJob.id == job_id).update({
+                    "status": GenerationJobStatus.FAILED,
+                    "error": str(e),
+                    "finished_at": datetime.utcnow()
+                }, synchronize_session=False)
+                db.commit()
+            except Exception as update_error:
+                db.rollback()
+                logger.error(f"Error marking AI generation job {job_id} failed: {update_error}")
+        finally:
+            db.close()
+            with self._lock:
+                self._running -= 1
+                self._running_by_user[user_id] -= 1
+                self._running_by_model[model_id] -= 1
+                self._release_pending(user_id)
+                future = self._futures.pop(job_id, None)
+                self._listeners.pop(job_id, None)
+            if future is not None:
+                future.set_result(result)
+            if on_event is not None:
+                self._notify(on_event, "done", result)
+            self._dispatch()
+
+    @staticmethod
+    def _notify(on_event: Callable[[str, Dict[str, Any]], None], event: str, data: Dict[str, Any]):
+        try:
+            on_event(event, data)
+        except Exception as e:
+            logger.warning(f"Error delivering AI generation job event '{event}': {e}")
+
+    def _release_pending(self, user_id: int):
+        self._pending_by_user[user_id] -= 1
+        if self._pending_by_user[user_id] <= 0:
+            del self._pending_by_user[user_id]
+
+
+# Global service instance
+generation_job_service = GenerationJobService()
@@ -0,0 +1,65 @@
+"""
+Cached diffs between progress document versions
+
+Versions never change once written, so the diff of two versions of a
+document is computed once (app.core.line_diff) and kept in an LRU cache
+keyed by (progress ID, version A, version B) until it falls out or the
+document is deleted. Only the opcodes are cached; hunk lines are cut from
+the version texts, which the history store caches itself.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.line_diff import LineDiff, diff_lines
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressDiffCache:
+    """LRU cache of computed version diffs"""
+
+    def __init__(self, cache_size: Optional[int] = None, max_edit_distance: Optional[int] = None):
+        self.cache_size = cache_size if cache_size is not None else settings.PROGRESS_DIFF_CACHE_SIZE
+        self.max_edit_distance = (max_edit_distance if max_edit_distance is not None
+                                  else settings.PROGRESS_DIFF_MAX_EDIT_DISTANCE)
+        self._cache: "OrderedDict[Tuple[int, int, int], LineDiff]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_diff(
+        self, progress_id: int, version_a: int, version_b: int, lines_a: Sequence[str], lines_b: Sequence[str]
+    ) -> LineDiff:
+        """Diff of two versions, given their lines"""
+        key = (progress_id, version_a, version_b)
+        with self._lock:
+            diff = self._cache.get(key)
+            if diff is not None:
+                self._cache.move_to_end(key)
+                return diff
+
+        diff = diff_lines(lines_a, lines_b, self.max_edit_distance)
+        if diff.approximate:
+            logger.info(f"Diff of progress {progress_id} versions {version_a} and {version_b} hit the cost cap")
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = diff
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return diff
+
+    def forget(self, progress_id: int):
+        """Drop the cached diffs of a deleted document"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == progress_id]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Global cache instance
+progress_diff_cache = ProgressDiffCache()
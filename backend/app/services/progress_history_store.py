@@ -0,0 +1,279 @@
+"""
+Delta-compressed storage of progress document history
+
+With PROGRESS_HISTORY_STORAGE=delta a version is stored as a compressed
+line delta against the previous version, with a compressed full snapshot
+every PROGRESS_SNAPSHOT_INTERVAL versions (and whenever the delta would not
+be smaller), so reading any version applies at most interval - 1 deltas.
+"full" stores the plain text of every version as before; rows of both
+kinds can be mixed in one history.
+
+History written before delta storage (or with "full") stays plain text
+until `manage_db.py compress-progress-history` converts it with
+compress_history().
+
+Reconstructed texts are kept in an LRU cache of hot versions keyed by
+(progress ID, version). Versions never change once written, so entries
+only go away when the cache is full or the document is deleted.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.line_delta import apply_delta, compress_text, decompress_text, make_delta
+from app.models.project_progress import ProgressHistory
+
+logger = logging.getLogger(__name__)
+
+FULL = "full"
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+
+class ProgressHistoryStore:
+    """Writes and reconstructs ProgressHistory versions"""
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        snapshot_interval: Optional[int] = None,
+        cache_size: Optional[int] = None
+    ):
+        self.mode = mode if mode is not None else settings.PROGRESS_HISTORY_STORAGE
+        self.snapshot_interval = max(1, snapshot_interval if snapshot_interval is not None
+                                     else settings.PROGRESS_SNAPSHOT_INTERVAL)
+        self.cache_size = cache_size if cache_size is not None else settings.PROGRESS_VERSION_CACHE_SIZE
+        self._cache: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Cache
+
+    def _cache_get(self, progress_id: int, version: int) -> Optional[str]:
+        with self._lock:
+            content = self._cache.get((progress_id, version))
+            if content is not None:
+                self._cache.move_to_end((progress_id, version))
+            return content
+
+    def _cache_put(self, progress_id: int, version: int, content: str):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[(progress_id, version)] = content
+            self._cache.move_to_end((progress_id, version))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def forget(self, progress_id: int):
+        """Drop the cached versions of a deleted document"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == progress_id]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    # Writing
+
+    def encode(
+        self, version: int, content: str, previous_content: Optional[str], mode: Optional[str] = None
+    ) -> Dict[str, object]:
+        """
+        Column values storing content as a version
+
+        previous_content is the text of version - 1 (None for the first
+        version); mode overrides the configured storage mode.
+        """
+        mode = mode or self.mode
+        if mode == FULL:
+            return {"storage": FULL, "stored_content": content, "data": None}
+
+        snapshot = compress_text(content)
+        if previous_content is None or (version - 1) % self.snapshot_interval == 0:
+            return {"storage": SNAPSHOT, "stored_content": None, "data": snapshot}
+
+        delta = make_delta(previous_content, content)
+        if len(delta) >= len(snapshot):
+            return {"storage": SNAPSHOT, "stored_content": None, "data": snapshot}
+        return {"storage": DELTA, "stored_content": None, "data": delta}
+
+    def new_entry(
+        self,
+        progress_id: int,
+        version: int,
+        content: str,
+        previous_content: Optional[str],
+        change_summary: Optional[str],
+        updated_by: int
+    ) -> ProgressHistory:
+        """
+        A ProgressHistory row for a new version, with its content set
+
+        previous_content must be the text of version - 1 as stored, read with
+        the document row locked; the caller calls remember() once the row is
+        committed.
+        """
+        entry = ProgressHistory(
+            progress_id=progress_id,
+            version=version,
+            change_summary=change_summary,
+            updated_by=updated_by,
+            **self.encode(version, content, previous_content)
+        )
+        entry.content = content
+        return entry
+
+    def remember(self, progress_id: int, version: int, content: str):
+        """Cache the text of a version whose new_entry() row was committed"""
+        self._cache_put(progress_id, version, content)
+
+    def compress_history(self, db: Session, batch_size: int = 100) -> int:
+        """
+        Convert plain text history rows to snapshots and deltas, one committed document at a time
+
+        Reads batch_size versions per query. Returns the number of rows converted.
+        """
+        progress_ids = [row.progress_id for row in db.query(ProgressHistory.progress_id).filter(
+            ProgressHistory.storage == FULL
+        ).distinct().all()]
+
+        converted = 0
+        for progress_id in progress_ids:
+            previous_content = None
+            last_version = 0
+            while True:
+                rows = db.query(ProgressHistory).filter(
+                    ProgressHistory.progress_id == progress_id,
+                    ProgressHistory.version > last_version
+                ).order_by(ProgressHistory.version).limit(batch_size).all()
+                if not rows:
+                    break
+                for row in rows:
+                    content = self._decode(row, previous_content)
+                    if row.storage == FULL:
+                        for column, value in self.encode(row.version, content, previous_content, DELTA).items():
+                            setattr(row, column, value)
+                        converted += 1
+                    previous_content = content
+                    last_version = row.version
+                db.flush()
+                db.expunge_all()
+            db.commit()
+            logger.info(f"Compressed the history of progress document {progress_id}")
+        return converted
+
+    # Reading
+
+    @staticmethod
+    def _decode(entry, previous_content: Optional[str]) -> str:
+        """Text of a stored row, given the text of the version before it for deltas"""
+        if entry.storage == FULL:
+            return entry.stored_content
+        if entry.storage == SNAPSHOT:
+            return decompress_text(entry.data)
+        if previous_content is None:
+            raise ValueError(f"Delta of progress version {entry.version} has no base version")
+        return apply_delta(previous_content, entry.data)
+
+    def _chain_start(self, db: Session, progress_id: int, version: int) -> Tuple[int, Optional[str]]:
+        """
+        The version to start reconstructing version from, and its text
+
+        That is the nearest cached version at or after the last full row
+        (snapshot or plain text) up to version; (base, None) means the row
+        at base has to be read as well.
+        """
+        base = db.query(func.max(ProgressHistory.version)).filter(
+            ProgressHistory.progress_id == progress_id,
+            ProgressHistory.version <= version,
+            ProgressHistory.storage != DELTA
+        ).scalar()
+        if base is None:
+            base = 1
+
+        for cached_version in range(version, base - 1, -1):
+            content = self._cache_get(progress_id, cached_version)
+            if content is not None:
+                return cached_version, content
+        return base, None
+
+    def _rows(self, db: Session, progress_id: int, first: int, last: int):
+        """Stored rows of versions first..last, oldest first"""
+        return db.query(
+            ProgressHistory.version, ProgressHistory.storage, ProgressHistory.stored_content, ProgressHistory.data
+        ).filter(
+            and_(
+                ProgressHistory.progress_id == progress_id,
+                ProgressHistory.version >= first,
+                ProgressHistory.version <= last
+            )
+        ).order_by(ProgressHistory.version).all()
+
+    def versions_content(self, db: Session, progress_id: int, versions: Iterable[int]) -> Dict[int, str]:
+        """
+        Texts of several versions of one document
+
+        Reads the stored rows from the chain start of the oldest uncached
+        version up to the newest one in a single query.
+        """
+        contents: Dict[int, str] = {}
+        missing = []
+        for version in set(versions):
+            content = self._cache_get(progress_id, version)
+            if content is None:
+                missing.append(version)
+            else:
+                contents[version] = content
+        if not missing:
+            return contents
+
+        wanted = set(missing)
+        start, content = self._chain_start(db, progress_id, min(missing))
+        first = start + 1 if content is not None else start
+        for row in self._rows(db, progress_id, first, max(missing)):
+            content = self._decode(row, content)
+            if row.version in wanted:
+                contents[row.version] = content
+                self._cache_put(progress_id, row.version, content)
+        if start in wanted and start not in contents and content is not None:
+            contents[start] = content
+        return contents
+
+    def get_content(self, db: Session, progress_id: int, version: int) -> Optional[str]:
+        """Text of one version, or None if it does not exist"""
+        return self.versions_content(db, progress_id, [version]).get(version)
+
+    def load_contents(self, db: Session, entries: Sequence[ProgressHistory]) -> Sequence[ProgressHistory]:
+        """Fill in the content of ProgressHistory rows"""
+        by_progress: Dict[int, List[ProgressHistory]] = {}
+        for entry in entries:
+            by_progress.setdefault(entry.progress_id, []).append(entry)
+
+        for progress_id, progress_entries in by_progress.items():
+            contents = self.versions_content(db, progress_id, [entry.version for entry in progress_entries])
+            for entry in progress_entries:
+                entry.content = contents.get(entry.version)
+        return entries
+
+    def iter_versions(self, db: Session, progress_id: int, after_version: int = 0) -> Iterator[Tuple[int, str]]:
+        """(version, text) of every version after after_version, oldest first"""
+        start, content = self._chain_start(db, progress_id, after_version + 1)
+        first = start + 1 if content is not None else start
+        if content is not None and start > after_version:
+            # A cached chain start is not read again, so it is yielded here
+            yield start, content
+        for row in self._rows(db, progress_id, first, 2 ** 31 - 1):
+            content = self._decode(row, content)
+            if row.version > after_version:
+                yield row.version, content
+
+
+# Global store instance
+progress_history_store = ProgressHistoryStore()
@@ -0,0 +1,210 @@
+"""
+Full-text search index over progress documents and their history
+
+Each project's progress document, and every ProgressHistory version of it,
+is indexed with the shared tokenizer (app.core.text_search), which splits
+Chinese text into character bigrams. A project's document is indexed on
+first use; its history, which means reconstructing every version, only
+when a search asks for history. Both are then kept current incrementally:
+the progress service adds the new version after update_progress and
+restore_version, and searches compare each document's version with the
+indexed one and index only the versions added since (for example by other
+worker processes), instead of rebuilding.
+
+Indexing runs under a lock per project, so one project's history build
+does not hold up searches of other projects. At most
+PROGRESS_SEARCH_MAX_INDEXES project indexes are kept, least recently used
+first out, and indexes unused for PROGRESS_SEARCH_INDEX_TTL_SECONDS are
+dropped.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.text_search import InvertedIndex
+from app.models.project import Project
+from app.models.project_progress import ProjectProgress, ProgressHistory
+from app.services.progress_history_store import progress_history_store
+
+logger = logging.getLogger(__name__)
+
+# Change summaries describe a version in a few words, so their matches count double
+HISTORY_FIELD_WEIGHTS = {"content": 1.0, "change_summary": 2.0}
+
+
+class ProgressMatch:
+    """A matching progress document (history_id None) or history version"""
+
+    __slots__ = ("project_id", "progress_id", "history_id", "score")
+
+    def __init__(self, project_id: int, progress_id: int, history_id: Optional[int], score: float):
+        self.project_id = project_id
+        self.progress_id = progress_id
+        self.history_id = history_id
+        self.score = score
+
+
+class ProjectProgressIndex:
+    """Search index of one project's progress document and, once requested, its history"""
+
+    def __init__(self, progress_id: int):
+        self.progress_id = progress_id
+        self.lock = threading.Lock()
+        self.used_at = time.monotonic()
+        # Version of the indexed current content
+        self.version = 0
+        self.current = InvertedIndex({"content": 1.0})
+        # Highest indexed history version; None until history is first searched
+        self.history_version: Optional[int] = None
+        self.history = InvertedIndex(HISTORY_FIELD_WEIGHTS)
+        # history ID -> version, to leave out the row of the current version
+        self.history_versions: Dict[int, int] = {}
+
+    def add_history(self, history_id: int, version: int, content: str, change_summary: Optional[str]):
+        self.history.add(history_id, {"content": content, "change_summary": change_summary})
+        self.history_versions[history_id] = version
+        self.history_version = version
+
+    def set_current(self, version: int, content: str):
+        self.current.add(self.progress_id, {"content": content})
+        self.version = version
+
+    def catch_up(self, db: Session, version: int, include_history: bool):
+        """Index the current content if older than version, and the history versions not indexed yet"""
+        if include_history and (self.history_version is None or self.history_version < version):
+            after_version = self.history_version or 0
+            rows = {
+                row.version: row for row in db.query(
+                    ProgressHistory.id, ProgressHistory.version, ProgressHistory.change_summary
+                ).filter(
+                    ProgressHistory.progress_id == self.progress_id,
+                    ProgressHistory.version > after_version
+                ).all()
+            }
+            self.history_version = after_version
+            for history_version, content in progress_history_store.iter_versions(
+                db, self.progress_id, after_version
+            ):
+                row = rows.get(history_version)
+                if row is not None:
+                    self.add_history(row.id, history_version, content, row.change_summary)
+            logger.debug(f"Indexed {len(rows)} progress versions of document {self.progress_id}")
+
+        if self.version < version:
+            content = db.query(ProjectProgress.content).filter(ProjectProgress.id == self.progress_id).scalar()
+            self.set_current(version, content or "")
+
+
+class ProgressSearchIndex:
+    """Process-wide, bounded cache of per-project progress search indexes"""
+
+    def __init__(self, max_indexes: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_indexes = max_indexes or settings.PROGRESS_SEARCH_MAX_INDEXES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.PROGRESS_SEARCH_INDEX_TTL_SECONDS
+        # project ID -> index, least recently used first
+        self._indexes: "OrderedDict[int, ProjectProgressIndex]" = OrderedDict()
+        # Guards _indexes only; indexing runs under each index's own lock
+        self._lock = threading.Lock()
+
+    def _index_for(self, project_id: int, progress_id: int, version: int) -> ProjectProgressIndex:
+        """The cached index of a document, replaced if it belongs to another or is ahead of it"""
+        now = time.monotonic()
+        with self._lock:
+            index = self._indexes.get(project_id)
+            if index is None or index.progress_id != progress_id or index.version > version:
+                # New, recreated or otherwise unknown document: index it from scratch
+                index = self._indexes[project_id] = ProjectProgressIndex(progress_id)
+            index.used_at = now
+            self._indexes.move_to_end(project_id)
+
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+            while self._indexes:
+                oldest_id, oldest = next(iter(self._indexes.items()))
+                if now - oldest.used_at <= self.ttl_seconds:
+                    break
+                del self._indexes[oldest_id]
+            return index
+
+    def search(
+        self,
+        db: Session,
+        user_id: int,
+        text: str,
+        project_ids: Optional[List[int]] = None,
+        include_history: bool = False
+    ) -> List[ProgressMatch]:
+        """
+        Progress documents (and history versions) of the user matching text
+
+        Sorted best first. History matches leave out each document's current
+        version, which is matched as the document itself. History is only
+        indexed when include_history is set.
+        """
+        query = db.query(ProjectProgress.id, ProjectProgress.project_id, ProjectProgress.version).join(
+            Project, ProjectProgress.project_id == Project.id
+        ).filter(Project.user_id == user_id)
+        if project_ids:
+            query = query.filter(ProjectProgress.project_id.in_(project_ids))
+        documents: List[Tuple[int, int, int]] = query.all()
+
+        matches: List[ProgressMatch] = []
+        for progress_id, project_id, version in documents:
+            index = self._index_for(project_id, progress_id, version)
+            with index.lock:
+                index.catch_up(db, version, include_history)
+                for match_id, score in index.current.search(text):
+                    matches.append(ProgressMatch(project_id, match_id, None, score))
+                if not include_history:
+                    continue
+                for history_id, score in index.history.search(text):
+                    if index.history_versions[history_id] != index.version:
+                        matches.append(ProgressMatch(project_id, index.progress_id, history_id, score))
+
+        matches.sort(key=lambda match: -match.score)
+        return matches
+
+    def add_version(
+        self,
+        project_id: int,
+        progress_id: int,
+        history_id: int,
+        version: int,
+        content: str,
+        change_summary: Optional[str]
+    ):
+        """
+        Record a committed new version (the document's current content) in the loaded index, if any
+
+        Parts of the index that are not exactly one version behind are left
+        for the next search to catch up.
+        """
+        with self._lock:
+            index = self._indexes.get(project_id)
+        if index is None or index.progress_id != progress_id:
+            return
+        with index.lock:
+            if index.history_version == version - 1:
+                index.add_history(history_id, version, content, change_summary)
+            if index.version == version - 1:
+                index.set_current(version, content)
+
+    def invalidate(self, project_id: int):
+        """Forget one project's index (after its document is deleted)"""
+        with self._lock:
+            self._indexes.pop(project_id, None)
+
+    def clear(self):
+        """Forget all loaded indexes"""
+        with self._lock:
+            self._indexes.clear()
+
+
+# Global index instance
+progress_search_index = ProgressSearchIndex()
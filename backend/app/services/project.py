@@ -5,12 +5,16 @@ Project service layer
 import logging
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, case
+from sqlalchemy import and_, func
 from datetime import datetime
 
+from app.core.pagination import decode_cursor, keyset_filter
 from app.models.project import Project, ProjectStatus
-from app.models.task import Task, TaskStatus
+from app.models.project_purge import ProjectPurge
+from app.models.project_task_stats import ProjectTaskStats
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectSettingsUpdate, ProjectStats
+from app.services.project_purge import project_purge_service
+from app.services.task_stats import task_stats_service
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -19,9 +23,28 @@ logger = logging.getLogger(__name__)
 class ProjectService:
     """Service for managing projects"""
     
+    @staticmethod
+    def project_cursor_key(project: Project) -> tuple:
+        """Keyset pagination key for project listings"""
+        return (project.created_at, project.id)
+    
+    @staticmethod
+    def _paginate(query, skip: int, limit: int, cursor: Optional[str]):
+        """Apply (created_at, id) ordering with keyset or offset pagination"""
+        query = query.order_by(Project.created_at, Project.id)
+        
+        if cursor:
+            sort_columns = (Project.created_at, Project.id)
+            query = query.filter(keyset_filter(sort_columns, decode_cursor(cursor, len(sort_columns))))
+        else:
+            query = query.offset(skip)
+        
+        return query.limit(limit)
+    
     @staticmethod
     def get_projects(db: Session, user_id: int, skip: int = 0, limit: int = 100, 
-                    status: Optional[ProjectStatus] = None, include_deleted: bool = False) -> List[Project]:
+                    status: Optional[ProjectStatus] = None, include_deleted: bool = False,
+                    cursor: Optional[str] = None) -> List[Project]:
         """Get all projects for a user"""
         query = db.query(Project).filter(Project.user_id == user_id)
         
@@ -31,7 +54,7 @@ class ProjectService:
         if status:
             query = query.filter(Project.status == status)
         
-        return query.offset(skip).limit(limit).all()
+        return ProjectService._paginate(query, skip, limit, cursor).all()
     
     @staticmethod
     def get_project(db: Session, project_id: int, user_id: int, include_deleted: bool = False) -> Optional[Project]:
@@ -100,23 +123,41 @@ class ProjectService:
     
     @staticmethod
     def delete_project(db: Session, project_id: int, user_id: int, soft_delete: bool = True) -> bool:
-        """Delete a project (soft delete by default)"""
+        """Delete a project (soft delete by default; a hard delete queues a purge)"""
+        if not soft_delete:
+            return ProjectService.purge_project(db, project_id, user_id) is not None
+        
         db_project = ProjectService.get_project(db, project_id, user_id)
         if not db_project:
             return False
         
-        if soft_delete:
-            db_project.is_deleted = True
-            db_project.updated_at = datetime.utcnow()
-            db.commit()
-            logger.info(f"Soft deleted project {project_id} for user {user_id}")
-        else:
-            db.delete(db_project)
-            db.commit()
-            logger.info(f"Hard deleted project {project_id} for user {user_id}")
-        
+        db_project.is_deleted = True
+        db_project.deleted_at = datetime.utcnow()
+        db_project.updated_at = datetime.utcnow()
+        db.commit()
+        logger.info(f"Soft deleted project {project_id} for user {user_id}")
         return True
     
+    @staticmethod
+    def purge_project(db: Session, project_id: int, user_id: int) -> Optional[ProjectPurge]:
+        """
+        Permanently delete a project (soft-deleted ones included)
+        
+        The project is hidden at once and its rows are deleted in the
+        background by the purge worker; poll the returned purge for progress.
+        """
+        db_project = ProjectService.get_project(db, project_id, user_id, include_deleted=True)
+        if not db_project:
+            return None
+        
+        purge = project_purge_service.request_purge(db, db_project)
+        db.commit()
+        db.refresh(purge)
+        project_purge_service.wake()
+        
+        logger.info(f"Queued purge {purge.id} of project {project_id} for user {user_id}")
+        return purge
+    
     @staticmethod
     def restore_project(db: Session, project_id: int, user_id: int) -> Optional[Project]:
         """Restore a soft-deleted project"""
@@ -124,7 +165,12 @@ class ProjectService:
         if not db_project or not db_project.is_deleted:
             return None
         
+        # A started purge may already have deleted some of the project's tasks
+        if project_purge_service.unfinished_purge(db, project_id) is not None:
+            raise ValueError("Project is being permanently deleted")
+        
         db_project.is_deleted = False
+        db_project.deleted_at = None
         db_project.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(db_project)
@@ -133,37 +179,49 @@ class ProjectService:
         return db_project
     
     @staticmethod
-    def get_project_stats(db: Session, project_id: int, user_id: int) -> Optional[ProjectStats]:
-        """Get project statistics"""
-        db_project = ProjectService.get_project(db, project_id, user_id)
-        if not db_project:
-            return None
-        
-        # Query task statistics
-        task_stats = db.query(
-            func.count(Task.id).label('total_tasks'),
-            func.sum(case((Task.status == TaskStatus.DONE, 1), else_=0)).label('completed_tasks'),
-            func.sum(case((Task.status == TaskStatus.PENDING, 1), else_=0)).label('pending_tasks'),
-            func.sum(case((Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)).label('in_progress_tasks'),
-            func.max(Task.updated_at).label('last_activity')
-        ).filter(Task.project_id == project_id).first()
-        
-        total_tasks = task_stats.total_tasks or 0
-        completed_tasks = task_stats.completed_tasks or 0
-        pending_tasks = task_stats.pending_tasks or 0
-        in_progress_tasks = task_stats.in_progress_tasks or 0
+    def _build_project_stats(task_stats: Optional[ProjectTaskStats]) -> ProjectStats:
+        """Build a ProjectStats schema from a rollup row (None for a project without one)"""
+        if task_stats is None:
+            return ProjectStats()
         
+        total_tasks = task_stats.total_tasks
+        completed_tasks = task_stats.done_tasks
         completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0.0
         
         return ProjectStats(
             total_tasks=total_tasks,
             completed_tasks=completed_tasks,
-            pending_tasks=pending_tasks,
-            in_progress_tasks=in_progress_tasks,
+            pending_tasks=task_stats.pending_tasks,
+            in_progress_tasks=task_stats.in_progress_tasks,
             completion_percentage=round(completion_percentage, 2),
             last_activity=task_stats.last_activity
         )
     
+    @staticmethod
+    def get_project_stats(db: Session, project_id: int, user_id: int) -> Optional[ProjectStats]:
+        """Get project statistics from the task stats rollup"""
+        db_project = ProjectService.get_project(db, project_id, user_id)
+        if not db_project:
+            return None
+        
+        task_stats = task_stats_service.get_stats(db, [project_id]).get(project_id)
+        return ProjectService._build_project_stats(task_stats)
+    
+    @staticmethod
+    def get_projects_stats(db: Session, project_ids: List[int]) -> Dict[int, ProjectStats]:
+        """
+        Get statistics for a page of projects with a single rollup query.
+        
+        Callers are expected to pass IDs of projects the user already owns
+        (e.g. the result of get_projects/search_projects). Projects without
+        tasks are returned with empty stats.
+        """
+        rows = task_stats_service.get_stats(db, project_ids)
+        return {
+            project_id: ProjectService._build_project_stats(rows.get(project_id))
+            for project_id in project_ids
+        }
+    
     @staticmethod
     def update_project_settings(db: Session, project_id: int, user_id: int, 
                               settings_data: ProjectSettingsUpdate) -> Optional[Project]:
@@ -188,16 +246,18 @@ class ProjectService:
         return db_project
     
     @staticmethod
-    def search_projects(db: Session, user_id: int, query: str, skip: int = 0, limit: int = 100) -> List[Project]:
+    def search_projects(db: Session, user_id: int, query: str, skip: int = 0, limit: int = 100,
+                        cursor: Optional[str] = None) -> List[Project]:
         """Search projects by name or description"""
         search_filter = f"%{query}%"
-        return db.query(Project).filter(
+        db_query = db.query(Project).filter(
             and_(
                 Project.user_id == user_id,
                 Project.is_deleted == False,
                 (Project.name.ilike(search_filter) | Project.description.ilike(search_filter))
             )
-        ).offset(skip).limit(limit).all()
+        )
+        return ProjectService._paginate(db_query, skip, limit, cursor).all()
     
     @staticmethod
     def get_project_count(db: Session, user_id: int, status: Optional[ProjectStatus] = None) -> int:
@@ -3,7 +3,6 @@ Project Progress service layer
 """
 
 import logging
-import difflib
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, func, desc
@@ -12,9 +11,14 @@ from datetime import datetime
 from app.models.project_progress import ProjectProgress, ProgressHistory
 from app.models.project import Project
 from app.schemas.project_progress import (
-    ProjectProgressCreate, ProjectProgressUpdate, ProgressSearchRequest,
-    ProjectProgressStats, ProgressVersionCompare, analyze_content, generate_change_summary
+    ProjectProgressCreate, ProjectProgressUpdate, ProgressSearchRequest, ProgressSearchHit,
+    ProjectProgressStats, ProgressVersionCompare, ProgressDiffHunk, analyze_content, generate_change_summary
 )
+from app.core.line_diff import DEFAULT_CONTEXT, group_opcodes, make_hunk
+from app.core.text_search import make_snippet
+from app.services.progress_diff import progress_diff_cache
+from app.services.progress_history_store import progress_history_store
+from app.services.progress_search import progress_search_index
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,18 @@ class ProjectProgressService:
             )
         ).first()
     
+    @staticmethod
+    def _lock_progress(db: Session, progress: ProjectProgress) -> ProjectProgress:
+        """
+        Lock the document row until commit and reload it
+        
+        A new version is stored as a delta against the current content, so
+        concurrent writers must read that content one after the other.
+        """
+        return db.query(ProjectProgress).filter(
+            ProjectProgress.id == progress.id
+        ).with_for_update().populate_existing().one()
+    
     def get_progress_with_history(
         self, 
         db: Session, 
@@ -58,7 +74,7 @@ class ProjectProgressService:
                 ProgressHistory.progress_id == progress.id
             ).order_by(desc(ProgressHistory.version)).limit(limit_history).all()
             
-            progress.history = history
+            progress.history = progress_history_store.load_contents(db, history)
         
         return progress
     
@@ -99,10 +115,11 @@ class ProjectProgressService:
         db.flush()  # Get the ID
         
         # Create initial history entry
-        history_entry = ProgressHistory(
+        history_entry = progress_history_store.new_entry(
             progress_id=db_progress.id,
             version=1,
             content=progress_data.content,
+            previous_content=None,
             change_summary=progress_data.change_summary or "Initial document creation",
             updated_by=user_id
         )
@@ -110,6 +127,7 @@ class ProjectProgressService:
         db.add(history_entry)
         db.commit()
         db.refresh(db_progress)
+        progress_history_store.remember(db_progress.id, 1, progress_data.content)
         
         logger.info(f"Created progress document for project {project_id} by user {user_id}")
         return db_progress
@@ -125,6 +143,7 @@ class ProjectProgressService:
         db_progress = self.get_progress(db, project_id, user_id)
         if not db_progress:
             return None
+        db_progress = self._lock_progress(db, db_progress)
         
         # Store old content for change tracking
         old_content = db_progress.content
@@ -152,18 +171,26 @@ class ProjectProgressService:
         
         # Create history entry if content changed
         if content_changed:
-            history_entry = ProgressHistory(
+            history_entry = progress_history_store.new_entry(
                 progress_id=db_progress.id,
                 version=db_progress.version,
                 content=update_data["content"],
+                previous_content=old_content,
                 change_summary=update_data.get("change_summary", "Content updated"),
                 updated_by=user_id
             )
             db.add(history_entry)
+            db.flush()
+            new_version = (history_entry.id, history_entry.version, history_entry.content,
+                           history_entry.change_summary)
         
         db.commit()
         db.refresh(db_progress)
         
+        if content_changed:
+            progress_history_store.remember(db_progress.id, *new_version[1:3])
+            progress_search_index.add_version(project_id, db_progress.id, *new_version)
+        
         logger.info(f"Updated progress document for project {project_id} by user {user_id}")
         return db_progress
     
@@ -179,9 +206,14 @@ class ProjectProgressService:
         ).delete()
         
         # Delete progress document
+        progress_id = db_progress.id
         db.delete(db_progress)
         db.commit()
         
+        progress_search_index.invalidate(project_id)
+        progress_history_store.forget(progress_id)
+        progress_diff_cache.forget(progress_id)
+        
         logger.info(f"Deleted progress document for project {project_id} by user {user_id}")
         return True
     
@@ -198,9 +230,10 @@ class ProjectProgressService:
         if not progress:
             return []
         
-        return db.query(ProgressHistory).filter(
+        history = db.query(ProgressHistory).filter(
             ProgressHistory.progress_id == progress.id
         ).order_by(desc(ProgressHistory.version)).offset(skip).limit(limit).all()
+        return progress_history_store.load_contents(db, history)
     
     def get_progress_version(
         self, 
@@ -214,12 +247,15 @@ class ProjectProgressService:
         if not progress:
             return None
         
-        return db.query(ProgressHistory).filter(
+        history_entry = db.query(ProgressHistory).filter(
             and_(
                 ProgressHistory.progress_id == progress.id,
                 ProgressHistory.version == version
             )
         ).first()
+        if history_entry:
+            progress_history_store.load_contents(db, [history_entry])
+        return history_entry
     
     def compare_versions(
         self, 
@@ -227,53 +263,55 @@ class ProjectProgressService:
         project_id: int, 
         version_a: int, 
         version_b: int, 
-        user_id: int
+        user_id: int,
+        hunks_only: bool = False,
+        hunk_offset: int = 0,
+        hunk_limit: Optional[int] = None,
+        context: int = DEFAULT_CONTEXT
     ) -> Optional[ProgressVersionCompare]:
-        """Compare two versions of progress document"""
+        """
+        Compare two versions of progress document
+        
+        Returns the hunks from hunk_offset (all of them without hunk_limit)
+        and their unified diff; with hunks_only the full contents are left
+        out. Line counts always cover the whole diff.
+        """
         progress = self.get_progress(db, project_id, user_id)
         if not progress:
             return None
         
-        # Get both versions
-        hist_a = db.query(ProgressHistory).filter(
-            and_(
-                ProgressHistory.progress_id == progress.id,
-                ProgressHistory.version == version_a
-            )
-        ).first()
-        
-        hist_b = db.query(ProgressHistory).filter(
-            and_(
-                ProgressHistory.progress_id == progress.id,
-                ProgressHistory.version == version_b
-            )
-        ).first()
-        
-        if not hist_a or not hist_b:
+        # Get both versions (reconstructed together from one chain of stored rows)
+        contents = progress_history_store.versions_content(db, progress.id, [version_a, version_b])
+        if version_a not in contents or version_b not in contents:
             return None
+        content_a, content_b = contents[version_a], contents[version_b]
+        lines_a = content_a.splitlines(keepends=True)
+        lines_b = content_b.splitlines(keepends=True)
         
-        # Generate diff
-        diff = list(difflib.unified_diff(
-            hist_a.content.splitlines(keepends=True),
-            hist_b.content.splitlines(keepends=True),
-            fromfile=f"Version {version_a}",
-            tofile=f"Version {version_b}",
-            lineterm=""
-        ))
+        # Generate diff (cached per version pair) and cut the requested hunks
+        diff = progress_diff_cache.get_diff(progress.id, version_a, version_b, lines_a, lines_b)
+        groups = group_opcodes(diff.opcodes, context)
+        page = groups[hunk_offset:] if hunk_limit is None else groups[hunk_offset:hunk_offset + hunk_limit]
+        hunks = [make_hunk(group, lines_a, lines_b) for group in page]
         
-        # Count changes
-        added_lines = len([line for line in diff if line.startswith('+')])
-        removed_lines = len([line for line in diff if line.startswith('-')])
+        summary = [f"--- Version {version_a}", f"+++ Version {version_b}"] if hunks else []
+        for hunk in hunks:
+            summary.append(hunk.header)
+            summary.extend(hunk.lines)
         
         return ProgressVersionCompare(
             version_a=version_a,
             version_b=version_b,
-            content_a=hist_a.content,
-            content_b=hist_b.content,
-            changes_summary='\n'.join(diff),
-            added_lines=added_lines,
-            removed_lines=removed_lines,
-            modified_lines=min(added_lines, removed_lines)
+            content_a=None if hunks_only else content_a,
+            content_b=None if hunks_only else content_b,
+            changes_summary='\n'.join(summary),
+            added_lines=diff.added_lines,
+            removed_lines=diff.removed_lines,
+            modified_lines=min(diff.added_lines, diff.removed_lines),
+            hunks=[ProgressDiffHunk.from_orm(hunk) for hunk in hunks],
+            total_hunks=len(groups),
+            hunk_offset=hunk_offset,
+            approximate=diff.approximate
         )
     
     def get_progress_stats(self, db: Session, project_id: int, user_id: int) -> Optional[ProjectProgressStats]:
@@ -313,9 +351,13 @@ class ProjectProgressService:
         ).join(Project).filter(Project.user_id == user_id)
         
         # Apply filters
+        scores = None
         if search_request.query:
-            search_term = f"%{search_request.query}%"
-            query = query.filter(ProjectProgress.content.ilike(search_term))
+            matches = progress_search_index.search(
+                db, user_id, search_request.query, search_request.project_ids
+            )
+            scores = {match.progress_id: match.score for match in matches}
+            query = query.filter(ProjectProgress.id.in_(list(scores)))
         
         if search_request.project_ids:
             query = query.filter(ProjectProgress.project_id.in_(search_request.project_ids))
@@ -329,16 +371,118 @@ class ProjectProgressService:
         if search_request.updated_to:
             query = query.filter(ProjectProgress.updated_at <= search_request.updated_to)
         
+        query = query.order_by(desc(ProjectProgress.updated_at))
+        if scores is not None and search_request.sort_by == "relevance":
+            # At most one document per project, so matches are ranked in memory
+            results = sorted(query.all(), key=lambda progress: -scores[progress.id])
+            end = search_request.skip + search_request.limit
+            return results[search_request.skip:end], len(results)
+        
         # Get total count
         total_count = query.count()
         
-        # Apply pagination and ordering
-        results = query.order_by(desc(ProjectProgress.updated_at)).offset(
-            search_request.skip
-        ).limit(search_request.limit).all()
+        # Apply pagination
+        results = query.offset(search_request.skip).limit(search_request.limit).all()
         
         return results, total_count
     
+    def search_progress_hits(
+        self,
+        db: Session,
+        user_id: int,
+        search_request: ProgressSearchRequest
+    ) -> Tuple[List[ProgressSearchHit], int]:
+        """
+        Search progress documents and, optionally, their history versions
+        
+        Returns matches by relevance with a highlighted snippet each. Only
+        the contents of the returned page are loaded.
+        """
+        if not search_request.query or not search_request.query.strip():
+            raise ValueError("Search query is required")
+        
+        matches = progress_search_index.search(
+            db, user_id, search_request.query, search_request.project_ids,
+            include_history=search_request.include_history
+        )
+        if not matches:
+            return [], 0
+        
+        # Apply filters to document and version metadata
+        documents_query = db.query(
+            ProjectProgress.id, ProjectProgress.version, ProjectProgress.updated_at
+        ).filter(ProjectProgress.id.in_({match.progress_id for match in matches}))
+        if search_request.is_published is not None:
+            documents_query = documents_query.filter(ProjectProgress.is_published == search_request.is_published)
+        documents = {row.id: row for row in documents_query.all()}
+        
+        versions = {}
+        history_ids = [match.history_id for match in matches if match.history_id is not None]
+        if history_ids:
+            versions_query = db.query(
+                ProgressHistory.id, ProgressHistory.version, ProgressHistory.change_summary, ProgressHistory.created_at
+            ).filter(ProgressHistory.id.in_(history_ids))
+            if search_request.updated_from:
+                versions_query = versions_query.filter(ProgressHistory.created_at >= search_request.updated_from)
+            if search_request.updated_to:
+                versions_query = versions_query.filter(ProgressHistory.created_at <= search_request.updated_to)
+            versions = {row.id: row for row in versions_query.all()}
+        
+        current_ids = set(documents)
+        if search_request.updated_from or search_request.updated_to:
+            current_query = db.query(ProjectProgress.id).filter(ProjectProgress.id.in_(current_ids))
+            if search_request.updated_from:
+                current_query = current_query.filter(ProjectProgress.updated_at >= search_request.updated_from)
+            if search_request.updated_to:
+                current_query = current_query.filter(ProjectProgress.updated_at <= search_request.updated_to)
+            current_ids = {row.id for row in current_query.all()}
+        
+        visible = [
+            match for match in matches
+            if match.progress_id in documents and (
+                match.progress_id in current_ids if match.history_id is None else match.history_id in versions
+            )
+        ]
+        page = visible[search_request.skip:search_request.skip + search_request.limit]
+        
+        # Load the contents of the page for the snippets
+        current_contents = dict(db.query(ProjectProgress.id, ProjectProgress.content).filter(
+            ProjectProgress.id.in_([match.progress_id for match in page if match.history_id is None])
+        ).all())
+        history_contents = {}
+        page_versions: Dict[int, List[int]] = {}
+        for match in page:
+            if match.history_id is not None:
+                page_versions.setdefault(match.progress_id, []).append(versions[match.history_id].version)
+        for progress_id, progress_versions in page_versions.items():
+            contents = progress_history_store.versions_content(db, progress_id, progress_versions)
+            history_contents.update({(progress_id, v): content for v, content in contents.items()})
+        
+        hits = []
+        for match in page:
+            document = documents[match.progress_id]
+            if match.history_id is None:
+                content = current_contents.get(match.progress_id, "")
+                version, change_summary, updated_at = document.version, None, document.updated_at
+            else:
+                entry = versions[match.history_id]
+                content = history_contents.get((match.progress_id, entry.version), "")
+                version, change_summary, updated_at = entry.version, entry.change_summary, entry.created_at
+            snippet, highlights = make_snippet(content, search_request.query)
+            hits.append(ProgressSearchHit(
+                project_id=match.project_id,
+                progress_id=match.progress_id,
+                version=version,
+                is_current=match.history_id is None,
+                score=match.score,
+                snippet=snippet,
+                highlights=[list(span) for span in highlights],
+                change_summary=change_summary,
+                updated_at=updated_at
+            ))
+        
+        return hits, len(visible)
+    
     def restore_version(
         self, 
         db: Session, 
@@ -351,36 +495,37 @@ class ProjectProgressService:
         progress = self.get_progress(db, project_id, user_id)
         if not progress:
             return None
+        progress = self._lock_progress(db, progress)
         
         # Get the version to restore
-        history_entry = db.query(ProgressHistory).filter(
-            and_(
-                ProgressHistory.progress_id == progress.id,
-                ProgressHistory.version == version
-            )
-        ).first()
-        
-        if not history_entry:
+        restored_content = progress_history_store.get_content(db, progress.id, version)
+        if restored_content is None:
             return None
         
         # Update progress with historical content
         old_content = progress.content
-        progress.content = history_entry.content
+        progress.content = restored_content
         progress.version += 1
         progress.updated_by = user_id
         
         # Create new history entry for the restoration
-        new_history = ProgressHistory(
+        new_history = progress_history_store.new_entry(
             progress_id=progress.id,
             version=progress.version,
-            content=history_entry.content,
+            content=restored_content,
+            previous_content=old_content,
             change_summary=change_summary or f"Restored to version {version}",
             updated_by=user_id
         )
         
         db.add(new_history)
+        db.flush()
+        new_version = (new_history.id, new_history.version, new_history.content, new_history.change_summary)
         db.commit()
         db.refresh(progress)
+        progress_history_store.remember(progress.id, *new_version[1:3])
+        
+        progress_search_index.add_version(project_id, progress.id, *new_version)
         
         logger.info(f"Restored progress document for project {project_id} to version {version}")
         return progress
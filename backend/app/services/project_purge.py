@@ -0,0 +1,313 @@
+"""
+Permanent project deletion
+
+A hard delete used to load the project's tasks, subtasks and dependencies
+through ORM cascades and delete them in one transaction, holding locks for
+as long as that took. Now it hides the project and records a purge in the
+project_purges table, and a background worker deletes the project's rows
+in chunks of PROJECT_PURGE_CHUNK_SIZE tasks (then progress history rows),
+committing each chunk together with the purge's progress counters. The
+project row goes last.
+
+Every chunk deletes whatever is left of the project, so an interrupted
+purge is resumed by running it again: RUNNING purges left by a crash or a
+shutdown are picked up like QUEUED ones. The worker also queues purges for
+projects soft-deleted more than PROJECT_PURGE_RETENTION_DAYS ago, which
+retries failed purges once their project's retention window has passed.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.generation_job import GenerationJob
+from app.models.project import Project
+from app.models.project_progress import ProjectProgress, ProgressHistory
+from app.models.project_purge import ProjectPurge, ProjectPurgeStatus
+from app.models.project_task import ProjectTask
+from app.models.project_task_stats import ProjectTaskStats
+from app.models.task import Task, TaskDependency
+from app.models.task_log import TaskLog
+from app.services.dependency_graph import dependency_graph_index
+from app.services.progress_diff import progress_diff_cache
+from app.services.progress_history_store import progress_history_store
+from app.services.progress_search import progress_search_index
+from app.services.task_search import task_search_index
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (ProjectPurgeStatus.QUEUED, ProjectPurgeStatus.RUNNING)
+
+
+class ProjectPurgeService:
+    """Purge table access plus the worker thread that runs purges"""
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        retention_days: Optional[int] = None
+    ):
+        self.chunk_size = chunk_size or settings.PROJECT_PURGE_CHUNK_SIZE
+        self.interval = interval or settings.PROJECT_PURGE_INTERVAL_SECONDS
+        self.retention_days = (retention_days if retention_days is not None
+                               else settings.PROJECT_PURGE_RETENTION_DAYS)
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker thread if it is not running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="project-purge", daemon=True)
+        self._thread.start()
+        logger.info("Project purge worker started")
+
+    def stop(self):
+        """Stop the worker after its current chunk; an unfinished purge resumes on the next start"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+            logger.info("Project purge worker stopped")
+
+    def wake(self):
+        """Make the worker look for queued purges now"""
+        self._wake.set()
+
+    def get_purge(self, db: Session, purge_id: int, user_id: int) -> Optional[ProjectPurge]:
+        """Get a purge of a user"""
+        return db.query(ProjectPurge).filter(
+            ProjectPurge.id == purge_id, ProjectPurge.user_id == user_id
+        ).first()
+
+    def unfinished_purge(self, db: Session, project_id: int) -> Optional[ProjectPurge]:
+        """The project's latest purge that has not succeeded, if any"""
+        return db.query(ProjectPurge).filter(
+            ProjectPurge.project_id == project_id, ProjectPurge.status != ProjectPurgeStatus.SUCCEEDED
+        ).order_by(ProjectPurge.id.desc()).first()
+
+    @staticmethod
+    def _new_purge(db: Session, project: Project, reason: str) -> ProjectPurge:
+        purge = ProjectPurge(
+            project_id=project.id,
+            project_name=project.name,
+            user_id=project.user_id,
+            reason=reason,
+            status=ProjectPurgeStatus.QUEUED,
+            deleted_tasks=0,
+            deleted_rows=0,
+            attempts=0
+        )
+        db.add(purge)
+        return purge
+
+    def request_purge(self, db: Session, project: Project, reason: str = "requested") -> ProjectPurge:
+        """
+        Hide a project and queue its purge in the caller's transaction
+
+        Returns the project's queued or running purge if it already has one.
+        The caller commits, then calls wake().
+        """
+        purge = self.unfinished_purge(db, project.id)
+        if purge is not None and purge.status in ACTIVE_STATUSES:
+            return purge
+
+        if not project.is_deleted:
+            project.is_deleted = True
+            project.deleted_at = datetime.utcnow()
+        return self._new_purge(db, project, reason)
+
+    def queue_expired(self, db: Session) -> int:
+        """Queue purges of projects soft-deleted longer than the retention window; returns how many"""
+        if self.retention_days <= 0:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        active = db.query(ProjectPurge.project_id).filter(ProjectPurge.status.in_(ACTIVE_STATUSES))
+        projects = db.query(Project).filter(
+            Project.is_deleted == True,
+            Project.deleted_at <= cutoff,
+            Project.id.not_in(active)
+        ).all()
+        for project in projects:
+            self._new_purge(db, project, "retention")
+        db.commit()
+
+        if projects:
+            logger.info(f"Queued purges of {len(projects)} projects deleted before {cutoff}")
+        return len(projects)
+
+    def requeue_failed(self, db: Session) -> int:
+        """Queue failed purges again; returns how many"""
+        count = db.query(ProjectPurge).filter(ProjectPurge.status == ProjectPurgeStatus.FAILED).update(
+            {"status": ProjectPurgeStatus.QUEUED}, synchronize_session=False
+        )
+        db.commit()
+        return count
+
+    def run_pending(self) -> int:
+        """
+        Run queued and interrupted purges, oldest first
+
+        Returns the number of purges finished (succeeded or failed) before
+        none were left or the worker was stopped.
+        """
+        finished = 0
+        while not self._stopping.is_set():
+            db = SessionLocal()
+            try:
+                purge_id = db.query(ProjectPurge.id).filter(
+                    ProjectPurge.status.in_(ACTIVE_STATUSES)
+                ).order_by(ProjectPurge.id).limit(1).scalar()
+            finally:
+                db.close()
+            if purge_id is None or self.run_purge(purge_id) is None:
+                break
+            finished += 1
+        return finished
+
+    def run_purge(self, purge_id: int) -> Optional[ProjectPurgeStatus]:
+        """
+        Run one purge chunk by chunk
+
+        Returns its final status, or None if the worker was stopped before
+        it finished (it stays RUNNING and resumes on the next run).
+        """
+        db = SessionLocal()
+        try:
+            purge = db.query(ProjectPurge).filter(ProjectPurge.id == purge_id).first()
+            if purge is None or purge.status not in ACTIVE_STATUSES:
+                return purge.status if purge is not None else None
+
+            project_id = purge.project_id
+            purge.status = ProjectPurgeStatus.RUNNING
+            purge.attempts += 1
+            purge.error = None
+            if purge.started_at is None:
+                purge.started_at = datetime.utcnow()
+            if purge.total_tasks is None:
+                purge.total_tasks = db.query(func.count(Task.id)).filter(Task.project_id == project_id).scalar()
+            db.commit()
+            logger.info(f"Running purge {purge_id} of project {project_id} (attempt {purge.attempts})")
+
+            while not self._purge_chunk(db, purge_id, project_id):
+                if self._stopping.is_set():
+                    logger.info(f"Purge {purge_id} of project {project_id} interrupted; it resumes on the next run")
+                    return None
+
+            logger.info(f"Purged project {project_id} (purge {purge_id})")
+            return ProjectPurgeStatus.SUCCEEDED
+        except Exception as e:
+            logger.error(f"Purge {purge_id} failed: {e}")
+            db.rollback()
+            try:
+                db.query(ProjectPurge).filter(ProjectPurge.id == purge_id).update({
+                    "status": ProjectPurgeStatus.FAILED,
+                    "error": str(e),
+                    "finished_at": datetime.utcnow()
+                }, synchronize_session=False)
+                db.commit()
+            except Exception as update_error:
+                db.rollback()
+                logger.error(f"Error marking purge {purge_id} failed: {update_error}")
+            return ProjectPurgeStatus.FAILED
+        finally:
+            db.close()
+
+    def _purge_chunk(self, db: Session, purge_id: int, project_id: int) -> bool:
+        """Delete and commit the next chunk of a project's rows; True once the project row is gone"""
+        progress = {"updated_at": datetime.utcnow()}
+        task_ids = [row.id for row in db.query(Task.id).filter(
+            Task.project_id == project_id
+        ).order_by(Task.id).limit(self.chunk_size).all()]
+
+        if task_ids:
+            deleted = self._delete_tasks(db, task_ids)
+            progress.update(phase="tasks", deleted_tasks=ProjectPurge.deleted_tasks + len(task_ids))
+        else:
+            history_ids = [row.id for row in db.query(ProgressHistory.id).join(
+                ProjectProgress, ProgressHistory.progress_id == ProjectProgress.id
+            ).filter(ProjectProgress.project_id == project_id).limit(self.chunk_size).all()]
+            if history_ids:
+                deleted = db.query(ProgressHistory).filter(
+                    ProgressHistory.id.in_(history_ids)
+                ).delete(synchronize_session=False)
+                progress["phase"] = "progress"
+            else:
+                progress_ids = [row.id for row in db.query(ProjectProgress.id).filter(
+                    ProjectProgress.project_id == project_id
+                ).all()]
+                deleted = self._delete_project(db, project_id)
+                progress.update(
+                    phase=None, status=ProjectPurgeStatus.SUCCEEDED, finished_at=progress["updated_at"]
+                )
+
+        progress["deleted_rows"] = ProjectPurge.deleted_rows + deleted
+        db.query(ProjectPurge).filter(ProjectPurge.id == purge_id).update(progress, synchronize_session=False)
+        db.commit()
+
+        if task_ids:
+            dependency_graph_index.remove_tasks(task_ids, [project_id])
+        if "status" not in progress:
+            return False
+
+        for progress_id in progress_ids:
+            progress_history_store.forget(progress_id)
+            progress_diff_cache.forget(progress_id)
+        progress_search_index.invalidate(project_id)
+        task_search_index.invalidate(project_id)
+        dependency_graph_index.invalidate(project_id)
+        return True
+
+    @staticmethod
+    def _delete_tasks(db: Session, task_ids: List[int]) -> int:
+        """Delete tasks with their dependency edges, project links and logs; returns the rows deleted"""
+        # Subtasks in later chunks (or other projects) must not point at deleted tasks
+        db.query(Task).filter(Task.parent_id.in_(task_ids)).update({"parent_id": None}, synchronize_session=False)
+        deleted = db.query(TaskDependency).filter(
+            or_(TaskDependency.task_id.in_(task_ids), TaskDependency.depends_on_id.in_(task_ids))
+        ).delete(synchronize_session=False)
+        deleted += db.query(ProjectTask).filter(ProjectTask.task_id.in_(task_ids)).delete(synchronize_session=False)
+        deleted += db.query(TaskLog).filter(TaskLog.task_id.in_(task_ids)).delete(synchronize_session=False)
+        deleted += db.query(Task).filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
+        return deleted
+
+    @staticmethod
+    def _delete_project(db: Session, project_id: int) -> int:
+        """Delete the project row and its remaining per-project rows; returns the rows deleted"""
+        deleted = 0
+        for model in (ProjectProgress, ProjectTask, GenerationJob, ProjectTaskStats):
+            deleted += db.query(model).filter(model.project_id == project_id).delete(synchronize_session=False)
+        deleted += db.query(Project).filter(Project.id == project_id).delete(synchronize_session=False)
+        return deleted
+
+    def _run(self):
+        next_scan = 0.0
+        while not self._stopping.is_set():
+            try:
+                if time.monotonic() >= next_scan:
+                    next_scan = time.monotonic() + self.interval
+                    db = SessionLocal()
+                    try:
+                        self.queue_expired(db)
+                    finally:
+                        db.close()
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Project purge worker failed: {e}")
+            self._wake.wait(max(0.0, next_scan - time.monotonic()))
+            self._wake.clear()
+
+
+# Global service instance
+project_purge_service = ProjectPurgeService()
@@ -6,26 +6,116 @@ import time
 import json
 import logging
 import re
-from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc, asc, text
+from typing import Callable, List, Optional, Dict, Any, Tuple
+from sqlalchemy.orm import Session, joinedload, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, or_, func, desc, asc, text, select, insert, update, case, literal
 from datetime import datetime
 
+from app.core.json_stream import JSONArrayStreamParser
+from app.core.pagination import decode_cursor, keyset_filter
 from app.models.task import Task, TaskDependency, TaskStatus, TaskPriority
 from app.models.project import Project
+from app.models.project_task import ProjectTask
 from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskGenerateRequest, TaskGenerateResponse,
-    TaskSearchRequest, TaskStats, TaskBatchUpdate, TaskBatchStatusUpdate
+    TaskSearchRequest, TaskStats, TaskBatchUpdate, TaskBatchStatusUpdate, TaskListItem
 )
 from app.services.ai_model import ai_model_service
+from app.services.ai_response_cache import ai_response_cache
+from app.services.dependency_graph import dependency_graph_index
+from app.services.task_search import SEARCH_FIELDS, apply_search, task_search_index
 from app.services.task_log import task_log_service
+from app.services.task_stats import STATUS_COLUMNS, task_stats_service
 
 logger = logging.getLogger(__name__)
 
+# Sort columns usable for keyset pagination in search_tasks
+SEARCH_CURSOR_SORT_FIELDS = {"created_at", "updated_at", "order_index", "title", "id"}
+
+# Subtask levels loaded below a task when no max_depth is given; also stops
+# the recursive tree query on corrupt parent_id cycles
+TASK_TREE_DEPTH_LIMIT = 100
+
+# Higher max_tokens for task generation, lower temperature for more consistent JSON output
+TASK_GENERATION_CONFIG = {"max_tokens": 4000, "temperature": 0.3}
+
 
 class TaskService:
     """Service for managing tasks"""
     
+    @staticmethod
+    def task_cursor_key(task: Task) -> Tuple[Any, ...]:
+        """Keyset pagination key for task listings"""
+        return (task.order_index, task.created_at, task.id)
+    
+    @staticmethod
+    def search_cursor_key(task: Task, sort_by: str) -> Tuple[Any, ...]:
+        """Keyset pagination key for task search results"""
+        return (getattr(task, sort_by), task.id)
+    
+    @staticmethod
+    def _list_count_columns():
+        """
+        Correlated scalar subqueries for subtask and dependency counts
+        
+        Used by the list-mode queries instead of joinedload, so counting
+        children neither hydrates child objects nor multiplies result rows.
+        """
+        subtask = aliased(Task)
+        subtask_count = select(func.count(subtask.id)).where(
+            subtask.parent_id == Task.id
+        ).correlate(Task).scalar_subquery().label("subtask_count")
+        dependency_count = select(func.count(TaskDependency.id)).where(
+            TaskDependency.task_id == Task.id
+        ).correlate(Task).scalar_subquery().label("dependency_count")
+        return subtask_count, dependency_count
+    
+    @staticmethod
+    def _to_list_items(rows) -> List[TaskListItem]:
+        """Convert (Task, subtask_count, dependency_count) rows to list items"""
+        items = []
+        for task, subtask_count, dependency_count in rows:
+            item = TaskListItem.from_orm(task)
+            item.subtask_count = subtask_count or 0
+            item.dependency_count = dependency_count or 0
+            items.append(item)
+        return items
+    
+    def _filter_tasks(
+        self,
+        query,
+        user_id: int,
+        project_id: Optional[int],
+        parent_id: Optional[int],
+        skip: int,
+        limit: int,
+        cursor: Optional[str]
+    ):
+        """Apply ownership, filters, ordering and pagination for task listings"""
+        # Filter by project if specified
+        if project_id:
+            query = query.filter(Task.project_id == project_id)
+        else:
+            # Only show tasks from user's projects or standalone tasks
+            query = query.join(Project, Task.project_id == Project.id, isouter=True).filter(
+                or_(Project.user_id == user_id, Task.project_id.is_(None))
+            )
+        
+        # Filter by parent if specified
+        if parent_id is not None:
+            query = query.filter(Task.parent_id == parent_id)
+        
+        query = query.order_by(Task.order_index, Task.created_at, Task.id)
+        
+        if cursor:
+            sort_columns = (Task.order_index, Task.created_at, Task.id)
+            query = query.filter(keyset_filter(sort_columns, decode_cursor(cursor, len(sort_columns))))
+        else:
+            query = query.offset(skip)
+        
+        return query.limit(limit)
+    
     def get_tasks(
         self, 
         db: Session, 
@@ -33,29 +123,43 @@ class TaskService:
         project_id: Optional[int] = None,
         parent_id: Optional[int] = None,
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Task]:
-        """Get tasks with optional filtering"""
+        """
+        Get tasks with optional filtering
+        
+        Pass the cursor of the previous page to use keyset pagination on
+        (order_index, created_at, id); skip is ignored in that case.
+        """
         query = db.query(Task).options(
             joinedload(Task.subtasks),
             joinedload(Task.dependencies),
             joinedload(Task.project)
         )
         
-        # Filter by project if specified
-        if project_id:
-            query = query.filter(Task.project_id == project_id)
-        else:
-            # Only show tasks from user's projects or standalone tasks
-            query = query.join(Project, Task.project_id == Project.id, isouter=True).filter(
-                or_(Project.user_id == user_id, Task.project_id.is_(None))
-            )
-        
-        # Filter by parent if specified
-        if parent_id is not None:
-            query = query.filter(Task.parent_id == parent_id)
-        
-        return query.order_by(Task.order_index, Task.created_at).offset(skip).limit(limit).all()
+        return self._filter_tasks(query, user_id, project_id, parent_id, skip, limit, cursor).all()
+    
+    def get_task_list(
+        self, 
+        db: Session, 
+        user_id: int, 
+        project_id: Optional[int] = None,
+        parent_id: Optional[int] = None,
+        skip: int = 0, 
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[TaskListItem]:
+        """
+        List-mode variant of get_tasks
+        
+        Returns TaskListItem rows with subtask/dependency counts computed in
+        SQL, one row per task, without loading any child objects.
+        """
+        query = db.query(Task, *self._list_count_columns())
+        
+        rows = self._filter_tasks(query, user_id, project_id, parent_id, skip, limit, cursor).all()
+        return self._to_list_items(rows)
     
     def get_task(self, db: Session, task_id: int, user_id: int) -> Optional[Task]:
         """Get a specific task by ID"""
@@ -70,6 +174,67 @@ class TaskService:
             )
         ).first()
     
+    @staticmethod
+    def _task_tree_cte(root_conditions, depth_limit: int = TASK_TREE_DEPTH_LIMIT):
+        """Recursive CTE of (id, depth) for the tasks matching root_conditions and their subtasks"""
+        tree = select(Task.id.label("id"), literal(0).label("depth")).outerjoin(
+            Project, Task.project_id == Project.id
+        ).where(*root_conditions).cte("task_tree", recursive=True)
+        subtask = aliased(Task)
+        return tree.union_all(
+            select(subtask.id, tree.c.depth + 1).where(
+                and_(subtask.parent_id == tree.c.id, tree.c.depth < depth_limit)
+            )
+        )
+    
+    def _load_task_trees(self, db: Session, root_conditions, max_depth: Optional[int] = None) -> Dict[int, Task]:
+        """
+        Load the tasks matching root_conditions with their subtask trees in one query
+        
+        A recursive CTE walks parent_id down from the roots; the subtree's
+        tasks and their dependency rows come back in a single statement, and
+        the subtasks and dependencies collections are filled in memory, so
+        serializing the trees (TaskResponse.from_orm) issues no lazy loads.
+        Tasks max_depth levels below a root get empty subtasks. Returns every
+        loaded task by ID.
+        """
+        depth_limit = TASK_TREE_DEPTH_LIMIT if max_depth is None else min(max_depth, TASK_TREE_DEPTH_LIMIT)
+        tree = self._task_tree_cte(root_conditions, depth_limit)
+        
+        rows = db.query(Task, tree.c.depth, TaskDependency).join(tree, Task.id == tree.c.id).outerjoin(
+            TaskDependency, TaskDependency.task_id == Task.id
+        ).order_by(Task.id, TaskDependency.id).all()
+        
+        # A task reached from several roots comes back once per depth
+        tasks: Dict[int, Task] = {}
+        depths: Dict[int, int] = {}
+        dependencies: Dict[int, Dict[int, TaskDependency]] = {}
+        for task, depth, dependency in rows:
+            tasks[task.id] = task
+            depths[task.id] = min(depth, depths.get(task.id, depth))
+            task_dependencies = dependencies.setdefault(task.id, {})
+            if dependency is not None:
+                task_dependencies[dependency.id] = dependency
+        
+        subtasks: Dict[int, List[Task]] = {task_id: [] for task_id in tasks}
+        for task in tasks.values():
+            if task.parent_id in tasks:
+                subtasks[task.parent_id].append(task)
+        for task_id, task in tasks.items():
+            set_committed_value(task, "dependencies", list(dependencies[task_id].values()))
+            set_committed_value(task, "subtasks", subtasks[task_id] if depths[task_id] < depth_limit else [])
+        return tasks
+    
+    def get_task_tree(
+        self, db: Session, task_id: int, user_id: int, max_depth: Optional[int] = None
+    ) -> Optional[Task]:
+        """Get a task with its subtasks (down to max_depth levels) and dependencies for a response"""
+        tasks = self._load_task_trees(db, [
+            Task.id == task_id,
+            or_(Project.user_id == user_id, Task.project_id.is_(None))
+        ], max_depth)
+        return tasks.get(task_id)
+    
     def create_task(self, db: Session, task_data: TaskCreate, user_id: int) -> Task:
         """Create a new task"""
         # Validate project ownership if project_id is provided
@@ -88,12 +253,16 @@ class TaskService:
         
         # Create the task
         task_dict = task_data.dict(exclude={'dependencies'})
+        # Store model enum members rather than the schema's str enums
+        task_dict["status"] = TaskStatus(task_data.status.value)
+        task_dict["priority"] = TaskPriority(task_data.priority.value)
         db_task = Task(**task_dict)
         
         db.add(db_task)
         db.flush()  # Get the task ID
         
         # Add dependencies if provided
+        new_edges = []
         if task_data.dependencies:
             for dep_id in task_data.dependencies:
                 # Validate dependency exists and user has access
@@ -102,21 +271,128 @@ class TaskService:
                     raise ValueError(f"Dependency task {dep_id} not found or access denied")
                 
                 # Check for circular dependencies
-                if self._would_create_circular_dependency(db, db_task.id, dep_id):
+                if self._would_create_circular_dependency(db, db_task, dep_task):
                     raise ValueError(f"Adding dependency {dep_id} would create a circular dependency")
                 
                 dependency = TaskDependency(task_id=db_task.id, depends_on_id=dep_id)
                 db.add(dependency)
+                new_edges.append((db_task.id, db_task.project_id, dep_task.id, dep_task.project_id))
+        
+        # Log task creation
+        task_log_service.log_task_creation(db, db_task, user_id)
+        task_stats_service.record_changes(db, [(None, task_stats_service.task_state(db_task))])
         
         db.commit()
         db.refresh(db_task)
         
-        # Log task creation
-        task_log_service.log_task_creation(db, db_task, user_id)
+        for edge in new_edges:
+            dependency_graph_index.add_edge(*edge)
+        task_search_index.index_tasks([db_task])
         
         logger.info(f"Created task {db_task.id} for user {user_id}")
         return db_task
     
+    def _accessible_task_projects(self, db: Session, task_ids: List[int], user_id: int) -> Dict[int, Optional[int]]:
+        """Map each of task_ids the user can access to its project ID, in one query"""
+        if not task_ids:
+            return {}
+        
+        rows = db.query(Task.id, Task.project_id).outerjoin(Project).filter(
+            and_(
+                Task.id.in_(task_ids),
+                or_(
+                    Project.user_id == user_id,
+                    Task.project_id.is_(None)  # Standalone tasks
+                )
+            )
+        ).all()
+        return {task_id: project_id for task_id, project_id in rows}
+    
+    def bulk_create_tasks(
+        self,
+        db: Session,
+        user_id: int,
+        tasks_data: List[TaskCreate],
+        project_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Create many tasks in a single transaction
+        
+        Projects, parent tasks and dependencies are each validated with one
+        query for the whole batch, dependency rows and creation logs are
+        written with executemany, and nothing is committed unless every task
+        is valid. project_id is used for tasks that do not set their own.
+        Returns the IDs of the created tasks in input order.
+        """
+        if not tasks_data:
+            return []
+        
+        project_ids = {
+            data.project_id or project_id for data in tasks_data
+        } - {None}
+        if project_ids:
+            owned = {
+                row.id for row in db.query(Project.id).filter(
+                    and_(Project.id.in_(project_ids), Project.user_id == user_id)
+                ).all()
+            }
+            missing = project_ids - owned
+            if missing:
+                raise ValueError(f"Project {min(missing)} not found or access denied")
+        
+        parent_ids = {data.parent_id for data in tasks_data if data.parent_id}
+        dependency_ids = {dep_id for data in tasks_data for dep_id in (data.dependencies or [])}
+        accessible = self._accessible_task_projects(db, list(parent_ids | dependency_ids), user_id)
+        
+        missing_parents = parent_ids - accessible.keys()
+        if missing_parents:
+            raise ValueError(f"Parent task {min(missing_parents)} not found or access denied")
+        missing_dependencies = dependency_ids - accessible.keys()
+        if missing_dependencies:
+            raise ValueError(f"Dependency task {min(missing_dependencies)} not found or access denied")
+        
+        db_tasks = []
+        for data in tasks_data:
+            task_dict = data.dict(exclude={'dependencies'})
+            task_dict["project_id"] = data.project_id or project_id
+            # Store model enum members rather than the schema's str enums
+            task_dict["status"] = TaskStatus(data.status.value)
+            task_dict["priority"] = TaskPriority(data.priority.value)
+            db_tasks.append(Task(**task_dict))
+        
+        try:
+            # One flush for the batch; the ORM batches the INSERTs where the
+            # driver can still hand back the generated primary keys
+            db.add_all(db_tasks)
+            db.flush()
+            
+            # New tasks have no dependents yet, so their dependencies cannot close a cycle
+            dependency_rows = []
+            new_edges = []
+            for db_task, data in zip(db_tasks, tasks_data):
+                for dep_id in dict.fromkeys(data.dependencies or []):
+                    dependency_rows.append({"task_id": db_task.id, "depends_on_id": dep_id})
+                    new_edges.append((db_task.id, db_task.project_id, dep_id, accessible[dep_id]))
+            if dependency_rows:
+                db.execute(insert(TaskDependency), dependency_rows)
+            
+            task_log_service.bulk_log_task_creation(db, db_tasks, user_id)
+            task_stats_service.record_changes(
+                db, [(None, task_stats_service.task_state(db_task)) for db_task in db_tasks]
+            )
+            task_ids = [db_task.id for db_task in db_tasks]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        for edge in new_edges:
+            dependency_graph_index.add_edge(*edge)
+        task_search_index.index_tasks(db_tasks)
+        
+        logger.info(f"Bulk created {len(task_ids)} tasks for user {user_id}")
+        return task_ids
+    
     def update_task(self, db: Session, task_id: int, user_id: int, task_data: TaskUpdate) -> Optional[Task]:
         """Update a task"""
         db_task = self.get_task(db, task_id, user_id)
@@ -126,6 +402,10 @@ class TaskService:
         # Store old values for logging
         old_values = {}
         update_data = task_data.dict(exclude_unset=True)
+        old_state = task_stats_service.task_state(db_task)
+        if update_data.get("status") is not None:
+            # Compare and store model enum members rather than the schema's str enums
+            update_data["status"] = TaskStatus(update_data["status"].value)
         
         for field in update_data.keys():
             if hasattr(db_task, field):
@@ -149,34 +429,107 @@ class TaskService:
         for field, value in update_data.items():
             setattr(db_task, field, value)
         
-        db.commit()
-        db.refresh(db_task)
-        
         # Log the updates
         task_log_service.log_task_update(db, db_task, user_id, old_values, update_data)
+        task_stats_service.record_changes(db, [(old_state, task_stats_service.task_state(db_task))])
+        
+        db.commit()
+        # Reload with the whole subtask tree in one query for the response
+        db_task = self.get_task_tree(db, task_id, user_id)
+        
+        if update_data.keys() & set(SEARCH_FIELDS):
+            task_search_index.index_tasks([db_task])
         
         logger.info(f"Updated task {task_id} for user {user_id}")
         return db_task
     
+    def _collect_subtree(self, db: Session, root_conditions) -> Dict[int, Any]:
+        """
+        Rows of the task matching root_conditions and its whole subtree, by ID, shallowest first
+        
+        Each row has the task's deletion and stats columns, its depth and
+        has_dependencies. The recursive query stops TASK_TREE_DEPTH_LIMIT
+        levels down; tasks first reached at that depth are the roots of the
+        next query, until none are left. A task already collected is not
+        walked again, which also ends corrupt parent_id cycles.
+        """
+        has_dependencies = select(TaskDependency.id).where(TaskDependency.task_id == Task.id).exists()
+        tasks: Dict[int, Any] = {}
+        depth_offset = 0
+        while root_conditions is not None:
+            tree = self._task_tree_cte(root_conditions)
+            rows = db.query(
+                Task.id, Task.parent_id, Task.project_id, Task.title, Task.status, Task.created_at,
+                Task.completed_at, (tree.c.depth + depth_offset).label("depth"),
+                has_dependencies.label("has_dependencies")
+            ).join(tree, Task.id == tree.c.id).all()
+            
+            # A corrupt parent_id cycle can reach a task more than once
+            frontier = []
+            for row in sorted(rows, key=lambda row: row.depth):
+                if row.id in tasks:
+                    continue
+                tasks[row.id] = row
+                if row.depth == depth_offset + TASK_TREE_DEPTH_LIMIT:
+                    frontier.append(row.id)
+            root_conditions = [Task.parent_id.in_(frontier)] if frontier else None
+            depth_offset += TASK_TREE_DEPTH_LIMIT + 1
+        return tasks
+    
     def delete_task(self, db: Session, task_id: int, user_id: int) -> bool:
-        """Delete a task and its dependencies"""
-        db_task = self.get_task(db, task_id, user_id)
-        if not db_task:
+        """
+        Delete a task with all its subtasks and their dependencies
+        
+        One recursive query collects the subtree; its dependency edges,
+        project links and tasks are then removed with set-based DELETEs
+        (tasks deepest level first, for the parent_id foreign key) and one
+        bulk INSERT logs every deleted task, without loading any task into
+        the session. Subtrees deeper than TASK_TREE_DEPTH_LIMIT levels are
+        collected with one more query per TASK_TREE_DEPTH_LIMIT levels, so
+        the whole subtree is always deleted.
+        """
+        tasks = self._collect_subtree(db, [
+            Task.id == task_id,
+            or_(Project.user_id == user_id, Task.project_id.is_(None))
+        ])
+        if not tasks:
             return False
         
-        # Delete all dependencies where this task is involved
-        db.query(TaskDependency).filter(
-            or_(TaskDependency.task_id == task_id, TaskDependency.depends_on_id == task_id)
-        ).delete()
-        
-        # Log task deletion before deleting
-        task_log_service.log_task_deletion(db, db_task, user_id)
+        task_ids = list(tasks)
+        parent_ids = {row.parent_id for row in tasks.values()}
+        levels: Dict[int, List[int]] = {}
+        for row in tasks.values():
+            levels.setdefault(row.depth, []).append(row.id)
         
-        # Delete the task (subtasks will be deleted by cascade)
-        db.delete(db_task)
+        db.query(TaskDependency).filter(
+            or_(TaskDependency.task_id.in_(task_ids), TaskDependency.depends_on_id.in_(task_ids))
+        ).delete(synchronize_session=False)
+        db.query(ProjectTask).filter(ProjectTask.task_id.in_(task_ids)).delete(synchronize_session=False)
+        for depth in sorted(levels, reverse=True):
+            db.query(Task).filter(Task.id.in_(levels[depth])).delete(synchronize_session=False)
+        
+        task_log_service.write_logs(db, [
+            task_log_service.deletion_log_values(
+                row, user_id,
+                had_subtasks=row.id in parent_ids,
+                had_dependencies=bool(row.has_dependencies),
+                deleted_with=None if row.id == task_id else task_id,
+                deleted_subtasks=len(task_ids) - 1 if row.id == task_id else None
+            )
+            for row in tasks.values()
+        ])
+        task_stats_service.record_changes(db, [
+            (task_stats_service.state(row.project_id, row.status, row.created_at, row.completed_at), None)
+            for row in tasks.values()
+        ])
         db.commit()
         
-        logger.info(f"Deleted task {task_id} for user {user_id}")
+        project_ids = {row.project_id for row in tasks.values()}
+        dependency_graph_index.remove_tasks(task_ids, project_ids)
+        for project_id in project_ids:
+            task_search_index.invalidate(project_id)
+        
+        logger.info(f"Deleted task {task_id} with {len(task_ids) - 1} subtasks for user {user_id}")
         return True
     
     def update_task_status(self, db: Session, task_id: int, user_id: int, status: TaskStatus) -> Optional[Task]:
@@ -185,7 +538,9 @@ class TaskService:
         if not db_task:
             return None
         
+        status = TaskStatus(status.value)
         old_status = db_task.status
+        old_state = task_stats_service.task_state(db_task)
         db_task.status = status
         
         # Handle completion timestamp
@@ -194,39 +549,172 @@ class TaskService:
         elif status != TaskStatus.DONE and old_status == TaskStatus.DONE:
             db_task.completed_at = None
         
-        db.commit()
-        db.refresh(db_task)
-        
         # Log status change
         if old_status != status:
             task_log_service.log_status_change(db, db_task, user_id, old_status.value, status.value)
+        task_stats_service.record_changes(db, [(old_state, task_stats_service.task_state(db_task))])
+        
+        db.commit()
+        db_task = self.get_task_tree(db, task_id, user_id)
         
         logger.info(f"Updated task {task_id} status to {status.value} for user {user_id}")
         return db_task
     
+    def _owned_tasks(self, db: Session, user_id: int, task_ids: List[int]) -> List[Task]:
+        """Load the tasks among task_ids the user can access, without relationships, in one query"""
+        return db.query(Task).outerjoin(Project, Task.project_id == Project.id).filter(
+            and_(
+                Task.id.in_(task_ids),
+                or_(Project.user_id == user_id, Task.project_id.is_(None))
+            )
+        ).all()
+    
+    def _reload_tasks(self, db: Session, task_ids: List[int]) -> List[Task]:
+        """Reload tasks with their subtask trees for a response, preserving the order of task_ids"""
+        by_id = self._load_task_trees(db, [Task.id.in_(task_ids)])
+        return [by_id[task_id] for task_id in task_ids if task_id in by_id]
+    
+    @staticmethod
+    def _batch_update_statement(task_ids: List[int], values: Dict[str, Any]):
+        """
+        UPDATE of the given tasks that sets completed_at before status
+
+        The completed_at CASE reads the old status. MySQL evaluates SET
+        assignments left to right, so with status first it would see the
+        new one.
+        """
+        ordered = sorted(values.items(), key=lambda item: item[0] != "completed_at")
+        return update(Task).where(Task.id.in_(task_ids)).ordered_values(*ordered)
+    
     def batch_update_tasks(self, db: Session, user_id: int, batch_data: TaskBatchUpdate) -> List[Task]:
-        """Batch update multiple tasks"""
-        updated_tasks = []
+        """
+        Batch update multiple tasks
+        
+        Applies the same field changes to every accessible task with one
+        UPDATE ... WHERE id IN, and writes all change logs in one INSERT, in
+        a single transaction. Tasks that do not exist or are not accessible
+        are skipped.
+        """
+        update_data = batch_data.updates.dict(exclude_unset=True)
+        tasks = self._owned_tasks(db, user_id, batch_data.task_ids)
+        if not tasks:
+            return []
+        
+        task_ids = [task.id for task in tasks]
+        values = dict(update_data)
+        if "status" in values:
+            values["status"] = TaskStatus(values["status"].value)
+        if "priority" in values:
+            values["priority"] = TaskPriority(values["priority"].value)
         
-        for task_id in batch_data.task_ids:
-            task = self.update_task(db, task_id, user_id, batch_data.updates)
-            if task:
-                updated_tasks.append(task)
+        # Handle status change
+        now = datetime.utcnow()
+        if "status" in update_data and update_data["status"] == TaskStatus.DONE.value:
+            values["completed_at"] = now
+        elif "status" in update_data:
+            # Tasks leaving DONE lose their completion timestamp
+            values["completed_at"] = case(
+                (Task.status == TaskStatus.DONE, None),
+                else_=Task.completed_at
+            )
         
-        logger.info(f"Batch updated {len(updated_tasks)} tasks for user {user_id}")
+        log_entries = []
+        stats_changes = []
+        for task in tasks:
+            old_values = {field: getattr(task, field) for field in update_data if hasattr(task, field)}
+            new_values = {field: values[field] for field in update_data}
+            if "status" in update_data and update_data["status"] == TaskStatus.DONE.value:
+                new_values["completed_at"] = now
+            elif "status" in update_data and task.status == TaskStatus.DONE:
+                new_values["completed_at"] = None
+            stats_changes.append((task_stats_service.task_state(task), task_stats_service.state(
+                task.project_id,
+                new_values.get("status", task.status),
+                task.created_at,
+                new_values.get("completed_at", task.completed_at)
+            )))
+            
+            if "assignee_id" in update_data:
+                entry = task_log_service.assignment_log_values(
+                    task, user_id, task.assignee_id, update_data["assignee_id"]
+                )
+                if entry:
+                    log_entries.append(entry)
+            log_entries.extend(task_log_service.update_log_values(task, user_id, old_values, new_values))
+        
+        try:
+            db.execute(
+                self._batch_update_statement(task_ids, values),
+                execution_options={"synchronize_session": False}
+            )
+            task_log_service.write_logs(db, log_entries)
+            task_stats_service.record_changes(db, stats_changes)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        updated_tasks = self._reload_tasks(db, task_ids)
+        if update_data.keys() & set(SEARCH_FIELDS):
+            task_search_index.index_tasks(updated_tasks)
+        
+        logger.info(f"Batch updated {len(task_ids)} tasks for user {user_id}")
         return updated_tasks
     
     def batch_update_status(self, db: Session, user_id: int, batch_data: TaskBatchStatusUpdate) -> List[Task]:
-        """Batch update task status"""
-        updated_tasks = []
+        """
+        Batch update task status
         
-        for task_id in batch_data.task_ids:
-            task = self.update_task_status(db, task_id, user_id, batch_data.status)
-            if task:
-                updated_tasks.append(task)
+        One ownership-checked UPDATE sets the status of every accessible task
+        and maintains completed_at in SQL; status change logs are written in
+        one INSERT in the same transaction.
+        """
+        tasks = self._owned_tasks(db, user_id, batch_data.task_ids)
+        if not tasks:
+            return []
         
-        logger.info(f"Batch updated status for {len(updated_tasks)} tasks for user {user_id}")
-        return updated_tasks
+        task_ids = [task.id for task in tasks]
+        status = TaskStatus(batch_data.status.value)
+        now = datetime.utcnow()
+        
+        # Handle completion timestamp
+        if status == TaskStatus.DONE:
+            completed_at = case((Task.status != TaskStatus.DONE, now), else_=Task.completed_at)
+        else:
+            completed_at = case((Task.status == TaskStatus.DONE, None), else_=Task.completed_at)
+        
+        log_entries = []
+        stats_changes = []
+        for task in tasks:
+            if status == TaskStatus.DONE and task.status != TaskStatus.DONE:
+                new_completed_at = now
+            elif status != TaskStatus.DONE and task.status == TaskStatus.DONE:
+                new_completed_at = None
+            else:
+                new_completed_at = task.completed_at
+            stats_changes.append((task_stats_service.task_state(task), task_stats_service.state(
+                task.project_id, status, task.created_at, new_completed_at
+            )))
+            if task.status == status:
+                continue
+            log_entries.append(task_log_service.status_change_log_values(
+                task, user_id, task.status.value, status.value, new_completed_at
+            ))
+        
+        try:
+            db.execute(
+                self._batch_update_statement(task_ids, {"status": status, "completed_at": completed_at}),
+                execution_options={"synchronize_session": False}
+            )
+            task_log_service.write_logs(db, log_entries)
+            task_stats_service.record_changes(db, stats_changes)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        logger.info(f"Batch updated status for {len(task_ids)} tasks for user {user_id}")
+        return self._reload_tasks(db, task_ids)
     
     def add_dependency(self, db: Session, task_id: int, depends_on_id: int, user_id: int) -> bool:
         """Add a dependency between tasks"""
@@ -246,17 +734,21 @@ class TaskService:
             return True  # Already exists
         
         # Check for circular dependencies
-        if self._would_create_circular_dependency(db, task_id, depends_on_id):
+        if self._would_create_circular_dependency(db, task, depends_on_task):
             raise ValueError("Adding this dependency would create a circular dependency")
         
         # Add the dependency
+        edge = (task_id, task.project_id, depends_on_id, depends_on_task.project_id)
         dependency = TaskDependency(task_id=task_id, depends_on_id=depends_on_id)
         db.add(dependency)
-        db.commit()
         
         # Log dependency addition
         task_log_service.log_dependency_change(db, task_id, user_id, "dependency_added", depends_on_id)
         
+        db.commit()
+        
+        dependency_graph_index.add_edge(*edge)
+        
         logger.info(f"Added dependency: task {task_id} depends on task {depends_on_id}")
         return True
     
@@ -268,38 +760,39 @@ class TaskService:
             return False
         
         # Remove the dependency
+        project_id = task.project_id
         deleted = db.query(TaskDependency).filter(
             and_(TaskDependency.task_id == task_id, TaskDependency.depends_on_id == depends_on_id)
         ).delete()
         
-        db.commit()
-        
         if deleted:
             # Log dependency removal
             task_log_service.log_dependency_change(db, task_id, user_id, "dependency_removed", depends_on_id)
+        
+        db.commit()
+        
+        if deleted:
+            dependency_graph_index.remove_edge(task_id, project_id, depends_on_id)
             logger.info(f"Removed dependency: task {task_id} no longer depends on task {depends_on_id}")
         
         return deleted > 0
     
-    def search_tasks(self, db: Session, user_id: int, search_request: TaskSearchRequest) -> Tuple[List[Task], int]:
-        """Search tasks with filters"""
-        query = db.query(Task).options(
-            joinedload(Task.subtasks),
-            joinedload(Task.dependencies),
-            joinedload(Task.project)
-        ).join(Project, Task.project_id == Project.id, isouter=True).filter(
+    def _filter_search(self, query, user_id: int, search_request: TaskSearchRequest):
+        """
+        Apply search filters, sorting and pagination
+        
+        Returns the paginated query and the total number of matching tasks.
+        """
+        query = query.join(Project, Task.project_id == Project.id, isouter=True).filter(
             or_(Project.user_id == user_id, Task.project_id.is_(None))
         )
         
         # Apply filters
+        relevance = None
         if search_request.query:
-            search_term = f"%{search_request.query}%"
-            query = query.filter(
-                or_(
-                    Task.title.ilike(search_term),
-                    Task.description.ilike(search_term),
-                    Task.details.ilike(search_term)
-                )
+            query, relevance = apply_search(
+                query, query.session, user_id, search_request.query,
+                ranked=search_request.sort_by == "relevance"
             )
         
         if search_request.status:
@@ -338,69 +831,79 @@ class TaskService:
         if search_request.created_to:
             query = query.filter(Task.created_at <= search_request.created_to)
         
-        # Get total count
-        total_count = query.count()
+        # Get total count (over task IDs only, so list-mode count columns are not evaluated)
+        total_count = query.with_entities(Task.id).count()
         
-        # Apply sorting
-        sort_column = getattr(Task, search_request.sort_by, Task.created_at)
-        if search_request.sort_order == "desc":
-            query = query.order_by(desc(sort_column))
+        # Apply sorting (by relevance only when a full-text search ranked the matches)
+        if relevance is not None:
+            sort_column = relevance
         else:
-            query = query.order_by(asc(sort_column))
+            sort_column = getattr(Task, search_request.sort_by, Task.created_at)
+        descending = search_request.sort_order == "desc"
+        if descending:
+            query = query.order_by(desc(sort_column), desc(Task.id))
+        else:
+            query = query.order_by(asc(sort_column), asc(Task.id))
         
         # Apply pagination
-        tasks = query.offset(search_request.skip).limit(search_request.limit).all()
+        if search_request.cursor:
+            if search_request.sort_by not in SEARCH_CURSOR_SORT_FIELDS:
+                raise ValueError(f"Cursor pagination is not supported when sorting by '{search_request.sort_by}'")
+            sort_columns = (sort_column, Task.id)
+            query = query.filter(keyset_filter(
+                sort_columns, decode_cursor(search_request.cursor, len(sort_columns)), descending=descending
+            ))
+        else:
+            query = query.offset(search_request.skip)
         
-        return tasks, total_count
+        return query.limit(search_request.limit), total_count
     
-    def get_task_stats(self, db: Session, user_id: int, project_id: Optional[int] = None) -> TaskStats:
-        """Get task statistics"""
-        query = db.query(Task).join(Project, Task.project_id == Project.id, isouter=True).filter(
-            or_(Project.user_id == user_id, Task.project_id.is_(None))
-        )
-        
-        if project_id:
-            query = query.filter(Task.project_id == project_id)
-        
-        # Get status counts
-        status_counts = db.query(
-            Task.status, func.count(Task.id)
-        ).join(Project, Task.project_id == Project.id, isouter=True).filter(
-            or_(Project.user_id == user_id, Task.project_id.is_(None))
+    def search_tasks(self, db: Session, user_id: int, search_request: TaskSearchRequest) -> Tuple[List[Task], int]:
+        """Search tasks with filters"""
+        query = db.query(Task).options(
+            joinedload(Task.subtasks),
+            joinedload(Task.dependencies),
+            joinedload(Task.project)
         )
         
-        if project_id:
-            status_counts = status_counts.filter(Task.project_id == project_id)
+        query, total_count = self._filter_search(query, user_id, search_request)
+        return query.all(), total_count
+    
+    def search_task_list(
+        self, db: Session, user_id: int, search_request: TaskSearchRequest
+    ) -> Tuple[List[TaskListItem], int]:
+        """List-mode variant of search_tasks with counts computed in SQL"""
+        query = db.query(Task, *self._list_count_columns())
+        
+        query, total_count = self._filter_search(query, user_id, search_request)
+        return self._to_list_items(query.all()), total_count
+    
+    def get_task_stats(self, db: Session, user_id: int, project_id: Optional[int] = None) -> TaskStats:
+        """
+        Get task statistics
         
-        status_counts = status_counts.group_by(Task.status).all()
+        Project tasks are counted from the project_task_stats rollup; only
+        standalone tasks are aggregated from the tasks table.
+        """
+        totals = task_stats_service.user_totals(db, user_id, project_id)
         
         # Initialize stats
         stats = TaskStats()
-        status_dict = {status.value: count for status, count in status_counts}
-        
-        stats.total_tasks = sum(status_dict.values())
-        stats.pending_tasks = status_dict.get(TaskStatus.PENDING.value, 0)
-        stats.in_progress_tasks = status_dict.get(TaskStatus.IN_PROGRESS.value, 0)
-        stats.review_tasks = status_dict.get(TaskStatus.REVIEW.value, 0)
-        stats.done_tasks = status_dict.get(TaskStatus.DONE.value, 0)
-        stats.blocked_tasks = status_dict.get(TaskStatus.BLOCKED.value, 0)
-        stats.cancelled_tasks = status_dict.get(TaskStatus.CANCELLED.value, 0)
+        stats.pending_tasks = totals["pending_tasks"]
+        stats.in_progress_tasks = totals["in_progress_tasks"]
+        stats.review_tasks = totals["review_tasks"]
+        stats.done_tasks = totals["done_tasks"]
+        stats.blocked_tasks = totals["blocked_tasks"]
+        stats.cancelled_tasks = totals["cancelled_tasks"]
+        stats.total_tasks = sum(totals[column] for column in STATUS_COLUMNS.values())
         
         # Calculate completion percentage
         if stats.total_tasks > 0:
             stats.completion_percentage = (stats.done_tasks / stats.total_tasks) * 100
         
         # Calculate average completion time
-        completed_tasks = query.filter(
-            and_(Task.status == TaskStatus.DONE, Task.completed_at.is_not(None))
-        ).all()
-        
-        if completed_tasks:
-            total_time = sum([
-                (task.completed_at - task.created_at).total_seconds() / 3600
-                for task in completed_tasks
-            ])
-            stats.average_completion_time = total_time / len(completed_tasks)
+        if totals["completed_count"]:
+            stats.average_completion_time = totals["completion_seconds"] / 3600 / totals["completed_count"]
         
         return stats
     
@@ -426,27 +929,14 @@ class TaskService:
                     message="Project not found or access denied"
                 )
             
-            # Prepare AI prompt
-            prompt = self._build_task_generation_prompt(project, generate_request)
-            
             # Call AI model with higher max_tokens for task generation
             ai_response = ai_model_service.call_model(
                 db=db,
                 user_id=user_id,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个项目管理助手。根据项目描述生成结构化的任务。你必须严格返回有效的JSON数组格式，不要包含任何其他文本、解释或markdown格式。确保所有JSON字符串都正确闭合，没有语法错误。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                custom_config={
-                    "max_tokens": 4000,  # Use higher max_tokens for task generation
-                    "temperature": 0.3   # Lower temperature for more consistent JSON output
-                }
+                model_id=generate_request.model_id,
+                messages=self._task_generation_messages(project, generate_request),
+                custom_config=TASK_GENERATION_CONFIG,
+                use_cache=True
             )
             
             if not ai_response["success"]:
@@ -455,21 +945,26 @@ class TaskService:
                     message=f"AI model error: {ai_response['error']}"
                 )
             
-            # Parse AI response
-            tasks_data = self._parse_ai_task_response(ai_response["response"])
+            # Parse AI response; an unusable response must not be served from the cache again
+            try:
+                tasks_data = self._parse_ai_task_response(ai_response["response"])
+            except ValueError:
+                if ai_response.get("cache_key"):
+                    ai_response_cache.invalidate(ai_response["cache_key"])
+                raise
             
-            # Create tasks
+            # Validate tasks, then create them all in one transaction
             created_tasks = []
             for task_data in tasks_data:
                 try:
                     task_data["project_id"] = project_id
-                    task_create = TaskCreate(**task_data)
-                    task = self.create_task(db, task_create, user_id)
-                    created_tasks.append(task_create)
+                    created_tasks.append(TaskCreate(**task_data))
                 except Exception as e:
                     logger.warning(f"Failed to create task: {e}")
                     continue
             
+            self.bulk_create_tasks(db, user_id, created_tasks, project_id=project_id)
+            
             generation_time = time.time() - start_time
             
             return TaskGenerateResponse(
@@ -478,7 +973,8 @@ class TaskService:
                 tasks=created_tasks,
                 total_generated=len(created_tasks),
                 generation_time=generation_time,
-                model_used=ai_response.get("model_used")
+                model_used=ai_response.get("model_used"),
+                cached=ai_response.get("cached", False)
             )
             
         except Exception as e:
@@ -488,36 +984,113 @@ class TaskService:
                 message=f"Task generation failed: {str(e)}"
             )
     
-    def _would_create_circular_dependency(self, db: Session, task_id: int, depends_on_id: int) -> bool:
-        """Check if adding a dependency would create a circular dependency"""
-        # Use a simple DFS to detect cycles
-        visited = set()
+    def stream_tasks_with_ai(
+        self,
+        db: Session,
+        user_id: int,
+        project_id: int,
+        generate_request: TaskGenerateRequest,
+        on_task: Callable[[int, TaskCreate], None]
+    ) -> TaskGenerateResponse:
+        """
+        Generate tasks using a streamed AI completion
+        
+        Each task is saved as soon as its JSON object is complete and passed
+        to on_task with its new ID, so the first task is available long
+        before the model finishes. Tasks saved before a failure are kept.
+        """
+        start_time = time.time()
+        created_tasks: List[TaskCreate] = []
         
-        def has_path(from_id: int, to_id: int) -> bool:
-            if from_id == to_id:
-                return True
+        try:
+            project = db.query(Project).filter(
+                and_(Project.id == project_id, Project.user_id == user_id)
+            ).first()
+            
+            if not project:
+                return TaskGenerateResponse(
+                    success=False,
+                    message="Project not found or access denied"
+                )
+            
+            ai_response = ai_model_service.stream_model(
+                db=db,
+                user_id=user_id,
+                model_id=generate_request.model_id,
+                messages=self._task_generation_messages(project, generate_request),
+                custom_config=TASK_GENERATION_CONFIG,
+                use_cache=True
+            )
             
-            if from_id in visited:
-                return False
+            if not ai_response["success"]:
+                return TaskGenerateResponse(
+                    success=False,
+                    message=f"AI model error: {ai_response['error']}"
+                )
             
-            visited.add(from_id)
+            parser = JSONArrayStreamParser()
+            for chunk in ai_response["stream"]:
+                for task in parser.feed(chunk):
+                    if not isinstance(task, dict) or "title" not in task:
+                        continue
+                    try:
+                        task_data = TaskCreate(**{**self._clean_task_data(task), "project_id": project_id})
+                    except Exception as e:
+                        logger.warning(f"Failed to create task: {e}")
+                        continue
+                    
+                    task_id = self.bulk_create_tasks(db, user_id, [task_data], project_id=project_id)[0]
+                    created_tasks.append(task_data)
+                    on_task(task_id, task_data)
             
-            # Get all tasks that depend on from_id
-            dependents = db.query(TaskDependency.task_id).filter(
-                TaskDependency.depends_on_id == from_id
-            ).all()
+            if not created_tasks:
+                if ai_response.get("cache_key"):
+                    ai_response_cache.invalidate(ai_response["cache_key"])
+                raise ValueError("Invalid JSON response from AI")
             
-            for (dependent_id,) in dependents:
-                if has_path(dependent_id, to_id):
-                    return True
+            return TaskGenerateResponse(
+                success=True,
+                message=f"Successfully generated {len(created_tasks)} tasks",
+                tasks=created_tasks,
+                total_generated=len(created_tasks),
+                generation_time=time.time() - start_time,
+                model_used=ai_response.get("model_used"),
+                cached=ai_response.get("cached", False)
+            )
             
-            return False
-        
-        return has_path(depends_on_id, task_id)
+        except Exception as e:
+            logger.error(f"Error streaming task generation: {e}")
+            return TaskGenerateResponse(
+                success=False,
+                message=f"Task generation failed after {len(created_tasks)} tasks: {str(e)}",
+                tasks=created_tasks,
+                total_generated=len(created_tasks),
+                generation_time=time.time() - start_time
+            )
+    
+    def _task_generation_messages(self, project: Project, request: TaskGenerateRequest) -> List[Dict[str, str]]:
+        """System and user messages for task generation"""
+        return [
+            {
+                "role": "system",
+                "content": "你是一个项目管理助手。根据项目描述生成结构化的任务。你必须严格返回有效的JSON数组格式，不要包含任何其他文本、解释或markdown格式。确保所有JSON字符串都正确闭合，没有语法错误。"
+            },
+            {
+                "role": "user",
+                "content": self._build_task_generation_prompt(project, request)
+            }
+        ]
+    
+    def _would_create_circular_dependency(self, db: Session, task: Task, depends_on_task: Task) -> bool:
+        """Check if making task depend on depends_on_task would create a circular dependency"""
+        return dependency_graph_index.would_create_cycle(
+            db, task.id, task.project_id, depends_on_task.id, depends_on_task.project_id
+        )
     
-    def get_task_logs(self, db: Session, task_id: int, user_id: int, skip: int = 0, limit: int = 100):
+    def get_task_logs(self, db: Session, task_id: int, user_id: int, skip: int = 0, limit: int = 100,
+                      cursor: Optional[str] = None):
         """Get task change logs"""
-        return task_log_service.get_task_logs(db, task_id, user_id, skip, limit)
+        return task_log_service.get_task_logs(db, task_id, user_id, skip, limit, cursor)
     
     def _build_task_generation_prompt(self, project: Project, request: TaskGenerateRequest) -> str:
         """Build the AI prompt for task generation"""
@@ -600,14 +1173,7 @@ class TaskService:
             cleaned_tasks = []
             for task in tasks_data:
                 if isinstance(task, dict) and "title" in task:
-                    # Set defaults for missing fields
-                    task.setdefault("description", "")
-                    task.setdefault("details", "")
-                    task.setdefault("test_strategy", "")
-                    task.setdefault("priority", "medium")
-                    task.setdefault("estimated_hours", None)
-                    
-                    cleaned_tasks.append(task)
+                    cleaned_tasks.append(self._clean_task_data(task))
             
             logger.info(f"Successfully parsed {len(cleaned_tasks)} tasks from AI response")
             return cleaned_tasks
@@ -621,6 +1187,15 @@ class TaskService:
             logger.error(f"Response content: {response}")
             raise ValueError(f"Failed to parse AI response: {str(e)}")
     
+    def _clean_task_data(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Set defaults for fields missing from an AI generated task"""
+        task.setdefault("description", "")
+        task.setdefault("details", "")
+        task.setdefault("test_strategy", "")
+        task.setdefault("priority", "medium")
+        task.setdefault("estimated_hours", None)
+        return task
+    
     def _fix_json_response(self, response: str) -> str:
         """Try to fix common JSON formatting issues"""
         try:
@@ -1,25 +1,161 @@
 """
 Task Log service layer
+
+Log rows are written according to settings.TASK_LOG_MODE:
+
+- "transaction": rows are inserted in the caller's session and committed
+  together with the change they describe. Callers must log before they
+  commit.
+- "deferred": rows are queued in memory and bulk inserted by a background
+  thread every TASK_LOG_FLUSH_INTERVAL_SECONDS or TASK_LOG_BATCH_SIZE rows,
+  whichever comes first. The queue is flushed on shutdown, but rows still
+  queued when the process dies are lost.
 """
 
 import json
 import logging
+import queue
+import threading
 from typing import List, Optional, Dict, Any
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pagination import decode_cursor, keyset_filter
 from app.models.task_log import TaskLog
 from app.models.task import Task
 
 logger = logging.getLogger(__name__)
 
 
+def _insert_logs(db: Session, entries: List[Dict[str, Any]]):
+    """Insert log rows with one executemany INSERT"""
+    # render_nulls keeps rows with different None columns in a single executemany batch
+    db.execute(insert(TaskLog).execution_options(render_nulls=True), entries)
+
+
+class DeferredTaskLogWriter:
+    """Background writer that bulk inserts queued task log rows"""
+    
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_queue_size: Optional[int] = None
+    ):
+        self.flush_interval = flush_interval or settings.TASK_LOG_FLUSH_INTERVAL_SECONDS
+        self.batch_size = batch_size or settings.TASK_LOG_BATCH_SIZE
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(
+            maxsize=max_queue_size or settings.TASK_LOG_QUEUE_MAX_SIZE
+        )
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the flush thread if it is not running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="task-log-writer", daemon=True)
+        self._thread.start()
+        logger.info("Deferred task log writer started")
+    
+    def stop(self):
+        """Stop the flush thread and write everything still queued"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        logger.info("Deferred task log writer stopped")
+    
+    def enqueue(self, entries: List[Dict[str, Any]]):
+        """Queue log rows; flushes synchronously when the queue is full"""
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                # Back-pressure: write the backlog in the caller's thread
+                self.flush()
+                self._queue.put_nowait(entry)
+        
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+    
+    def pending(self) -> int:
+        """Number of rows waiting to be written"""
+        return self._queue.qsize()
+    
+    def flush(self) -> int:
+        """Write all queued rows now; returns the number of rows written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return written
+                written += self._write_batch(batch)
+    
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> int:
+        db = SessionLocal()
+        try:
+            _insert_logs(db, batch)
+            db.commit()
+            return len(batch)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(batch)} deferred task logs, retrying row by row: {e}")
+        finally:
+            db.close()
+        
+        # One bad row (e.g. its task was deleted before the flush) must not
+        # discard the whole batch
+        written = 0
+        for entry in batch:
+            db = SessionLocal()
+            try:
+                _insert_logs(db, [entry])
+                db.commit()
+                written += 1
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Dropped task log for task {entry.get('task_id')}: {e}")
+            finally:
+                db.close()
+        return written
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Deferred task log flush failed: {e}")
+
+
 class TaskLogService:
     """Service for managing task logs"""
     
-    def create_log(
+    def __init__(self, mode: Optional[str] = None, writer: Optional[DeferredTaskLogWriter] = None):
+        self.mode = mode or settings.TASK_LOG_MODE
+        self.writer = writer or task_log_writer
+    
+    def _log_values(
         self,
-        db: Session,
         task_id: int,
         user_id: int,
         action: str,
@@ -28,8 +164,8 @@ class TaskLogService:
         new_value: Any = None,
         description: Optional[str] = None,
         extra_data: Optional[Dict[str, Any]] = None
-    ) -> TaskLog:
-        """Create a new task log entry"""
+    ) -> Dict[str, Any]:
+        """Column values of a task log entry"""
         
         # Convert complex values to JSON strings
         old_value_str = None
@@ -47,23 +183,51 @@ class TaskLogService:
             else:
                 new_value_str = str(new_value)
         
-        log_entry = TaskLog(
-            task_id=task_id,
-            user_id=user_id,
-            action=action,
-            field_name=field_name,
-            old_value=old_value_str,
-            new_value=new_value_str,
-            description=description,
-            extra_data=extra_data
-        )
+        return {
+            "task_id": task_id,
+            "user_id": user_id,
+            "action": action,
+            "field_name": field_name,
+            "old_value": old_value_str,
+            "new_value": new_value_str,
+            "description": description,
+            "extra_data": extra_data
+        }
+    
+    def create_log(
+        self,
+        db: Session,
+        task_id: int,
+        user_id: int,
+        action: str,
+        field_name: Optional[str] = None,
+        old_value: Any = None,
+        new_value: Any = None,
+        description: Optional[str] = None,
+        extra_data: Optional[Dict[str, Any]] = None
+    ):
+        """Write a single task log entry"""
+        self.write_logs(db, [self._log_values(
+            task_id, user_id, action, field_name, old_value, new_value, description, extra_data
+        )])
+    
+    def write_logs(self, db: Session, entries: List[Dict[str, Any]]):
+        """
+        Write log entries built by the *_log_values helpers
+        
+        In transaction mode the rows are inserted in the caller's session and
+        committed by the caller; in deferred mode they are queued for the
+        background writer. Nothing is committed here.
+        """
+        if not entries:
+            return
         
-        db.add(log_entry)
-        db.commit()
-        db.refresh(log_entry)
+        if self.mode == "deferred":
+            self.writer.enqueue(entries)
+        else:
+            _insert_logs(db, entries)
         
-        logger.info(f"Created task log: task_id={task_id}, action={action}, user_id={user_id}")
-        return log_entry
+        logger.info(f"Wrote {len(entries)} task logs ({self.mode} mode)")
     
     def get_task_logs(
         self,
@@ -71,9 +235,15 @@ class TaskLogService:
         task_id: int,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[TaskLog]:
-        """Get logs for a specific task"""
+        """
+        Get logs for a specific task, newest first
+        
+        Pass the cursor of the previous page to use keyset pagination on
+        (created_at, id); skip is ignored in that case.
+        """
         # Verify user has access to the task
         task = db.query(Task).filter(Task.id == task_id).first()
         if not task:
@@ -82,35 +252,55 @@ class TaskLogService:
         # For now, allow access if user owns the project or task is standalone
         # TODO: Add proper permission checking
         
-        return db.query(TaskLog).filter(
+        query = db.query(TaskLog).filter(
             TaskLog.task_id == task_id
-        ).order_by(TaskLog.created_at.desc()).offset(skip).limit(limit).all()
+        ).order_by(TaskLog.created_at.desc(), TaskLog.id.desc())
+        
+        if cursor:
+            sort_columns = (TaskLog.created_at, TaskLog.id)
+            query = query.filter(keyset_filter(sort_columns, decode_cursor(cursor, len(sort_columns)), descending=True))
+        else:
+            query = query.offset(skip)
+        
+        return query.limit(limit).all()
     
-    def log_task_creation(self, db: Session, task: Task, user_id: int):
-        """Log task creation"""
-        self.create_log(
-            db=db,
-            task_id=task.id,
-            user_id=user_id,
-            action="created",
-            description=f"Task '{task.title}' was created",
-            extra_data={
+    @staticmethod
+    def log_cursor_key(log: TaskLog) -> tuple:
+        """Keyset pagination key for task log listings"""
+        return (log.created_at, log.id)
+    
+    def creation_log_values(self, task: Task, user_id: int) -> Dict[str, Any]:
+        """Column values of the log entry written when a task is created"""
+        return {
+            "task_id": task.id,
+            "user_id": user_id,
+            "action": "created",
+            "description": f"Task '{task.title}' was created",
+            "extra_data": {
                 "initial_status": task.status.value,
                 "initial_priority": task.priority.value,
                 "project_id": task.project_id,
                 "parent_id": task.parent_id
             }
-        )
+        }
     
-    def log_task_update(
+    def log_task_creation(self, db: Session, task: Task, user_id: int):
+        """Log task creation"""
+        self.create_log(db=db, **self.creation_log_values(task, user_id))
+    
+    def bulk_log_task_creation(self, db: Session, tasks: List[Task], user_id: int):
+        """Log creation of many tasks in the caller's transaction"""
+        self.write_logs(db, [self.creation_log_values(task, user_id) for task in tasks])
+    
+    def update_log_values(
         self,
-        db: Session,
         task: Task,
         user_id: int,
         old_values: Dict[str, Any],
         new_values: Dict[str, Any]
-    ):
-        """Log task updates"""
+    ) -> List[Dict[str, Any]]:
+        """Column values of the log entries for the fields an update changed"""
+        entries = []
         for field, new_value in new_values.items():
             old_value = old_values.get(field)
             
@@ -118,8 +308,7 @@ class TaskLogService:
                 # Create human-readable description
                 description = self._generate_update_description(field, old_value, new_value, task.title)
                 
-                self.create_log(
-                    db=db,
+                entries.append(self._log_values(
                     task_id=task.id,
                     user_id=user_id,
                     action="updated",
@@ -127,21 +316,32 @@ class TaskLogService:
                     old_value=old_value,
                     new_value=new_value,
                     description=description
-                )
+                ))
+        return entries
     
-    def log_status_change(
+    def log_task_update(
         self,
         db: Session,
         task: Task,
         user_id: int,
-        old_status: str,
-        new_status: str
+        old_values: Dict[str, Any],
+        new_values: Dict[str, Any]
     ):
-        """Log task status change"""
+        """Log task updates"""
+        self.write_logs(db, self.update_log_values(task, user_id, old_values, new_values))
+    
+    def status_change_log_values(
+        self,
+        task: Task,
+        user_id: int,
+        old_status: str,
+        new_status: str,
+        completed_at: Optional[datetime]
+    ) -> Dict[str, Any]:
+        """Column values of a status change log entry"""
         description = f"Task '{task.title}' status changed from '{old_status}' to '{new_status}'"
         
-        self.create_log(
-            db=db,
+        return self._log_values(
             task_id=task.id,
             user_id=user_id,
             action="status_changed",
@@ -150,21 +350,33 @@ class TaskLogService:
             new_value=new_status,
             description=description,
             extra_data={
-                "completed_at": task.completed_at.isoformat() if task.completed_at else None
+                "completed_at": completed_at.isoformat() if completed_at else None
             }
         )
     
-    def log_assignment_change(
+    def log_status_change(
         self,
         db: Session,
         task: Task,
         user_id: int,
+        old_status: str,
+        new_status: str
+    ):
+        """Log task status change"""
+        self.create_log(db=db, **self.status_change_log_values(
+            task, user_id, old_status, new_status, task.completed_at
+        ))
+    
+    def assignment_log_values(
+        self,
+        task: Task,
+        user_id: int,
         old_assignee_id: Optional[int],
         new_assignee_id: Optional[int]
-    ):
-        """Log task assignment change"""
+    ) -> Optional[Dict[str, Any]]:
+        """Column values of an assignment change log entry, or None if unchanged"""
         if old_assignee_id == new_assignee_id:
-            return
+            return None
         
         if old_assignee_id is None:
             description = f"Task '{task.title}' was assigned to user {new_assignee_id}"
@@ -173,8 +385,7 @@ class TaskLogService:
         else:
             description = f"Task '{task.title}' was reassigned from user {old_assignee_id} to user {new_assignee_id}"
         
-        self.create_log(
-            db=db,
+        return self._log_values(
             task_id=task.id,
             user_id=user_id,
             action="assigned",
@@ -184,6 +395,19 @@ class TaskLogService:
             description=description
         )
     
+    def log_assignment_change(
+        self,
+        db: Session,
+        task: Task,
+        user_id: int,
+        old_assignee_id: Optional[int],
+        new_assignee_id: Optional[int]
+    ):
+        """Log task assignment change"""
+        entry = self.assignment_log_values(task, user_id, old_assignee_id, new_assignee_id)
+        if entry:
+            self.write_logs(db, [entry])
+    
     def log_dependency_change(
         self,
         db: Session,
@@ -213,20 +437,44 @@ class TaskLogService:
             description=description
         )
     
+    def deletion_log_values(
+        self,
+        task: Any,
+        user_id: int,
+        had_subtasks: bool,
+        had_dependencies: bool,
+        deleted_with: Optional[int] = None,
+        deleted_subtasks: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Column values of the log entry written when a task is deleted
+        
+        task only needs id, title and status. deleted_with is the ID of the
+        task whose deletion removed this subtask; deleted_subtasks is the
+        number of subtasks removed along with the deleted task.
+        """
+        extra_data = {
+            "final_status": task.status.value,
+            "had_subtasks": had_subtasks,
+            "had_dependencies": had_dependencies
+        }
+        if deleted_with is not None:
+            extra_data["deleted_with"] = deleted_with
+        if deleted_subtasks is not None:
+            extra_data["deleted_subtasks"] = deleted_subtasks
+        return {
+            "task_id": task.id,
+            "user_id": user_id,
+            "action": "deleted",
+            "description": f"Task '{task.title}' was deleted",
+            "extra_data": extra_data
+        }
+    
     def log_task_deletion(self, db: Session, task: Task, user_id: int):
         """Log task deletion"""
-        self.create_log(
-            db=db,
-            task_id=task.id,
-            user_id=user_id,
-            action="deleted",
-            description=f"Task '{task.title}' was deleted",
-            extra_data={
-                "final_status": task.status.value,
-                "had_subtasks": len(task.subtasks) > 0,
-                "had_dependencies": len(task.dependencies) > 0
-            }
-        )
+        self.create_log(db=db, **self.deletion_log_values(
+            task, user_id, had_subtasks=len(task.subtasks) > 0, had_dependencies=len(task.dependencies) > 0
+        ))
     
     def _generate_update_description(
         self,
@@ -251,5 +499,6 @@ class TaskLogService:
         return field_descriptions.get(field, f"Task '{task_title}' field '{field}' was updated")
 
 
-# Global service instance
+# Global writer and service instances
+task_log_writer = DeferredTaskLogWriter()
 task_log_service = TaskLogService()
\ No newline at end of file
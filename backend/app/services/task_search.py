@@ -0,0 +1,166 @@
+"""
+Full-text search over task titles, descriptions and details
+
+On MySQL the search uses the FULLTEXT index ix_tasks_fulltext (ngram
+parser, so Chinese text is searchable) in boolean mode, with every query
+word required and matched as a prefix. Other databases use a per-project
+in-memory inverted index (app.core.text_search) that is loaded with one
+query on first use, updated by the task service when task text changes, and
+reloaded after a TTL so changes made by other worker processes are
+eventually picked up. Both rank matches by relevance.
+
+TASK_SEARCH_MODE=like keeps the old ILIKE '%term%' substring filter.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, false, or_, text as sql_text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.text_search import InvertedIndex, words
+from app.models.project import Project
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+# Title matches count three times as much as description or details matches
+FIELD_WEIGHTS = {"title": 3.0, "description": 1.0, "details": 1.0}
+SEARCH_FIELDS = tuple(FIELD_WEIGHTS)
+
+# Rows fetched per round trip while loading a project index
+LOAD_BATCH_SIZE = 1000
+
+
+class ProjectSearchIndex(InvertedIndex):
+    """Inverted index of the tasks of one project"""
+
+    def __init__(self):
+        super().__init__(FIELD_WEIGHTS)
+        self.loaded_at = time.monotonic()
+
+
+class TaskSearchIndex:
+    """Process-wide cache of per-project task search indexes"""
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_results: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.TASK_SEARCH_INDEX_TTL_SECONDS
+        self.max_results = max_results if max_results is not None else settings.TASK_SEARCH_MAX_RESULTS
+        self._indexes: Dict[Optional[int], ProjectSearchIndex] = {}
+        self._lock = threading.RLock()
+
+    def _load(self, db: Session, project_id: Optional[int]) -> ProjectSearchIndex:
+        """Index all tasks of a project (None for standalone tasks)"""
+        query = db.query(Task.id, Task.title, Task.description, Task.details)
+        if project_id is None:
+            query = query.filter(Task.project_id.is_(None))
+        else:
+            query = query.filter(Task.project_id == project_id)
+
+        index = ProjectSearchIndex()
+        for task_id, *texts in query.yield_per(LOAD_BATCH_SIZE):
+            index.add(task_id, dict(zip(SEARCH_FIELDS, texts)))
+
+        logger.debug(f"Loaded search index for project {project_id} with {len(index)} tasks")
+        return index
+
+    def _get_index(self, db: Session, project_id: Optional[int]) -> ProjectSearchIndex:
+        index = self._indexes.get(project_id)
+        if index is None or time.monotonic() - index.loaded_at > self.ttl_seconds:
+            index = self._load(db, project_id)
+            self._indexes[project_id] = index
+        return index
+
+    def search(self, db: Session, user_id: int, text: str) -> List[Tuple[int, float]]:
+        """
+        (task_id, score) pairs of the user's tasks matching text, best first
+
+        Covers the user's projects and standalone tasks, capped at
+        max_results.
+        """
+        project_ids: List[Optional[int]] = [
+            project_id for project_id, in db.query(Project.id).filter(Project.user_id == user_id).all()
+        ]
+        project_ids.append(None)
+
+        results: List[Tuple[int, float]] = []
+        with self._lock:
+            for project_id in project_ids:
+                results.extend(self._get_index(db, project_id).search(text, limit=self.max_results))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:self.max_results]
+
+    def index_tasks(self, tasks: Iterable[Any]):
+        """
+        Record committed task text in the loaded indexes
+
+        tasks are Task rows, or any objects with id, project_id and the
+        searched text attributes.
+        """
+        with self._lock:
+            for task in tasks:
+                index = self._indexes.get(task.project_id)
+                if index is not None:
+                    index.add(task.id, {field: getattr(task, field) for field in SEARCH_FIELDS})
+
+    def invalidate(self, project_id: Optional[int]):
+        """Forget one project's index (None is the standalone task index)"""
+        with self._lock:
+            self._indexes.pop(project_id, None)
+
+    def clear(self):
+        """Forget all loaded indexes"""
+        with self._lock:
+            self._indexes.clear()
+
+
+def _boolean_query(text: str) -> str:
+    """MySQL boolean mode query requiring every word of text, as a prefix"""
+    return " ".join(f"+{word}*" for word in words(text))
+
+
+def apply_search(query, db: Session, user_id: int, text: str, ranked: bool = False):
+    """
+    Filter a task query to full-text matches of text
+
+    Returns the filtered query and, when ranked is set and the backend
+    scores matches, a relevance expression to sort by (higher is better).
+    """
+    # Text without any word (e.g. only punctuation) can only match as a substring
+    if settings.TASK_SEARCH_MODE == "like" or not words(text):
+        search_term = f"%{text}%"
+        return query.filter(
+            or_(
+                Task.title.ilike(search_term),
+                Task.description.ilike(search_term),
+                Task.details.ilike(search_term)
+            )
+        ), None
+
+    if db.get_bind().dialect.name == "mysql":
+        relevance = match(
+            Task.title, Task.description, Task.details, against=_boolean_query(text)
+        ).in_boolean_mode()
+        return query.filter(relevance), relevance if ranked else None
+
+    matches = task_search_index.search(db, user_id, text)
+    if not matches:
+        return query.filter(false()), None
+
+    # Join the matches as an inline VALUES table; IDs and scores are numbers,
+    # so inlining them keeps large result sets below the driver's parameter limit
+    rows = ", ".join(f"({task_id}, {score!r})" for task_id, score in matches)
+    ranking = sql_text(
+        f"SELECT column1 AS task_id, column2 AS score FROM (VALUES {rows})"
+    ).columns(task_id=Integer, score=Float).subquery("search_ranking")
+    query = query.join(ranking, ranking.c.task_id == Task.id)
+    return query, ranking.c.score if ranked else None
+
+
+# Global index instance
+task_search_index = TaskSearchIndex()
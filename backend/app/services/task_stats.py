@@ -0,0 +1,265 @@
+"""
+Per-project task statistics rollup
+
+project_task_stats keeps each project's task counts by status, the number
+and summed duration (completed_at - created_at) of completed tasks, and the
+time of the last task change. Every path that creates, updates or deletes
+tasks passes the affected tasks' states before and after the change to
+record_changes before committing, which applies the differences with
+UPDATE ... SET col = col + delta in the same transaction, so reading the
+stats is a primary key lookup instead of a scan of the tasks table.
+
+A project without a row is rebuilt from the tasks table on its first task
+change. rebuild() recomputes rows from the tasks table and check() reports
+rows that disagree with it (manage_db.py rebuild-task-stats and
+check-task-stats). Standalone tasks (without a project) have no row.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+from app.models.project_task_stats import ProjectTaskStats
+from app.models.task import Task, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# Rollup column of each task status
+STATUS_COLUMNS = {
+    TaskStatus.PENDING: "pending_tasks",
+    TaskStatus.IN_PROGRESS: "in_progress_tasks",
+    TaskStatus.REVIEW: "review_tasks",
+    TaskStatus.DONE: "done_tasks",
+    TaskStatus.BLOCKED: "blocked_tasks",
+    TaskStatus.CANCELLED: "cancelled_tasks",
+}
+COUNT_COLUMNS = list(STATUS_COLUMNS.values()) + ["completed_count"]
+
+# (project ID, status, completion seconds or None) of a task at one point in time
+TaskState = Tuple[Optional[int], TaskStatus, Optional[float]]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def completion_seconds(created_at: Optional[datetime], completed_at: Optional[datetime]) -> Optional[float]:
+    """Seconds from creation to completion, or None if either time is unknown"""
+    if created_at is None or completed_at is None:
+        return None
+    return (_naive_utc(completed_at) - _naive_utc(created_at)).total_seconds()
+
+
+class TaskStatsService:
+    """Maintains and reads the project_task_stats rollup"""
+
+    @staticmethod
+    def state(
+        project_id: Optional[int],
+        status: TaskStatus,
+        created_at: Optional[datetime] = None,
+        completed_at: Optional[datetime] = None
+    ) -> TaskState:
+        """State of a task with the given values"""
+        status = TaskStatus(status.value)
+        seconds = completion_seconds(created_at, completed_at) if status == TaskStatus.DONE else None
+        return (project_id, status, seconds)
+
+    @staticmethod
+    def task_state(task: Task) -> TaskState:
+        """Current state of a task; created_at is only read for completed tasks"""
+        # Tasks built from schemas hold the schema's str enum until they are refreshed
+        status = TaskStatus(task.status.value)
+        if status == TaskStatus.DONE and task.completed_at is not None:
+            return (task.project_id, status, completion_seconds(task.created_at, task.completed_at))
+        return (task.project_id, status, None)
+
+    def record_changes(self, db: Session, changes: Iterable[Tuple[Optional[TaskState], Optional[TaskState]]]):
+        """
+        Apply (before, after) task states to the rollup in the current transaction
+
+        before is None for created tasks and after is None for deleted ones.
+        Call it after the task changes are written (or pending in the
+        session), so projects without a row can be rebuilt from the tasks
+        table. Rows are updated in project ID order.
+        """
+        deltas: Dict[int, Dict[str, float]] = {}
+        for before, after in changes:
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None or state[0] is None:
+                    continue
+                project_id, status, seconds = state
+                delta = deltas.setdefault(project_id, defaultdict(float))
+                delta[STATUS_COLUMNS[status]] += sign
+                if seconds is not None:
+                    delta["completed_count"] += sign
+                    delta["completion_seconds"] += sign * seconds
+
+        now = datetime.utcnow()
+        missing = []
+        for project_id in sorted(deltas):
+            values = {
+                column: getattr(ProjectTaskStats, column) + (int(value) if column in COUNT_COLUMNS else value)
+                for column, value in deltas[project_id].items() if value
+            }
+            values["last_activity"] = now
+            updated = db.query(ProjectTaskStats).filter(
+                ProjectTaskStats.project_id == project_id
+            ).update(values, synchronize_session=False)
+            if not updated:
+                missing.append(project_id)
+
+        if missing:
+            self.rebuild(db, missing)
+
+    def _aggregate(self, db: Session, project_ids: Optional[List[int]]) -> Dict[int, Dict[str, object]]:
+        """Rollup values computed from the tasks table, for projects that have tasks"""
+        done_with_time = and_(Task.status == TaskStatus.DONE, Task.completed_at.is_not(None))
+        query = db.query(
+            Task.project_id,
+            *[
+                func.sum(case((Task.status == status, 1), else_=0)).label(column)
+                for status, column in STATUS_COLUMNS.items()
+            ],
+            func.sum(case((done_with_time, 1), else_=0)).label("completed_count"),
+            func.max(Task.updated_at).label("last_activity")
+        ).filter(Task.project_id.is_not(None))
+        if project_ids is not None:
+            query = query.filter(Task.project_id.in_(project_ids))
+
+        values = {}
+        for row in query.group_by(Task.project_id).all():
+            values[row.project_id] = {column: int(getattr(row, column) or 0) for column in COUNT_COLUMNS}
+            values[row.project_id]["completion_seconds"] = 0.0
+            values[row.project_id]["last_activity"] = row.last_activity
+
+        # Durations are summed in Python, the same way record_changes computes them
+        durations = db.query(Task.project_id, Task.created_at, Task.completed_at).filter(
+            done_with_time, Task.project_id.is_not(None)
+        )
+        if project_ids is not None:
+            durations = durations.filter(Task.project_id.in_(project_ids))
+        for project_id, created_at, completed_at in durations.yield_per(1000):
+            values[project_id]["completion_seconds"] += completion_seconds(created_at, completed_at)
+        return values
+
+    def rebuild(self, db: Session, project_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute the rows of project_ids (all projects by default) from the tasks table
+
+        Runs in the caller's transaction; returns the number of rows written.
+        """
+        db.flush()
+        if project_ids is None:
+            project_ids = [row.id for row in db.query(Project.id).all()]
+        if not project_ids:
+            return 0
+
+        values = self._aggregate(db, project_ids)
+        rows = {
+            row.project_id: row for row in db.query(ProjectTaskStats).filter(
+                ProjectTaskStats.project_id.in_(project_ids)
+            ).all()
+        }
+        for project_id in project_ids:
+            row = rows.get(project_id)
+            if row is None:
+                row = ProjectTaskStats(project_id=project_id)
+                db.add(row)
+            project_values = values.get(project_id, {})
+            for column in COUNT_COLUMNS:
+                setattr(row, column, project_values.get(column, 0))
+            row.completion_seconds = project_values.get("completion_seconds", 0.0)
+            row.last_activity = project_values.get("last_activity")
+        db.flush()
+
+        logger.info(f"Rebuilt task stats of {len(project_ids)} projects")
+        return len(project_ids)
+
+    def check(self, db: Session, project_ids: Optional[List[int]] = None) -> List[Dict[str, object]]:
+        """
+        Rollup values that disagree with the tasks table
+
+        Returns one {"project_id", "field", "expected", "actual"} entry per
+        differing counter. Completion durations may differ by up to a second
+        per completed task, for databases that store whole seconds;
+        last_activity is not checked, since deleting tasks also counts as
+        activity.
+        """
+        if project_ids is None:
+            project_ids = [row.id for row in db.query(Project.id).all()]
+        values = self._aggregate(db, project_ids)
+        rows = {
+            row.project_id: row for row in db.query(ProjectTaskStats).filter(
+                ProjectTaskStats.project_id.in_(project_ids)
+            ).all()
+        } if project_ids else {}
+
+        mismatches = []
+        for project_id in project_ids:
+            expected = values.get(project_id, {})
+            row = rows.get(project_id)
+            for column in COUNT_COLUMNS:
+                actual = getattr(row, column) if row is not None else 0
+                if actual != expected.get(column, 0):
+                    mismatches.append({
+                        "project_id": project_id, "field": column,
+                        "expected": expected.get(column, 0), "actual": actual
+                    })
+
+            expected_seconds = expected.get("completion_seconds", 0.0)
+            actual_seconds = row.completion_seconds if row is not None else 0.0
+            if abs(actual_seconds - expected_seconds) > max(1.0, expected.get("completed_count", 0)):
+                mismatches.append({
+                    "project_id": project_id, "field": "completion_seconds",
+                    "expected": expected_seconds, "actual": actual_seconds
+                })
+        return mismatches
+
+    def get_stats(self, db: Session, project_ids: List[int]) -> Dict[int, ProjectTaskStats]:
+        """Rollup rows of project_ids; projects without a row are left out"""
+        if not project_ids:
+            return {}
+        rows = db.query(ProjectTaskStats).filter(ProjectTaskStats.project_id.in_(project_ids)).all()
+        return {row.project_id: row for row in rows}
+
+    def user_totals(self, db: Session, user_id: int, project_id: Optional[int] = None) -> Dict[str, float]:
+        """
+        Rollup columns summed over the user's projects (or one of them)
+
+        Without project_id, standalone tasks are added from the tasks table.
+        """
+        row = db.query(
+            *[func.sum(getattr(ProjectTaskStats, column)) for column in COUNT_COLUMNS],
+            func.sum(ProjectTaskStats.completion_seconds)
+        ).join(Project, ProjectTaskStats.project_id == Project.id).filter(Project.user_id == user_id)
+        if project_id:
+            row = row.filter(ProjectTaskStats.project_id == project_id)
+        row = row.one()
+
+        totals: Dict[str, float] = {column: int(value or 0) for column, value in zip(COUNT_COLUMNS, row)}
+        totals["completion_seconds"] = float(row[-1] or 0.0)
+        if project_id:
+            return totals
+
+        standalone = Task.project_id.is_(None)
+        for status, count in db.query(Task.status, func.count(Task.id)).filter(standalone).group_by(Task.status).all():
+            totals[STATUS_COLUMNS[status]] += count
+        completed = db.query(Task.created_at, Task.completed_at).filter(
+            standalone, Task.status == TaskStatus.DONE, Task.completed_at.is_not(None)
+        )
+        for created_at, completed_at in completed.yield_per(1000):
+            totals["completed_count"] += 1
+            totals["completion_seconds"] += completion_seconds(created_at, completed_at)
+        return totals
+
+
+# Global service instance
+task_stats_service = TaskStatsService()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch status and field updates
+
+Runs POST /api/v1/tasks/batch/status and /batch/update over increasing
+numbers of tasks and checks that the number of statements stays flat
+instead of growing with the batch size. Also checks that the UPDATE, as
+compiled for MySQL, assigns completed_at before status: MySQL evaluates
+SET assignments left to right, and the completed_at CASE must read the
+old status.
+"""
+
+import time
+
+from benchmark_support import SessionLocal, api_client, detach, reset_database, run, seed_owner, statements
+
+from sqlalchemy import case
+from sqlalchemy.dialects import mysql
+
+from app.models import Task, TaskLog, TaskStatus
+from app.services.task import task_service
+
+BATCH_SIZES = [10, 100, 1000]
+
+
+def seed(task_count: int):
+    """Create a fresh schema with one user owning task_count tasks"""
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db)
+    tasks = [Task(project_id=project.id, title=f"Task {i}") for i in range(task_count)]
+    db.add_all(tasks)
+    db.commit()
+
+    task_ids = [task.id for task in tasks]
+    user = detach(db, user)
+    db.close()
+    return user, task_ids
+
+
+def timed_post(client, url, payload):
+    with statements() as log:
+        start = time.perf_counter()
+        response = client.post(url, json=payload)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.text
+    return response.json(), log.count, elapsed
+
+
+def check_completed_at_set_first():
+    """The batch UPDATE compiled for MySQL must assign completed_at before status"""
+    statement = task_service._batch_update_statement([1, 2], {
+        "status": TaskStatus.PENDING,
+        "completed_at": case((Task.status == TaskStatus.DONE, None), else_=Task.completed_at)
+    })
+    sql = str(statement.compile(dialect=mysql.dialect()))
+    assert sql.index("completed_at=") < sql.index("status="), \
+        "The batch UPDATE sets status before completed_at, so MySQL would read the new status"
+
+
+def run_benchmark():
+    check_completed_at_set_first()
+    status_counts, update_counts = set(), set()
+
+    for batch_size in BATCH_SIZES:
+        user, task_ids = seed(batch_size)
+        with api_client(user) as client:
+            tasks, status_statements, status_time = timed_post(
+                client, "/api/v1/tasks/batch/status", {"task_ids": task_ids, "status": "done"}
+            )
+            assert len(tasks) == batch_size and all(t["completed_at"] for t in tasks), \
+                f"Marking {batch_size} tasks done did not set completed_at on all of them"
+
+            tasks, update_statements, update_time = timed_post(
+                client, "/api/v1/tasks/batch/update", {"task_ids": task_ids, "updates": {"priority": "high"}}
+            )
+            assert all(t["priority"] == "high" for t in tasks), "A batch field update was lost"
+
+            # Leaving DONE clears the completion timestamp
+            tasks, _, _ = timed_post(
+                client, "/api/v1/tasks/batch/status", {"task_ids": task_ids, "status": "pending"}
+            )
+            assert all(t["completed_at"] is None for t in tasks), "Leaving DONE kept completed_at"
+
+        db = SessionLocal()
+        log_rows = db.query(TaskLog).count()
+        db.close()
+        assert log_rows == 3 * batch_size, f"{log_rows} log rows for 3 updates of {batch_size} tasks"
+
+        # Reloading the response trees is a single recursive query
+        status_counts.add(status_statements)
+        update_counts.add(update_statements)
+        print(f"{batch_size:>5} tasks: status {status_statements:>2} statements {status_time * 1000:8.1f} ms, "
+              f"update {update_statements:>2} statements {update_time * 1000:8.1f} ms")
+
+    assert len(status_counts) == 1 and len(update_counts) == 1, \
+        f"Statement counts grow with the batch size: status {sorted(status_counts)}, update {sorted(update_counts)}"
+    print("✅ Batch updates use one UPDATE and one log INSERT regardless of batch size")
+
+
+if __name__ == "__main__":
+    run("Batch update benchmark", run_benchmark)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request latency under 200 concurrent clients
+
+Serves the app with uvicorn and lets 200 concurrent clients fetch a
+project (GET /api/v1/projects/{id}) while a probe polls /health. Every SQL
+statement gets an artificial round trip delay to stand in for a remote
+MySQL server.
+
+The same endpoint is also mounted as an ``async def`` wrapper that calls
+the database on the event loop (how endpoints used to be declared), so the
+report compares both concurrency models. Sync endpoints run on the sized
+thread pool and leave the event loop free, so /health is no longer queued
+behind queries and p99 latency of the database requests drops. Client and
+server share one process, so on small machines both numbers also include
+CPU contention.
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("AI_JOB_RECOVER_ON_STARTUP", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmark_support import detach, run, seed_owner
+
+import httpx
+import uvicorn
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.core.database as database_module
+from app.main import app
+from app.api.api_v1.endpoints import projects as projects_endpoint
+from app.core.database import Base, get_db
+from app.core.deps import get_current_user
+from app.models import User, Task
+from app.schemas.project import ProjectWithStats
+
+CLIENTS = 200
+REQUESTS_PER_CLIENT = 1
+STATEMENT_LATENCY = 0.02  # Seconds added to every SQL statement (a slow remote query)
+PROBE_INTERVAL = 0.01
+
+db_file = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+engine = create_engine(
+    f"sqlite:///{db_file.name}",
+    connect_args={"check_same_thread": False},
+    pool_size=40,
+    max_overflow=10,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Use the real get_db dependency, including how it closes sessions
+database_module.SessionLocal = TestingSessionLocal
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def network_round_trip(conn, cursor, statement, parameters, context, executemany):
+    time.sleep(STATEMENT_LATENCY)
+
+
+@app.get("/bench/blocking/projects/{project_id}", response_model=ProjectWithStats)
+async def blocking_get_project(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The project endpoint with its database work on the event loop"""
+    return projects_endpoint.get_project(project_id, db, current_user)
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = TestingSessionLocal()
+    user, project = seed_owner(db)
+    db.add_all([Task(project_id=project.id, title=f"Task {i}") for i in range(20)])
+    db.commit()
+
+    project_id = project.id
+    user = detach(db, user)
+    db.close()
+    return user, project_id
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_load(base_url: str, path: str):
+    """Run the clients and the /health probe; return both latency lists in ms"""
+    latencies, probe_latencies = [], []
+    done = asyncio.Event()
+    limits = httpx.Limits(max_connections=CLIENTS + 1, max_keepalive_connections=CLIENTS + 1)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def worker():
+            for _ in range(REQUESTS_PER_CLIENT):
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.text
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                response = await client.get("/health")
+                probe_latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.gather(*(worker() for _ in range(CLIENTS)))
+        done.set()
+        await probe_task
+
+    return latencies, probe_latencies
+
+
+def report(label: str, latencies, probe_latencies, elapsed: float):
+    print(f"{label:<26} p50 {statistics.median(latencies):7.1f} ms  "
+          f"p99 {percentile(latencies, 0.99):7.1f} ms  "
+          f"{len(latencies) / elapsed:6.0f} req/s  "
+          f"/health p99 {percentile(probe_latencies, 0.99):7.1f} ms")
+    return percentile(latencies, 0.99), percentile(probe_latencies, 0.99)
+
+
+def run_benchmark():
+    user, project_id = seed()
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", timeout_keep_alive=120
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{port}"
+    print(f"{CLIENTS} concurrent clients x {REQUESTS_PER_CLIENT} requests, "
+          f"{STATEMENT_LATENCY * 1000:.0f} ms per SQL statement")
+
+    results = {}
+    for label, path in [
+        ("async def (event loop)", f"/bench/blocking/projects/{project_id}"),
+        ("def (thread pool)", f"/api/v1/projects/{project_id}"),
+    ]:
+        start = time.perf_counter()
+        latencies, probe_latencies = asyncio.run(run_load(base_url, path))
+        results[label] = report(label, latencies, probe_latencies, time.perf_counter() - start)
+
+    server.should_exit = True
+    thread.join()
+    app.dependency_overrides.clear()
+    engine.dispose()
+    os.unlink(db_file.name)
+
+    blocking_p99, blocking_probe_p99 = results["async def (event loop)"]
+    threaded_p99, threaded_probe_p99 = results["def (thread pool)"]
+    assert threaded_p99 * 2 < blocking_p99 and threaded_probe_p99 < blocking_probe_p99, \
+        "Database work still blocks the event loop"
+    print("✅ Sync endpoints run on the thread pool; /health and p99 latency are not held up by queries")
+
+
+if __name__ == "__main__":
+    run("Concurrency benchmark", run_benchmark)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dependency cycle checks on deep chains
+
+Builds a project whose tasks form one long dependency chain and times the
+cycle check for an edge that closes the chain and for one that does not,
+then checks that an edge written by another session is seen.
+"""
+
+import time
+
+from benchmark_support import SessionLocal, reset_database, run, seed_owner, statements
+
+from app.models import Task, TaskDependency
+from app.services.dependency_graph import dependency_graph_index
+
+CHAIN_LENGTHS = [100, 1000, 10000]
+ROUNDS = 100
+
+
+def seed(chain_length: int):
+    """Create tasks t0..tn where t(i+1) depends on t(i)"""
+    reset_database()
+    db = SessionLocal()
+    _, project = seed_owner(db)
+
+    tasks = [Task(project_id=project.id, title=f"Task {i}") for i in range(chain_length)]
+    db.add_all(tasks)
+    db.flush()
+    db.add_all([
+        TaskDependency(task_id=tasks[i + 1].id, depends_on_id=tasks[i].id)
+        for i in range(chain_length - 1)
+    ])
+    db.commit()
+
+    first, last, project_id = tasks[0].id, tasks[-1].id, project.id
+    db.close()
+    return first, last, project_id
+
+
+def run_benchmark():
+    for chain_length in CHAIN_LENGTHS:
+        first, last, project_id = seed(chain_length)
+        dependency_graph_index.clear()
+        db = SessionLocal()
+
+        # Cold check reads the edge marker and loads the project graph
+        with statements() as cold_log:
+            start = time.perf_counter()
+            closes_cycle = dependency_graph_index.would_create_cycle(db, first, project_id, last, project_id)
+            cold = time.perf_counter() - start
+
+        # Warm checks only read the edge marker
+        with statements() as warm_log:
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                dependency_graph_index.would_create_cycle(db, first, project_id, last, project_id)
+            warm_cycle = (time.perf_counter() - start) / ROUNDS
+
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                no_cycle = not dependency_graph_index.would_create_cycle(db, last, project_id, first, project_id)
+            warm_shallow = (time.perf_counter() - start) / ROUNDS
+
+        # An edge added by another worker changes the marker and is seen at once
+        other = SessionLocal()
+        other.add(TaskDependency(task_id=first, depends_on_id=last))
+        other.commit()
+        other.close()
+        sees_other_worker = dependency_graph_index.would_create_cycle(db, last, project_id, first, project_id)
+        db.close()
+
+        print(f"chain of {chain_length:>5}: cold {cold * 1000:7.2f} ms ({cold_log.count} statements), "
+              f"warm full walk {warm_cycle * 1e6:9.1f} µs, "
+              f"warm shallow {warm_shallow * 1e6:6.1f} µs ({warm_log.count} statements)")
+
+        assert closes_cycle, f"chain of {chain_length}: the closing edge was not detected as a cycle"
+        assert no_cycle, f"chain of {chain_length}: an edge along the chain was reported as a cycle"
+        assert sees_other_worker, f"chain of {chain_length}: an edge from another session was not seen"
+        assert cold_log.count == 2, f"chain of {chain_length}: cold check ran {cold_log.count} statements, expected 2"
+        assert warm_log.count == 2 * ROUNDS, \
+            f"chain of {chain_length}: {warm_log.count} statements for {2 * ROUNDS} warm checks"
+
+    print("✅ Cycles detected with one marker query per check and no per-node round trips")
+
+
+if __name__ == "__main__":
+    run("Dependency graph benchmark", run_benchmark)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: progress version comparison, difflib versus the line diff engine
+
+Diffs two versions of a 20,000 line document with a few hundred scattered
+edits, two highly repetitive versions that differ almost everywhere, and
+two versions of a 6,000 line checklist without unique lines (only
+checkboxes, blank lines and repeated headings), with difflib.unified_diff
+(as compare_versions used to) and with app.core.line_diff, and checks each
+line_diff result turns the old version into the new one. Then compares a version pair through compare_versions
+with full contents and in hunks-only mode with a page of 20 hunks, cold and
+from the diff cache.
+"""
+
+import difflib
+import json
+import random
+import time
+
+from benchmark_support import SessionLocal, reset_database, run, seed_owner
+
+from app.core.line_diff import diff_lines
+from app.schemas.project_progress import ProjectProgressCreate, ProjectProgressUpdate
+from app.services.progress_diff import progress_diff_cache
+from app.services.project_progress import project_progress_service
+
+DOCUMENT_LINES = 20000
+CHECKLIST_LINES = 6000
+EDITS = 300
+HUNK_PAGE = 20
+RUNS = 3
+
+
+def make_versions():
+    rng = random.Random(42)
+    old = [f"- [{i:05d}] 任务进度记录 progress entry with some markdown text\n" for i in range(DOCUMENT_LINES)]
+    new = list(old)
+    for edit in range(EDITS):
+        position = rng.randrange(len(new))
+        if edit % 3 == 0:
+            new.insert(position, f"- [new {edit}] 新增记录 added line\n")
+        elif edit % 3 == 1:
+            del new[position]
+        else:
+            new[position] = f"- [edit {edit}] 更新了进度 updated line\n"
+    return old, new
+
+
+def make_checklists():
+    """Checklist versions in which no line is unique: items toggled, some added and removed"""
+    rng = random.Random(7)
+    pattern = ["## 本周任务\n", "\n", "- [ ] 待办事项\n", "- [ ] 待办事项\n", "- [x] 已完成\n", "\n"]
+    old = [pattern[i % len(pattern)] for i in range(CHECKLIST_LINES)]
+    new = list(old)
+    for edit in range(EDITS):
+        position = rng.randrange(len(new))
+        if edit % 3 == 0:
+            new.insert(position, "- [ ] 待办事项\n")
+        elif edit % 3 == 1:
+            del new[position]
+        elif new[position].startswith("- [ ]"):
+            new[position] = "- [x] 已完成\n"
+    return old, new
+
+
+def applies(diff, old, new) -> bool:
+    """Whether the diff's opcodes turn old into new"""
+    result = []
+    for tag, i1, i2, j1, j2 in diff.opcodes:
+        result.extend(old[i1:i2] if tag == "equal" else new[j1:j2])
+    return result == new
+
+
+def best_ms(function, *args):
+    """Best of RUNS timings of function(*args) in ms, and its last result"""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def time_diffs(label: str, old, new):
+    """Time both implementations on one pair; line_diff must be correct and find no more changed lines"""
+    difflib_ms, unified = best_ms(lambda: list(difflib.unified_diff(old, new, lineterm="")))
+    difflib_changes = sum(1 for line in unified[2:] if line[:1] in "+-")
+
+    engine_ms, diff = best_ms(diff_lines, old, new)
+    changes = diff.added_lines + diff.removed_lines
+
+    print(f"{label:<12} difflib {difflib_ms:8.1f} ms ({difflib_changes} changed lines)  "
+          f"line_diff {engine_ms:8.1f} ms ({changes} changed lines{', approximate' if diff.approximate else ''})")
+    assert applies(diff, old, new), f"{label}: the line_diff opcodes do not turn the old version into the new"
+    assert changes <= difflib_changes, f"{label}: line_diff found {changes} changed lines, difflib {difflib_changes}"
+
+
+def time_compare(user_id: int, project_id: int, **options):
+    db = SessionLocal()
+    start = time.perf_counter()
+    comparison = project_progress_service.compare_versions(db, project_id, 1, 2, user_id, **options)
+    elapsed = (time.perf_counter() - start) * 1000
+    db.close()
+    return elapsed, len(json.dumps(comparison.model_dump(), ensure_ascii=False).encode("utf-8")), comparison
+
+
+def run_benchmark():
+    old, new = make_versions()
+    time_diffs("scattered", old, new)
+    repetitive_old = [f"{i % 7}\n" for i in range(DOCUMENT_LINES // 4)]
+    repetitive_new = [f"{i * 3 % 7}\n" for i in range(DOCUMENT_LINES // 4)]
+    time_diffs("repetitive", repetitive_old, repetitive_new)
+    time_diffs("checklist", *make_checklists())
+
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db)
+    db.commit()
+    user_id, project_id = user.id, project.id
+    project_progress_service.create_progress(db, project_id, user_id, ProjectProgressCreate(content="".join(old)))
+    project_progress_service.update_progress(db, project_id, user_id, ProjectProgressUpdate(content="".join(new)))
+    db.close()
+
+    progress_diff_cache.clear()
+    full_ms, full_bytes, full = time_compare(user_id, project_id)
+    cached_ms, _, _ = time_compare(user_id, project_id)
+    page_ms, page_bytes, page = time_compare(user_id, project_id, hunks_only=True, hunk_limit=HUNK_PAGE)
+    print(f"compare_versions full      {full_ms:7.1f} ms cold, {cached_ms:6.1f} ms cached, "
+          f"{full_bytes / 1024:7.1f} KB, {full.total_hunks} hunks")
+    print(f"compare_versions hunks     {page_ms:7.1f} ms cached, {page_bytes / 1024:7.1f} KB, "
+          f"{len(page.hunks)} of {page.total_hunks} hunks")
+
+    assert page.hunks == full.hunks[:HUNK_PAGE] and page.added_lines == full.added_lines, \
+        "The hunks-only page differs from the full comparison"
+    print(f"✅ Hunks-only page is {full_bytes / page_bytes:.0f}x smaller")
+
+
+if __name__ == "__main__":
+    run("Progress version diff benchmark", run_benchmark)
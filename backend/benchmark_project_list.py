@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQL statements issued by GET /api/v1/projects/
+
+Seeds an in-memory SQLite database with an increasing number of projects and
+checks that the number of statements per page stays flat.
+"""
+
+import time
+
+from benchmark_support import SessionLocal, api_client, detach, reset_database, run, seed_owner, statements
+
+from app.models import User, Project, Task, TaskStatus
+from app.services.task_stats import task_stats_service
+
+TASKS_PER_PROJECT = 5
+PROJECT_COUNTS = [10, 100, 500]
+
+
+def seed(project_count: int) -> User:
+    """Create a fresh schema with one user owning project_count projects"""
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db)
+
+    statuses = [TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.DONE]
+    projects = [project] + [Project(user_id=user.id, name=f"Project {i}") for i in range(1, project_count)]
+    db.add_all(projects)
+    db.flush()
+    for project in projects:
+        db.add_all([
+            Task(project_id=project.id, title=f"Task {j}", status=statuses[j % len(statuses)])
+            for j in range(TASKS_PER_PROJECT)
+        ])
+    task_stats_service.rebuild(db)
+
+    db.commit()
+    user = detach(db, user)
+    db.close()
+    return user
+
+
+def run_benchmark():
+    """Measure statements and wall time for one listing per project count"""
+    counts = set()
+
+    for project_count in PROJECT_COUNTS:
+        user = seed(project_count)
+        with api_client(user) as client, statements() as log:
+            start = time.perf_counter()
+            response = client.get("/api/v1/projects/", params={"limit": 1000})
+            elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200, response.text
+        projects = response.json()
+        assert len(projects) == project_count, f"{len(projects)} of {project_count} projects listed"
+        assert all(p["stats"]["total_tasks"] == TASKS_PER_PROJECT for p in projects), \
+            "A project lists the wrong task count"
+
+        counts.add(log.count)
+        print(f"{project_count:>5} projects: {log.count:>3} statements, {elapsed * 1000:8.1f} ms")
+
+    assert len(counts) == 1, f"Statement count grows with the number of projects: {sorted(counts)}"
+    print("✅ Statement count is independent of the number of projects")
+
+
+if __name__ == "__main__":
+    run("Project listing benchmark", run_benchmark)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: permanently deleting a large project
+
+Builds two identical projects of 4,000 tasks (two-level trees, every task
+depending on its previous sibling, with a creation log each) and deletes
+one with the ORM cascade hard delete used before (one transaction) and the
+other with the purge worker in chunks of PROJECT_PURGE_CHUNK_SIZE tasks.
+The purge is stopped after a few chunks, as if the process died, and then
+resumed. Reports total time and the longest transaction of each, and checks
+the purge removed every row of its project and nothing else.
+"""
+
+import time
+
+from benchmark_support import SessionLocal, reset_database, run, seed_owner, statements
+
+from sqlalchemy import insert
+
+from app.models import (
+    Project, ProjectTask, ProjectPurge, ProjectPurgeStatus, Task, TaskDependency, TaskLog, TaskStatus, TaskPriority
+)
+from app.services import project_purge
+from app.services.project_purge import ProjectPurgeService
+from app.services.project import project_service
+
+TASKS = 4000
+SUBTASKS = 9
+CHUNK_SIZE = 500
+INTERRUPT_AFTER_CHUNKS = 3
+
+project_purge.SessionLocal = SessionLocal
+
+
+def seed_project(db, user_id: int, name: str) -> int:
+    project = Project(user_id=user_id, name=name)
+    db.add(project)
+    db.flush()
+
+    first_id = (db.query(Task.id).order_by(Task.id.desc()).limit(1).scalar() or 0) + 1
+    rows, dependencies, links, logs = [], [], [], []
+    for task_id in range(first_id, first_id + TASKS):
+        offset = task_id - first_id
+        parent_id = None if offset % (SUBTASKS + 1) == 0 else task_id - offset % (SUBTASKS + 1)
+        rows.append({
+            "id": task_id, "project_id": project.id, "parent_id": parent_id, "title": f"Task {task_id}",
+            "status": TaskStatus.PENDING, "priority": TaskPriority.MEDIUM, "order_index": offset
+        })
+        if offset:
+            dependencies.append({"task_id": task_id, "depends_on_id": task_id - 1})
+        links.append({"project_id": project.id, "task_id": task_id, "order_index": offset})
+        logs.append({"task_id": task_id, "user_id": user_id, "action": "created"})
+    db.execute(insert(Task), rows)
+    db.execute(insert(TaskDependency), dependencies)
+    db.execute(insert(ProjectTask), links)
+    db.execute(insert(TaskLog), logs)
+    return project.id
+
+
+def cascade_delete(project_id: int, user_id: int) -> float:
+    """The previous hard delete: one transaction through the ORM cascades; returns ms"""
+    db = SessionLocal()
+    start = time.perf_counter()
+    db.delete(project_service.get_project(db, project_id, user_id))
+    db.commit()
+    elapsed = (time.perf_counter() - start) * 1000
+    db.close()
+    return elapsed
+
+
+def remaining_rows(project_id: int) -> int:
+    db = SessionLocal()
+    count = (
+        db.query(Project).filter(Project.id == project_id).count()
+        + db.query(Task).filter(Task.project_id == project_id).count()
+        + db.query(ProjectTask).filter(ProjectTask.project_id == project_id).count()
+    )
+    db.close()
+    return count
+
+
+def run_benchmark():
+    reset_database()
+    db = SessionLocal()
+    user, _ = seed_owner(db)
+    user_id = user.id
+    cascade_project = seed_project(db, user_id, "Cascade delete")
+    purge_project = seed_project(db, user_id, "Purge")
+    kept_project = seed_project(db, user_id, "Kept")
+    db.commit()
+    db.close()
+
+    with statements() as cascade_log:
+        cascade_ms = cascade_delete(cascade_project, user_id)
+    print(f"ORM cascade delete   {cascade_log.count:6d} statements  {cascade_ms:8.1f} ms in one transaction")
+
+    service = ProjectPurgeService(chunk_size=CHUNK_SIZE, retention_days=0)
+    run_chunk = service._purge_chunk
+    chunk_ms = []
+
+    def timed_chunk(db, purge_id, project_id):
+        start = time.perf_counter()
+        done = run_chunk(db, purge_id, project_id)
+        chunk_ms.append((time.perf_counter() - start) * 1000)
+        if len(chunk_ms) == INTERRUPT_AFTER_CHUNKS:
+            service._stopping.set()
+        return done
+
+    service._purge_chunk = timed_chunk
+    db = SessionLocal()
+    request_start = time.perf_counter()
+    purge_id = project_service.purge_project(db, purge_project, user_id).id
+    request_ms = (time.perf_counter() - request_start) * 1000
+    db.close()
+
+    with statements() as purge_log:
+        start = time.perf_counter()
+        service.run_pending()
+        db = SessionLocal()
+        purge = db.query(ProjectPurge).filter_by(id=purge_id).one()
+        print(f"purge interrupted    {purge.deleted_tasks} of {purge.total_tasks} tasks deleted, "
+              f"status {purge.status.value}")
+        db.close()
+        service._stopping.clear()
+        service.run_pending()
+        purge_ms = (time.perf_counter() - start) * 1000
+
+    db = SessionLocal()
+    purge = db.query(ProjectPurge).filter_by(id=purge_id).one()
+    db.close()
+    print(f"purge worker         {purge_log.count:6d} statements  {purge_ms:8.1f} ms in {len(chunk_ms)} transactions, "
+          f"longest {max(chunk_ms):.1f} ms (request {request_ms:.1f} ms, {purge.attempts} runs)")
+
+    assert purge.status == ProjectPurgeStatus.SUCCEEDED and purge.deleted_tasks == TASKS, \
+        f"Purge ended {purge.status.value} with {purge.deleted_tasks} tasks deleted"
+    assert not remaining_rows(purge_project) and not remaining_rows(cascade_project), \
+        "Rows of a deleted project were left behind"
+    assert remaining_rows(kept_project) == TASKS * 2 + 1, "The purge deleted rows of another project"
+
+    print(f"✅ Resumed purge removed the project; longest transaction {cascade_ms / max(chunk_ms):.0f}x "
+          f"shorter than the cascade delete")
+
+
+if __name__ == "__main__":
+    run("Project purge benchmark", run_benchmark)
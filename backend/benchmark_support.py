@@ -0,0 +1,103 @@
+"""
+Shared setup of the benchmark_*.py and check_*.py scripts
+
+Import it before any app module: it points the settings at an in-memory
+SQLite database. The scripts share its engine and session factory, seed
+through seed_owner(), count statements with statements() (a
+count_statements() block on the engine) and call the API through
+api_client(). Checks are assert statements (so do not run the scripts with
+python -O); run() prints the failed one and exits with status 1, so a wrong
+result fails the run.
+"""
+
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator, Tuple
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import deps
+from app.core.database import Base
+from app.core.statement_counter import StatementLog, count_statements
+from app.models import User, Project
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def reset_database():
+    """Drop and recreate every table"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_owner(db: Session, name: str = "bench") -> Tuple[User, Project]:
+    """Add a user and one project of theirs, flushed so both have IDs"""
+    user = User(username=name, email=f"{name}@example.com", password_hash="x", is_active=True)
+    db.add(user)
+    db.flush()
+    project = Project(user_id=user.id, name="Benchmark project")
+    db.add(project)
+    db.flush()
+    return user, project
+
+
+def detach(db: Session, user: User) -> User:
+    """Load a committed user and detach it, for use as the authenticated user"""
+    db.refresh(user)
+    db.expunge(user)
+    return user
+
+
+def statements() -> ContextManager[StatementLog]:
+    """Count the statements executed on the benchmark engine inside the block"""
+    return count_statements(engine)
+
+
+@contextmanager
+def api_client(user: User, sessions: sessionmaker = SessionLocal) -> Iterator[TestClient]:
+    """A TestClient whose requests use sessions from sessions, authenticated as user"""
+    from app.main import app
+
+    def get_test_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    overrides = {
+        deps.get_db: get_test_db,
+        deps.get_current_user: lambda: user,
+        deps.get_current_user_by_api_key: lambda: user,
+        deps.get_current_user_without_session: lambda: user,
+    }
+    app.dependency_overrides.update(overrides)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    try:
+        yield TestClient(app)
+    finally:
+        for dependency in overrides:
+            app.dependency_overrides.pop(dependency, None)
+
+
+def run(title: str, main: Callable[[], None]):
+    """Print the title, run main and exit with status 1 if one of its checks fails"""
+    print(f"=== {title} ===")
+    try:
+        main()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
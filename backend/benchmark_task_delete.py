@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: deleting a task with a large subtask tree
+
+Builds two identical 6-level trees of 2,000 tasks (six subtasks per task,
+every task depending on its previous sibling and linked to its project)
+and deletes each root once the way delete_task used to (load the task,
+let the ORM cascade walk and delete the subtree row by row) and once with
+the set-based delete_task. Reports statements and time per delete and
+checks both leave no subtree rows behind and a consistent stats rollup.
+"""
+
+import time
+
+from benchmark_support import SessionLocal, reset_database, run, seed_owner, statements
+
+from sqlalchemy import insert, or_
+
+from app.models import Project, ProjectTask, Task, TaskDependency, TaskLog, TaskStatus, TaskPriority
+from app.services.task import task_service
+from app.services.task_log import task_log_service
+from app.services.task_stats import task_stats_service
+
+NODES = 2000
+LEVELS = 6
+BRANCHING = 6
+
+
+def seed_tree(db, user_id: int, name: str) -> int:
+    """Create a project holding one tree; return the root task ID"""
+    project = Project(user_id=user_id, name=name)
+    db.add(project)
+    db.flush()
+
+    first_id = (db.query(Task.id).order_by(Task.id.desc()).limit(1).scalar() or 0) + 1
+    rows, dependencies, links = [], [], []
+    level, next_id = [None], first_id
+    for depth in range(LEVELS):
+        next_level = []
+        for parent_id in level:
+            for sibling in range(1 if depth == 0 else BRANCHING):
+                if next_id >= first_id + NODES:
+                    break
+                rows.append({
+                    "id": next_id, "project_id": project.id, "parent_id": parent_id,
+                    "title": f"Task {next_id} (level {depth})",
+                    "status": TaskStatus.DONE if next_id % 3 == 0 else TaskStatus.PENDING,
+                    "priority": TaskPriority.MEDIUM, "order_index": sibling
+                })
+                if sibling:
+                    dependencies.append({"task_id": next_id, "depends_on_id": next_id - 1})
+                links.append({"project_id": project.id, "task_id": next_id, "order_index": sibling})
+                next_level.append(next_id)
+                next_id += 1
+        level = next_level
+    db.execute(insert(Task), rows)
+    db.execute(insert(TaskDependency), dependencies)
+    db.execute(insert(ProjectTask), links)
+    task_stats_service.rebuild(db, [project.id])
+    return first_id
+
+
+def cascade_delete(db, task_id: int, user_id: int) -> bool:
+    """The previous delete_task: ORM cascade over the loaded subtree"""
+    db_task = task_service.get_task(db, task_id, user_id)
+    db.query(TaskDependency).filter(
+        or_(TaskDependency.task_id == task_id, TaskDependency.depends_on_id == task_id)
+    ).delete()
+    task_log_service.log_task_deletion(db, db_task, user_id)
+    db.delete(db_task)
+    task_stats_service.record_changes(
+        db, [(task_stats_service.task_state(task), None) for task in db.deleted if isinstance(task, Task)]
+    )
+    db.commit()
+    return True
+
+
+def time_delete(label: str, delete, user_id: int, root_id: int):
+    db = SessionLocal()
+    with statements() as log:
+        start = time.perf_counter()
+        delete(db, root_id, user_id)
+        elapsed = (time.perf_counter() - start) * 1000
+    db.close()
+    print(f"{label:<24} {log.count:6d} statements  {elapsed:8.1f} ms")
+    return elapsed, log.count
+
+
+def leftover_rows(root_id: int) -> int:
+    """Rows of the deleted tree's ID range still in tasks, task_dependencies or project_tasks"""
+    ids = range(root_id, root_id + NODES)
+    db = SessionLocal()
+    count = (
+        db.query(Task).filter(Task.id.in_(ids)).count()
+        + db.query(TaskDependency).filter(TaskDependency.task_id.in_(ids)).count()
+        + db.query(ProjectTask).filter(ProjectTask.task_id.in_(ids)).count()
+    )
+    db.close()
+    return count
+
+
+def run_benchmark():
+    reset_database()
+    db = SessionLocal()
+    user, _ = seed_owner(db)
+    user_id = user.id
+    cascade_root = seed_tree(db, user_id, "Cascade delete")
+    bulk_root = seed_tree(db, user_id, "Set-based delete")
+    db.commit()
+    db.close()
+
+    cascade_ms, cascade_statements = time_delete("ORM cascade", cascade_delete, user_id, cascade_root)
+    bulk_ms, bulk_statements = time_delete("set-based delete_task", task_service.delete_task, user_id, bulk_root)
+
+    db = SessionLocal()
+    mismatches = task_stats_service.check(db)
+    logs = db.query(TaskLog).filter(TaskLog.action == "deleted", TaskLog.task_id >= bulk_root).count()
+    db.close()
+    assert not leftover_rows(cascade_root) and not leftover_rows(bulk_root), \
+        "Rows of a deleted tree were left behind"
+    assert not mismatches, f"The stats rollup disagrees with the tasks table: {mismatches[:3]}"
+    assert logs == NODES, f"{logs} deletion logs written for {NODES} tasks"
+
+    print(f"✅ {NODES}-task subtree deleted and logged in {bulk_statements} statements instead of "
+          f"{cascade_statements}, {cascade_ms / bulk_ms:.1f}x faster")
+
+
+if __name__ == "__main__":
+    run("Task subtree deletion benchmark", run_benchmark)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task list queries with many subtasks and dependencies
+
+Compares the joinedload-based get_tasks with the list-mode get_task_list on
+tasks that each have 50 subtasks and 20 dependencies. Reports statements and
+wall time per page, and checks both paths return the same counts.
+"""
+
+import time
+
+from benchmark_support import SessionLocal, reset_database, run, seed_owner, statements
+
+from app.models import Task, TaskDependency
+from app.services.task import task_service
+
+PARENT_TASKS = 60
+SUBTASKS_PER_TASK = 50
+DEPENDENCIES_PER_TASK = 20
+PAGE_SIZE = 50
+ROUNDS = 5
+
+
+def seed():
+    """Create PARENT_TASKS top-level tasks, each with subtasks and dependencies"""
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db)
+
+    # Dependency targets live after the parents in list order
+    targets = [Task(project_id=project.id, title=f"Target {i}", order_index=2) for i in range(DEPENDENCIES_PER_TASK)]
+    parents = [Task(project_id=project.id, title=f"Task {i}", order_index=0) for i in range(PARENT_TASKS)]
+    db.add_all(targets + parents)
+    db.flush()
+
+    for parent in parents:
+        db.add_all([
+            Task(project_id=project.id, parent_id=parent.id, title=f"Subtask {j}", order_index=1)
+            for j in range(SUBTASKS_PER_TASK)
+        ])
+        db.add_all([
+            TaskDependency(task_id=parent.id, depends_on_id=target.id)
+            for target in targets
+        ])
+
+    db.commit()
+    user_id, project_id = user.id, project.id
+    db.close()
+    return user_id, project_id
+
+
+def measure(label, fn):
+    """Run fn ROUNDS times and report statements and average time per page"""
+    with statements() as log:
+        start = time.perf_counter()
+        result = None
+        for _ in range(ROUNDS):
+            db = SessionLocal()
+            result = fn(db)
+            db.close()
+        elapsed = (time.perf_counter() - start) / ROUNDS
+
+    print(f"{label:<32} {log.count // ROUNDS:>3} statements, {elapsed * 1000:8.1f} ms/page")
+    return result, elapsed
+
+
+def run_benchmark():
+    user_id, project_id = seed()
+
+    def legacy(db):
+        tasks = task_service.get_tasks(db, user_id, project_id=project_id, limit=PAGE_SIZE)
+        return [(t.id, len(t.subtasks), len(t.dependencies)) for t in tasks]
+
+    def list_mode(db):
+        items = task_service.get_task_list(db, user_id, project_id=project_id, limit=PAGE_SIZE)
+        return [(i.id, i.subtask_count, i.dependency_count) for i in items]
+
+    print(f"{PARENT_TASKS} tasks x {SUBTASKS_PER_TASK} subtasks x {DEPENDENCIES_PER_TASK} dependencies, "
+          f"page size {PAGE_SIZE}")
+    legacy_result, legacy_time = measure("joinedload get_tasks", legacy)
+    list_result, list_time = measure("list-mode get_task_list", list_mode)
+
+    print(f"rows produced per parent task: {SUBTASKS_PER_TASK * DEPENDENCIES_PER_TASK} with joinedload "
+          f"(subtasks x dependencies), 1 in list mode")
+
+    assert legacy_result == list_result, "List-mode counts differ from the joinedload result"
+    print(f"✅ Same counts, list mode is {legacy_time / list_time:.1f}x faster")
+
+
+if __name__ == "__main__":
+    run("Task list benchmark", run_benchmark)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task audit log writes on PUT /api/v1/tasks/{id}
+
+Updates 8 fields of a task and reports the statements and commits issued
+by the request in each TASK_LOG_MODE. The change and its 8 log rows should
+be written in one commit in transaction mode, and the log rows should leave
+the request entirely in deferred mode.
+"""
+
+import os
+import tempfile
+import time
+
+from benchmark_support import api_client, detach, run, seed_owner
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.services.task_log as task_log_module
+from app.core.database import Base
+from app.core.statement_counter import count_statements
+from app.models import Task, TaskLog
+from app.services.task_log import DeferredTaskLogWriter, task_log_service
+
+ROUNDS = 50
+UPDATED_FIELDS = 8
+
+# A file database, so the deferred writer thread and the request threads
+# each use their own connection
+db_file = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+engine = create_engine(
+    f"sqlite:///{db_file.name}",
+    connect_args={"check_same_thread": False},
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# The deferred writer opens its own sessions
+task_log_module.SessionLocal = TestingSessionLocal
+
+commit_count = 0
+
+
+@event.listens_for(engine, "commit")
+def count_commit(conn):
+    global commit_count
+    commit_count += 1
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = TestingSessionLocal()
+    user, project = seed_owner(db)
+    task = Task(project_id=project.id, title="Task")
+    db.add(task)
+    db.commit()
+
+    task_id = task.id
+    user = detach(db, user)
+    db.close()
+    return user, task_id
+
+
+def update_payload(i: int):
+    return {
+        "title": f"Task {i}",
+        "description": f"Description {i}",
+        "details": f"Details {i}",
+        "test_strategy": f"Strategy {i}",
+        "order_index": i,
+        "estimated_hours": i,
+        "actual_hours": i,
+        "due_date": f"2030-01-{i % 28 + 1:02d}T00:00:00",
+    }
+
+
+def measure(mode: str):
+    global commit_count
+    user, task_id = seed()
+    task_log_service.mode = mode
+
+    commit_count = 0
+    with api_client(user, TestingSessionLocal) as client, count_statements(engine) as log:
+        start = time.perf_counter()
+        for i in range(1, ROUNDS + 1):
+            response = client.put(f"/api/v1/tasks/{task_id}", json=update_payload(i))
+            assert response.status_code == 200, response.text
+        elapsed = (time.perf_counter() - start) / ROUNDS
+    statements, commits = log.count / ROUNDS, commit_count / ROUNDS
+
+    task_log_service.writer.stop()
+    db = TestingSessionLocal()
+    logged = db.query(TaskLog).count()
+    db.close()
+
+    print(f"{mode:<12} {statements:5.1f} statements, {commits:4.1f} commits, "
+          f"{elapsed * 1000:6.2f} ms/request, {logged} log rows")
+    return commits, logged
+
+
+def run_benchmark():
+    original_mode, original_writer = task_log_service.mode, task_log_service.writer
+    task_log_service.writer = DeferredTaskLogWriter(flush_interval=0.05)
+
+    print(f"{ROUNDS} updates of {UPDATED_FIELDS} fields each")
+    try:
+        transaction_commits, transaction_logged = measure("transaction")
+        _, deferred_logged = measure("deferred")
+    finally:
+        task_log_service.mode, task_log_service.writer = original_mode, original_writer
+        engine.dispose()
+        os.unlink(db_file.name)
+
+    expected = ROUNDS * UPDATED_FIELDS
+    assert transaction_commits == 1, f"{transaction_commits} commits per update in transaction mode"
+    assert transaction_logged == expected, f"{transaction_logged} of {expected} log rows in transaction mode"
+    assert deferred_logged == expected, f"{deferred_logged} of {expected} log rows in deferred mode"
+    print("✅ One commit per update; deferred mode writes the same log rows in bulk")
+
+
+if __name__ == "__main__":
+    run("Task log benchmark", run_benchmark)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task search with the ILIKE filter and the full-text index
+
+Searches 50,000 tasks once with TASK_SEARCH_MODE=like (a substring scan of
+every title, description and details) and once with the full-text mode,
+which on SQLite uses the in-memory inverted index (MySQL would use the
+FULLTEXT index instead). Every word of the generated text starts with "w",
+so a substring match of "w12" is the same as a prefix match, and both modes
+must find the same number of tasks.
+"""
+
+import random
+import time
+
+from benchmark_support import SessionLocal, engine, reset_database, run, seed_owner
+
+from sqlalchemy import Index, insert
+
+from app.core.config import settings
+from app.models import Task
+from app.schemas.task import TaskSearchRequest
+from app.services.task import task_service
+from app.services.task_search import task_search_index
+
+TASKS = 50000
+VOCABULARY = 20000
+TITLE_WORDS = 6
+DESCRIPTION_WORDS = 40
+QUERIES = ["w4711", "w1888", "w903"]
+ROUNDS = 5
+
+
+def seed():
+    """Create TASKS tasks with random words from a VOCABULARY-word dictionary"""
+    reset_database()
+    # Created by the migrations; list-mode subtask counts look tasks up by parent
+    Index("ix_tasks_parent_id", Task.parent_id).create(bind=engine)
+    db = SessionLocal()
+    user, project = seed_owner(db)
+
+    rng = random.Random(42)
+
+    def text(count):
+        return " ".join(f"w{rng.randrange(VOCABULARY)}" for _ in range(count))
+
+    db.execute(insert(Task), [
+        {"project_id": project.id, "title": text(TITLE_WORDS), "description": text(DESCRIPTION_WORDS)}
+        for _ in range(TASKS)
+    ])
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id
+
+
+def measure(mode, user_id, query):
+    """Average time of a first-page search over ROUNDS runs, and the total count"""
+    settings.TASK_SEARCH_MODE = mode
+    sort_by = "relevance" if mode == "fulltext" else "created_at"
+    request = TaskSearchRequest(query=query, sort_by=sort_by, limit=20)
+
+    start = time.perf_counter()
+    total = None
+    for _ in range(ROUNDS):
+        db = SessionLocal()
+        _, total = task_service.search_task_list(db, user_id, request)
+        db.close()
+    return (time.perf_counter() - start) / ROUNDS, total
+
+
+def run_benchmark():
+    user_id = seed()
+    mode = settings.TASK_SEARCH_MODE
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    task_search_index.search(db, user_id, "warmup")
+    db.close()
+    print(f"{TASKS} tasks, in-memory index built in {time.perf_counter() - start:.2f} s")
+
+    speedups = []
+    try:
+        for query in QUERIES:
+            like_time, like_total = measure("like", user_id, query)
+            fulltext_time, fulltext_total = measure("fulltext", user_id, query)
+            speedups.append(like_time / fulltext_time)
+            print(f"{query!r:<12} {like_total:>6} matches  ILIKE {like_time * 1000:8.1f} ms  "
+                  f"full-text {fulltext_time * 1000:7.1f} ms (ranked)")
+            assert like_total == fulltext_total, \
+                f"{query!r}: full-text search found {fulltext_total} tasks, ILIKE {like_total}"
+    finally:
+        settings.TASK_SEARCH_MODE = mode
+
+    print(f"✅ Same matches, full-text search is {min(speedups):.1f}x to {max(speedups):.1f}x faster")
+
+
+if __name__ == "__main__":
+    run("Task search benchmark", run_benchmark)
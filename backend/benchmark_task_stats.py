@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task statistics from the project_task_stats rollup
+
+Seeds 50,000 tasks (a third of them completed) in 20 projects, then times
+get_task_stats and get_project_stats against the previous implementation,
+which grouped the tasks table by status and loaded every completed Task to
+average its completion time. Afterwards it runs a mix of task creates,
+updates, status changes and deletes through the task service and checks the
+rollup still matches the tasks table.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmark_support import SessionLocal, reset_database, run, seed_owner
+
+from sqlalchemy import func, insert
+
+from app.models import Project, Task, TaskStatus, TaskPriority
+from app.schemas.task import TaskCreate, TaskUpdate, TaskBatchStatusUpdate, TaskStatus as SchemaTaskStatus
+from app.services.project import project_service
+from app.services.task import task_service
+from app.services.task_stats import task_stats_service
+
+PROJECTS = 20
+TASKS = 50000
+CHANGES = 200
+READS = 20
+
+
+def seed():
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db)
+    projects = [project] + [Project(user_id=user.id, name=f"Project {i}") for i in range(1, PROJECTS)]
+    db.add_all(projects)
+    db.flush()
+
+    rng = random.Random(42)
+    statuses = list(TaskStatus)
+    start = datetime(2026, 1, 1)
+    rows = []
+    for i in range(TASKS):
+        status = TaskStatus.DONE if i % 3 == 0 else rng.choice(statuses)
+        created_at = start + timedelta(minutes=i)
+        rows.append({
+            "project_id": projects[i % PROJECTS].id,
+            "title": f"Task {i}",
+            "status": status,
+            "priority": TaskPriority.MEDIUM,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "completed_at": created_at + timedelta(hours=rng.randint(1, 200)) if status == TaskStatus.DONE else None,
+        })
+    db.execute(insert(Task), rows)
+    task_stats_service.rebuild(db)
+    db.commit()
+    user_id, project_ids = user.id, [project.id for project in projects]
+    db.close()
+    return user_id, project_ids
+
+
+def scan_task_stats(db, user_id: int):
+    """Previous get_task_stats: status counts plus every completed task loaded as an ORM object"""
+    counts = dict(db.query(Task.status, func.count(Task.id)).join(Project).filter(
+        Project.user_id == user_id
+    ).group_by(Task.status).all())
+    completed = db.query(Task).join(Project).filter(
+        Project.user_id == user_id, Task.status == TaskStatus.DONE, Task.completed_at.is_not(None)
+    ).all()
+    hours = sum((task.completed_at - task.created_at).total_seconds() / 3600 for task in completed)
+    return sum(counts.values()), hours / len(completed)
+
+
+def time_reads(label: str, function, *args):
+    db = SessionLocal()
+    start = time.perf_counter()
+    for _ in range(READS):
+        result = function(db, *args)
+    elapsed = (time.perf_counter() - start) / READS * 1000
+    db.close()
+    print(f"{label:<32} {elapsed:8.2f} ms")
+    return elapsed, result
+
+
+def run_changes(user_id: int, project_ids):
+    """Create, update, complete and delete tasks through the task service"""
+    rng = random.Random(7)
+    db = SessionLocal()
+    created = task_service.bulk_create_tasks(db, user_id, [
+        TaskCreate(title=f"New task {i}", project_id=rng.choice(project_ids)) for i in range(CHANGES)
+    ])
+    for task_id in created[:CHANGES // 2]:
+        task_service.update_task_status(db, task_id, user_id, SchemaTaskStatus.DONE)
+    for task_id in created[CHANGES // 2:CHANGES * 3 // 4]:
+        task_service.update_task(db, task_id, user_id, TaskUpdate(status=SchemaTaskStatus.REVIEW))
+    task_service.batch_update_status(db, user_id, TaskBatchStatusUpdate(
+        task_ids=rng.sample(range(1, TASKS + 1), CHANGES), status=SchemaTaskStatus.CANCELLED
+    ))
+    for task_id in rng.sample(range(1, TASKS + 1), CHANGES // 4):
+        task_service.delete_task(db, task_id, user_id)
+    db.close()
+
+
+def run_benchmark():
+    user_id, project_ids = seed()
+    scan_ms, (scan_total, scan_hours) = time_reads("scan (previous get_task_stats)", scan_task_stats, user_id)
+    rollup_ms, stats = time_reads("get_task_stats (rollup)", task_service.get_task_stats, user_id)
+    project_ms, _ = time_reads("get_project_stats (rollup)", project_service.get_project_stats,
+                               project_ids[0], user_id)
+
+    assert stats.total_tasks == scan_total and abs(stats.average_completion_time - scan_hours) <= 1e-6, \
+        f"Rollup stats differ: {stats.total_tasks} tasks, {stats.average_completion_time:.4f} h; " \
+        f"scan {scan_total} tasks, {scan_hours:.4f} h"
+
+    run_changes(user_id, project_ids)
+    db = SessionLocal()
+    mismatches = task_stats_service.check(db)
+    db.close()
+    assert not mismatches, f"{len(mismatches)} rollup values differ from the tasks table after the changes"
+
+    print(f"✅ Rollup matches the tasks table; get_task_stats is {scan_ms / rollup_ms:.0f}x faster "
+          f"({TASKS} tasks, project stats {project_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    run("Task stats rollup benchmark", run_benchmark)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading a task with its subtask tree for TaskResponse
+
+Builds a 5-level tree of 1,000 tasks (each level filled breadth-first, six
+subtasks per task) where every task depends on its previous sibling, then
+serializes the root with TaskResponse.from_orm after loading it with
+get_task (joined first level, lazy loads below) and with get_task_tree
+(one recursive CTE query). Reports statements and time per load and checks
+both responses are identical.
+"""
+
+import time
+
+from benchmark_support import SessionLocal, reset_database, run, seed_owner, statements
+
+from sqlalchemy import insert
+
+from app.models import Task, TaskDependency, TaskStatus, TaskPriority
+from app.schemas.task import TaskResponse
+from app.services.task import task_service
+
+NODES = 1000
+LEVELS = 5
+BRANCHING = 6
+RUNS = 5
+
+
+def seed():
+    """Create the tree; return the user and root task IDs"""
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db)
+
+    rows, dependencies = [], []
+    level, next_id = [None], 1
+    for depth in range(LEVELS):
+        next_level = []
+        for parent_id in level:
+            siblings = range(1 if depth == 0 else BRANCHING)
+            for sibling in siblings:
+                if next_id > NODES:
+                    break
+                rows.append({
+                    "id": next_id, "project_id": project.id, "parent_id": parent_id,
+                    "title": f"Task {next_id} (level {depth})", "status": TaskStatus.PENDING,
+                    "priority": TaskPriority.MEDIUM, "order_index": sibling
+                })
+                if sibling:
+                    dependencies.append({"task_id": next_id, "depends_on_id": next_id - 1})
+                next_level.append(next_id)
+                next_id += 1
+        level = next_level
+    db.execute(insert(Task), rows)
+    db.execute(insert(TaskDependency), dependencies)
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id, 1
+
+
+def time_load(label: str, load, user_id: int, root_id: int):
+    best, response = None, None
+    for _ in range(RUNS):
+        db = SessionLocal()
+        with statements() as log:
+            start = time.perf_counter()
+            response = TaskResponse.from_orm(load(db, root_id, user_id)).model_dump()
+            elapsed = (time.perf_counter() - start) * 1000
+        db.close()
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {log.count:5d} statements  {best:8.1f} ms")
+    return best, log.count, response
+
+
+def count_nodes(response) -> int:
+    return 1 + sum(count_nodes(subtask) for subtask in response["subtasks"])
+
+
+def run_benchmark():
+    user_id, root_id = seed()
+    lazy_ms, lazy_statements, lazy = time_load("get_task + lazy loads", task_service.get_task, user_id, root_id)
+    tree_ms, tree_statements, tree = time_load("get_task_tree", task_service.get_task_tree, user_id, root_id)
+
+    assert lazy == tree and count_nodes(tree) == NODES, \
+        f"The tree responses differ ({count_nodes(lazy)} and {count_nodes(tree)} nodes)"
+    assert tree_statements == 1, f"get_task_tree issued {tree_statements} statements"
+
+    print(f"✅ Same {NODES}-task response in 1 statement instead of {lazy_statements}, "
+          f"{lazy_ms / tree_ms:.1f}x faster")
+
+
+if __name__ == "__main__":
+    run("Task tree loading benchmark", run_benchmark)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Keyset pagination across two pages
+
+Seeds three projects, three tasks and three task logs, all created in the
+same second by the database's server_default, then reads each cursor
+listing with limit=2 and checks that the second page holds exactly the
+remaining row. Authentication is bypassed.
+"""
+
+from benchmark_support import SessionLocal, api_client, detach, reset_database, run, seed_owner
+
+from sqlalchemy import insert
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.models import Project, Task, TaskLog, TaskStatus, TaskPriority
+
+ROWS = 3
+PAGE_SIZE = 2
+
+
+def seed():
+    """Create the rows without created_at so the database fills it in; return the user, project and task"""
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db, "pages")
+    db.execute(insert(Project), [{"user_id": user.id, "name": f"Project {i}"} for i in range(1, ROWS)])
+    db.execute(insert(Task), [{
+        "project_id": project.id, "title": f"Task {i}", "status": TaskStatus.PENDING,
+        "priority": TaskPriority.MEDIUM, "order_index": 0
+    } for i in range(ROWS)])
+    task_id = db.query(Task.id).order_by(Task.id).first()[0]
+    db.execute(insert(TaskLog), [
+        {"task_id": task_id, "user_id": user.id, "action": "updated", "description": f"Change {i}"}
+        for i in range(ROWS)
+    ])
+    db.commit()
+    project_id = project.id
+    user = detach(db, user)
+    db.close()
+    return user, project_id, task_id
+
+
+def read_pages(name: str, page):
+    """IDs of the first page and of the page its cursor points to"""
+    response = page(None)
+    assert response.status_code == 200, f"{name}: {response.text}"
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    assert cursor, f"{name}: the first page returned no cursor"
+    second = page(cursor)
+    assert second.status_code == 200, f"{name}: {second.text}"
+    return [row["id"] for row in response.json()], [row["id"] for row in second.json()]
+
+
+def run_checks():
+    user, project_id, task_id = seed()
+    with api_client(user) as client:
+        listings = {
+            "GET /projects/": lambda cursor: client.get(
+                "/api/v1/projects/", params={"limit": PAGE_SIZE, "cursor": cursor}
+            ),
+            "GET /projects/{id}/tasks": lambda cursor: client.get(
+                f"/api/v1/projects/{project_id}/tasks", params={"limit": PAGE_SIZE, "cursor": cursor}
+            ),
+            "GET /tasks/": lambda cursor: client.get(
+                "/api/v1/tasks/", params={"project_id": project_id, "limit": PAGE_SIZE, "cursor": cursor}
+            ),
+            "GET /tasks/search": lambda cursor: client.get(
+                "/api/v1/tasks/search", params={"limit": PAGE_SIZE, "cursor": cursor, "sort_by": "created_at"}
+            ),
+            "GET /tasks/{id}/logs": lambda cursor: client.get(
+                f"/api/v1/tasks/{task_id}/logs", params={"limit": PAGE_SIZE, "cursor": cursor}
+            ),
+        }
+
+        for name, page in listings.items():
+            first, second = read_pages(name, page)
+            assert len(first) == PAGE_SIZE and len(second) == ROWS - PAGE_SIZE and not set(first) & set(second), \
+                f"{name}: page 1 {first}, page 2 {second}"
+            print(f"✅ {name}: page 1 {first}, page 2 {second}")
+
+
+if __name__ == "__main__":
+    run("Keyset pagination", run_checks)
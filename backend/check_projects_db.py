@@ -9,13 +9,13 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from app.core.database import get_db
+from app.core.database import SessionLocal
 from app.models.project import Project
 from app.models.user import User
 
 def check_projects():
     """Check projects in database"""
-    db = next(get_db())
+    db = SessionLocal()
     
     # Get all users
     users = db.query(User).all()
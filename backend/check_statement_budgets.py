@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+SQL statement budgets of the main API endpoints
+
+Seeds an in-memory database with more projects, tasks, subtasks, logs and
+progress versions than the largest page size, then calls each endpoint
+below through the API with page sizes 1, 10 and 50 and fails if any call
+issues more statements than the endpoint's budget. A statement per row (an
+N+1 loop such as per-project stats or lazy subtask loads) exceeds the
+budgets at page size 10 already. Authentication is bypassed, so the
+budgets cover the endpoint's own work.
+"""
+
+from benchmark_support import SessionLocal, api_client, detach, engine, reset_database, run, seed_owner
+
+from sqlalchemy import insert
+
+from app.core.statement_counter import check_statement_budget
+from app.models import Project, Task, TaskDependency, TaskLog, TaskStatus, TaskPriority
+from app.schemas.project_progress import ProjectProgressCreate, ProjectProgressUpdate
+from app.services.project_progress import project_progress_service
+from app.services.task_stats import task_stats_service
+
+PAGE_SIZES = (1, 10, 50)
+ROWS = 60  # More than the largest page size
+
+
+def seed():
+    """Create the data; return the user, the main project, the task with logs and the tree roots by size"""
+    reset_database()
+    db = SessionLocal()
+    user, project = seed_owner(db, "budget")
+    db.add_all([Project(user_id=user.id, name=f"Project {i}") for i in range(1, ROWS)])
+    db.flush()
+    project_id = project.id
+
+    # ROWS top-level tasks, each depending on the previous one
+    rows = [{
+        "id": task_id, "project_id": project_id, "title": f"Task {task_id}", "status": TaskStatus.PENDING,
+        "priority": TaskPriority.MEDIUM, "order_index": task_id
+    } for task_id in range(1, ROWS + 1)]
+    dependencies = [{"task_id": task_id, "depends_on_id": task_id - 1} for task_id in range(2, ROWS + 1)]
+
+    # One root per page size with that many subtasks, each with a subtask of its own
+    roots, next_id = {}, ROWS + 1
+    for size in PAGE_SIZES:
+        roots[size] = root_id = next_id
+        rows.append({"id": root_id, "project_id": project_id, "title": f"Root {size}",
+                     "status": TaskStatus.PENDING, "priority": TaskPriority.MEDIUM})
+        next_id += 1
+        for _ in range(size):
+            rows.append({"id": next_id, "project_id": project_id, "parent_id": root_id, "title": f"Subtask {next_id}",
+                         "status": TaskStatus.PENDING, "priority": TaskPriority.MEDIUM})
+            rows.append({"id": next_id + 1, "project_id": project_id, "parent_id": next_id,
+                         "title": f"Subtask {next_id + 1}", "status": TaskStatus.PENDING,
+                         "priority": TaskPriority.MEDIUM})
+            next_id += 2
+    db.execute(insert(Task), rows)
+    db.execute(insert(TaskDependency), dependencies)
+    db.execute(insert(TaskLog), [
+        {"task_id": 1, "user_id": user.id, "action": "updated", "description": f"Change {i}"} for i in range(ROWS)
+    ])
+    task_stats_service.rebuild(db)
+    db.commit()
+    user = detach(db, user)
+
+    project_progress_service.create_progress(db, project_id, user.id, ProjectProgressCreate(content="v1"))
+    for version in range(2, ROWS + 1):
+        project_progress_service.update_progress(
+            db, project_id, user.id, ProjectProgressUpdate(content=f"v{version}")
+        )
+    db.close()
+    return user, project_id, 1, roots
+
+
+def run_checks():
+    user, project_id, logged_task_id, roots = seed()
+    with api_client(user) as client:
+        check_budgets(client, project_id, logged_task_id, roots)
+
+
+def check_budgets(client, project_id: int, logged_task_id: int, roots):
+    """Check every budget, then fail with the ones exceeded"""
+
+    def get(url: str):
+        response = client.get(url)
+        assert response.status_code == 200, f"GET {url}: {response.status_code} {response.text}"
+
+    def batch_status(size: int):
+        response = client.post("/api/v1/tasks/batch/status", json={
+            "task_ids": list(range(1, size + 1)), "status": "in_progress"
+        })
+        assert response.status_code == 200, f"Batch status: {response.status_code} {response.text}"
+
+    # The search index is built once per project and cached; build it before counting
+    get("/api/v1/tasks/search?query=Task&limit=1")
+
+    # (label, budget, request(page_size))
+    budgets = [
+        ("GET /projects/", 3, lambda size: get(f"/api/v1/projects/?limit={size}")),
+        ("GET /projects/{id}/tasks", 3, lambda size: get(f"/api/v1/projects/{project_id}/tasks?limit={size}")),
+        ("GET /tasks/", 2, lambda size: get(f"/api/v1/tasks/?limit={size}")),
+        ("GET /tasks/search", 4, lambda size: get(f"/api/v1/tasks/search?query=Task&limit={size}")),
+        ("GET /tasks/{id} (subtask tree)", 2, lambda size: get(f"/api/v1/tasks/{roots[size]}")),
+        ("GET /tasks/{id}/logs", 3, lambda size: get(f"/api/v1/tasks/{logged_task_id}/logs?limit={size}")),
+        ("GET /projects/{id}/progress/history", 3,
+         lambda size: get(f"/api/v1/projects/{project_id}/progress/history?limit={size}")),
+        ("POST /tasks/batch/status", 6, batch_status),
+    ]
+
+    failed = []
+    for label, budget, request in budgets:
+        try:
+            counts = check_statement_budget(engine, budget, request, PAGE_SIZES, label)
+        except AssertionError as e:  # Including StatementBudgetExceeded
+            print(f"❌ {e}")
+            failed.append(label)
+            continue
+        summary = ", ".join(f"{counts[size]} at {size}" for size in PAGE_SIZES)
+        print(f"✅ {label:<36} budget {budget:2d}: {summary}")
+    assert not failed, f"Over budget or failing: {', '.join(failed)}"
+
+
+if __name__ == "__main__":
+    run("SQL statement budgets", run_checks)
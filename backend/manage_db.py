@@ -7,7 +7,10 @@ import argparse
 import sys
 import logging
 from app.core.init_db import init_db, create_database, create_superuser
-from app.core.database import test_connection
+from app.core.database import SessionLocal, test_connection
+from app.services.progress_history_store import progress_history_store
+from app.services.project_purge import project_purge_service
+from app.services.task_stats import task_stats_service
 from create_database import create_database as create_db
 
 logging.basicConfig(level=logging.INFO)
@@ -18,7 +21,8 @@ def main():
     parser = argparse.ArgumentParser(description="TaskMaster AI Database Management")
     parser.add_argument(
         "command",
-        choices=["init", "create-db", "create-tables", "create-superuser", "test-connection", "setup"],
+        choices=["init", "create-db", "create-tables", "create-superuser", "test-connection", "setup",
+                 "rebuild-task-stats", "check-task-stats", "purge-projects", "compress-progress-history"],
         help="Database management command"
     )
     
@@ -89,6 +93,60 @@ def main():
         else:
             logger.error("❌ Database initialization failed")
             sys.exit(1)
+    
+    elif args.command == "rebuild-task-stats":
+        db = SessionLocal()
+        try:
+            count = task_stats_service.rebuild(db)
+            db.commit()
+            logger.info(f"✅ Rebuilt task stats of {count} projects")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Failed to rebuild task stats: {e}")
+            sys.exit(1)
+        finally:
+            db.close()
+    
+    elif args.command == "check-task-stats":
+        db = SessionLocal()
+        try:
+            mismatches = task_stats_service.check(db)
+        finally:
+            db.close()
+        for mismatch in mismatches:
+            logger.warning(
+                f"Project {mismatch['project_id']} {mismatch['field']}: "
+                f"rollup {mismatch['actual']}, tasks table {mismatch['expected']}"
+            )
+        if mismatches:
+            logger.error(f"❌ {len(mismatches)} task stats differ from the tasks table; run rebuild-task-stats")
+            sys.exit(1)
+        logger.info("✅ Task stats match the tasks table")
+
+    
+    elif args.command == "purge-projects":
+        # Retry failed purges, queue expired soft-deleted projects and run everything queued
+        db = SessionLocal()
+        try:
+            retried = project_purge_service.requeue_failed(db)
+            expired = project_purge_service.queue_expired(db)
+        finally:
+            db.close()
+        finished = project_purge_service.run_pending()
+        logger.info(f"✅ Finished {finished} project purges ({retried} retried, {expired} past retention)")
+    
+    elif args.command == "compress-progress-history":
+        # Store plain text progress history as compressed snapshots and line deltas
+        db = SessionLocal()
+        try:
+            count = progress_history_store.compress_history(db)
+            logger.info(f"✅ Compressed {count} progress history versions")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Failed to compress progress history: {e}")
+            sys.exit(1)
+        finally:
+            db.close()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,13 @@
 """
 MCP Server Authentication Module
 """
+import hashlib
 import os
-import httpx
-from typing import Optional, Dict, Any, Callable
+import time
+from typing import Optional, Dict, Any, Callable, Tuple
 from functools import wraps
 from .config import config
+from .http_client import api_client
 
 
 class MCPAuthenticator:
@@ -14,11 +16,21 @@ class MCPAuthenticator:
     def __init__(self):
         self.api_base_url = config.api_base_url
         self.timeout = config.api_timeout
+        self.cache_ttl = config.auth_cache_ttl
+        # SHA-256 of API key -> (user info, monotonic expiry)
+        self._cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+    
+    @staticmethod
+    def _cache_key(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
     
     async def validate_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
         """
         Validate API key with the main system
         
+        Successful validations are cached for auth_cache_ttl seconds, so
+        steady-state tool calls make no extra validation request.
+        
         Args:
             api_key: The API key to validate
             
@@ -27,23 +39,32 @@ class MCPAuthenticator:
         """
         if not api_key:
             return None
+        
+        cache_key = self._cache_key(api_key)
+        cached = self._cache.get(cache_key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
             
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/api/v1/auth/validate-key",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    return None
+            response = await api_client.request("GET", "/api/v1/auth/validate-key", api_key)
+            
+            if response.status_code == 200:
+                user_info = response.json()
+                if self.cache_ttl > 0:
+                    self._cache[cache_key] = (user_info, time.monotonic() + self.cache_ttl)
+                return user_info
+            else:
+                self._cache.pop(cache_key, None)
+                return None
                     
         except Exception as e:
             print(f"Authentication error: {e}")
             return None
     
+    def invalidate(self, api_key: str):
+        """Forget a cached validation (e.g. after the API rejected the key)"""
+        self._cache.pop(self._cache_key(api_key), None)
+    
     async def get_user_projects(self, api_key: str) -> list:
         """
         Get projects accessible to the user
@@ -55,16 +76,12 @@ class MCPAuthenticator:
             List of projects the user can access
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/api/v1/projects/",
-                    headers={"Authorization": f"Bearer {api_key}"}
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    return []
+            response = await api_client.request("GET", "/api/v1/projects/", api_key)
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                return []
                     
         except Exception as e:
             print(f"Error fetching projects: {e}")
@@ -122,4 +139,8 @@ def require_auth(func: Callable) -> Callable:
 
 
 # Global authenticator instance
-authenticator = MCPAuthenticator()
\ No newline at end of file
+authenticator = MCPAuthenticator()
+
+# A key revoked after it was cached is rejected by the API itself; drop it
+# so the next call re-validates
+api_client.on_unauthorized = authenticator.invalidate
\ No newline at end of file
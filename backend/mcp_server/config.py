@@ -19,11 +19,15 @@ class MCPServerConfig(BaseSettings):
     # API settings
     api_base_url: str = "http://localhost:8000"
     api_timeout: int = 30
+    api_max_connections: int = 20
+    api_max_keepalive_connections: int = 10
+    api_http2: bool = False  # Needs the h2 package; only negotiated over https
     
     # Authentication
     api_key_header: str = "X-API-Key"
     default_api_key: Optional[str] = None  # Will be populated from MCP_DEFAULT_API_KEY
     config_file_path: str = "~/.task-manager-mcp.json"  # Default config file path
+    auth_cache_ttl: int = 300  # Seconds a validated API key is trusted without re-checking (0 disables)
     
     # Logging
     log_level: str = "INFO"
@@ -0,0 +1,81 @@
+"""
+Shared HTTP client for MCP server requests to the main API
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+import httpx
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 support in httpx needs the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class APIClient:
+    """
+    One pooled, keep-alive httpx.AsyncClient shared by all MCP tools
+
+    The client is created on first use and closed by the server lifespan.
+    It is recreated if it was closed or is used from a different event
+    loop, since pooled connections cannot move between loops.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Called with the API key whenever the API answers 401
+        self.on_unauthorized: Optional[Callable[[str], None]] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = config.api_http2
+        if http2 and not _http2_available():
+            logger.warning("MCP_API_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            base_url=config.api_base_url,
+            timeout=config.api_timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.api_max_connections,
+                max_keepalive_connections=config.api_max_keepalive_connections,
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._create_client()
+            self._loop = loop
+        return self._client
+
+    async def request(self, method: str, path: str, api_key: str, **kwargs) -> httpx.Response:
+        """Send an authenticated request to the main API"""
+        headers = kwargs.pop("headers", {})
+        headers["Authorization"] = f"Bearer {api_key}"
+        response = await self.client.request(method, path, headers=headers, **kwargs)
+        if response.status_code == 401 and self.on_unauthorized:
+            self.on_unauthorized(api_key)
+        return response
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+# Global API client instance
+api_client = APIClient()
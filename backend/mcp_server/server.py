@@ -7,10 +7,12 @@ import logging
 import os
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+from contextlib import asynccontextmanager
 
 from fastmcp import FastMCP
 from .config import config
 from .auth import authenticator, require_auth
+from .http_client import api_client
 
 
 # Configure logging
@@ -21,8 +23,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(server):
+    """Own the shared API client for the lifetime of the server"""
+    try:
+        yield
+    finally:
+        await api_client.aclose()
+
+
 # Create FastMCP server instance
-mcp = FastMCP()
+mcp = FastMCP(lifespan=lifespan)
 
 
 @mcp.tool()
@@ -125,29 +136,23 @@ async def get_tasks(
             params["status"] = status
         
         # Make API request using validated API key
-        import httpx
-        async with httpx.AsyncClient(timeout=config.api_timeout) as client:
-            response = await client.get(
-                f"{config.api_base_url}/api/v1/projects/{project_id}/tasks",
-                headers={"Authorization": f"Bearer {_api_key}"},
-                params=params
-            )
-            
-            if response.status_code == 200:
-                tasks_data = response.json()
-                return {
-                    "success": True,
-                    "project_id": project_id,
-                    "tasks": tasks_data,
-                    "total_count": len(tasks_data),
-                    "filter_status": status,
-                    "user": _user_info.get("email")
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Failed to fetch tasks: {response.status_code}"
-                }
+        response = await api_client.request("GET", f"/api/v1/projects/{project_id}/tasks", _api_key, params=params)
+        
+        if response.status_code == 200:
+            tasks_data = response.json()
+            return {
+                "success": True,
+                "project_id": project_id,
+                "tasks": tasks_data,
+                "total_count": len(tasks_data),
+                "filter_status": status,
+                "user": _user_info.get("email")
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to fetch tasks: {response.status_code}"
+            }
                 
     except Exception as e:
         return {"success": False, "error": f"Error fetching tasks: {str(e)}"}
@@ -173,30 +178,25 @@ async def get_task(
     """
     try:
         # Make API request using validated API key
-        import httpx
-        async with httpx.AsyncClient(timeout=config.api_timeout) as client:
-            response = await client.get(
-                f"{config.api_base_url}/api/v1/tasks/{task_id}",
-                headers={"Authorization": f"Bearer {_api_key}"}
-            )
-            
-            if response.status_code == 200:
-                task_data = response.json()
-                return {
-                    "success": True,
-                    "task": task_data,
-                    "user": _user_info.get("email")
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": f"Task {task_id} not found"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Failed to fetch task: {response.status_code}"
-                }
+        response = await api_client.request("GET", f"/api/v1/tasks/{task_id}", _api_key)
+        
+        if response.status_code == 200:
+            task_data = response.json()
+            return {
+                "success": True,
+                "task": task_data,
+                "user": _user_info.get("email")
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": f"Task {task_id} not found"
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to fetch task: {response.status_code}"
+            }
                 
     except Exception as e:
         return {"success": False, "error": f"Error fetching task: {str(e)}"}
@@ -232,32 +232,26 @@ async def set_task_status(
             }
         
         # Make API request using validated API key
-        import httpx
-        async with httpx.AsyncClient(timeout=config.api_timeout) as client:
-            response = await client.patch(
-                f"{config.api_base_url}/api/v1/tasks/{task_id}/status",
-                headers={"Authorization": f"Bearer {_api_key}"},
-                json={"status": status}
-            )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "message": f"Task {task_id} status updated to {status}",
-                    "task_id": task_id,
-                    "new_status": status,
-                    "user": _user_info.get("email")
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": f"Task {task_id} not found"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Failed to update task status: {response.status_code}"
-                }
+        response = await api_client.request("PATCH", f"/api/v1/tasks/{task_id}/status", _api_key, json={"status": status})
+        
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "message": f"Task {task_id} status updated to {status}",
+                "task_id": task_id,
+                "new_status": status,
+                "user": _user_info.get("email")
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": f"Task {task_id} not found"
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to update task status: {response.status_code}"
+            }
                 
     except Exception as e:
         return {"success": False, "error": f"Error updating task status: {str(e)}"}
@@ -285,33 +279,27 @@ async def update_project(
     """
     try:
         # Make API request using validated API key
-        import httpx
-        async with httpx.AsyncClient(timeout=config.api_timeout) as client:
-            response = await client.put(
-                f"{config.api_base_url}/api/v1/projects/{project_id}",
-                headers={"Authorization": f"Bearer {_api_key}"},
-                json=updates
-            )
-            
-            if response.status_code == 200:
-                updated_project = response.json()
-                return {
-                    "success": True,
-                    "message": f"Project {project_id} updated successfully",
-                    "project": updated_project,
-                    "updated_fields": list(updates.keys()),
-                    "user": _user_info.get("email")
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": f"Project {project_id} not found"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Failed to update project: {response.status_code}"
-                }
+        response = await api_client.request("PUT", f"/api/v1/projects/{project_id}", _api_key, json=updates)
+        
+        if response.status_code == 200:
+            updated_project = response.json()
+            return {
+                "success": True,
+                "message": f"Project {project_id} updated successfully",
+                "project": updated_project,
+                "updated_fields": list(updates.keys()),
+                "user": _user_info.get("email")
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": f"Project {project_id} not found"
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to update project: {response.status_code}"
+            }
                 
     except Exception as e:
         return {"success": False, "error": f"Error updating project: {str(e)}"}
@@ -337,31 +325,26 @@ async def get_progress(
     """
     try:
         # Make API request using validated API key
-        import httpx
-        async with httpx.AsyncClient(timeout=config.api_timeout) as client:
-            response = await client.get(
-                f"{config.api_base_url}/api/v1/projects/{project_id}/progress",
-                headers={"Authorization": f"Bearer {_api_key}"},
-            )
-            
-            if response.status_code == 200:
-                progress_data = response.json()
-                return {
-                    "success": True,
-                    "project_id": project_id,
-                    "progress": progress_data,
-                    "user": _user_info.get("email")
-                }
-            elif response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": f"Project {project_id} not found"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Failed to fetch progress: {response.status_code}"
-                }
+        response = await api_client.request("GET", f"/api/v1/projects/{project_id}/progress", _api_key)
+        
+        if response.status_code == 200:
+            progress_data = response.json()
+            return {
+                "success": True,
+                "project_id": project_id,
+                "progress": progress_data,
+                "user": _user_info.get("email")
+            }
+        elif response.status_code == 404:
+            return {
+                "success": False,
+                "error": f"Project {project_id} not found"
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to fetch progress: {response.status_code}"
+            }
                 
     except Exception as e:
         return {"success": False, "error": f"Error fetching progress: {str(e)}"}
\ No newline at end of file
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+SQL statements per route across the test_*_api.py flows
+
+Starts the API on 127.0.0.1:8000 with SQL_STATEMENT_REPORT on, runs every
+test_*_api.py script against it, stops it and prints the statement count,
+the largest count of a single request and the total database time of each
+route. The server uses the database configured in .env, like the scripts
+expect (they log in as existing users). Usage:
+
+    python statement_report.py [report file]
+"""
+
+import glob
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BASE_URL = "http://127.0.0.1:8000"
+STARTUP_TIMEOUT = 30
+
+
+def wait_for_server(server: subprocess.Popen) -> bool:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            return False
+        try:
+            if httpx.get(f"{BASE_URL}/health", timeout=1).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def run_report(report_path: str) -> bool:
+    env = dict(os.environ, SQL_STATEMENT_REPORT="true", SQL_STATEMENT_REPORT_PATH=report_path)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", "8000"],
+        env=env
+    )
+    try:
+        if not wait_for_server(server):
+            print("❌ The API server did not start")
+            return False
+
+        failed = []
+        for script in sorted(glob.glob("test_*_api.py")):
+            print(f"\n=== {script} ===")
+            if subprocess.run([sys.executable, script]).returncode != 0:
+                failed.append(script)
+    finally:
+        # The report is written when the application shuts down
+        server.send_signal(signal.SIGINT)
+        server.wait(timeout=STARTUP_TIMEOUT)
+
+    if not os.path.exists(report_path):
+        print("❌ The server wrote no report")
+        return False
+    print("\n=== SQL statements per route ===")
+    with open(report_path, encoding="utf-8") as report_file:
+        print(report_file.read())
+    if failed:
+        print(f"⚠️  Failed flows: {', '.join(failed)}")
+    return True
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tempfile.gettempdir(), "sql_statement_report.txt")
+    sys.exit(0 if run_report(path) else 1)